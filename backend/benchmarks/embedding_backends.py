@@ -0,0 +1,152 @@
+"""
+Parity check and latency/memory benchmark for the embedding backends.
+
+Each backend runs in its own subprocess so RSS numbers are not polluted by
+the other runtime. The PyTorch backend is the reference: every other backend
+must produce vectors whose cosine similarity to the reference stays above
+--min-cosine, and its top-k neighbours over the sample corpus must agree.
+
+Usage:
+    python -m benchmarks.embedding_backends
+    python -m benchmarks.embedding_backends --variant onnx:onnx/model_qint8_avx2.onnx --queries 500
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+SAMPLE_QUERIES = [
+    "a movie about prison escape and friendship",
+    "superhero fights crime in a dark city",
+    "time travel and romance",
+    "a heist crew plans one last job",
+    "astronauts stranded on a distant planet",
+    "mafia family struggles for power",
+    "a detective hunts a serial killer",
+    "coming of age story in a small town",
+    "robots rebel against humanity",
+    "a musician chases fame and loses everything",
+    "zombies overrun a city",
+    "a lawyer defends an innocent man in the deep south",
+]
+
+
+def run_worker(backend: str, onnx_file: str, queries: int, out_path: str) -> None:
+    """Load one backend, embed the sample corpus, and time single-query calls."""
+    from src.search.backends import load_embedding_model
+    from src.search.embedding import EMBEDDING_DIM, EMBEDDING_MODEL_NAME
+
+    model_path = os.getenv("EMBEDDING_MODEL_PATH") or EMBEDDING_MODEL_NAME
+
+    started = time.perf_counter()
+    model = load_embedding_model(model_path, backend, onnx_file or None, EMBEDDING_DIM)
+    load_seconds = time.perf_counter() - started
+
+    vectors = model.encode(SAMPLE_QUERIES, convert_to_numpy=True, normalize_embeddings=True)
+    np.save(out_path, vectors.astype(np.float32))
+
+    latencies = []
+    for i in range(queries):
+        text = SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)] + f" #{i}"
+        t0 = time.perf_counter()
+        model.encode(text, convert_to_numpy=True)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    model.encode(SAMPLE_QUERIES * 8, batch_size=32, convert_to_numpy=True)
+    batch_seconds = time.perf_counter() - t0
+
+    print(
+        json.dumps(
+            {
+                "load_s": round(load_seconds, 2),
+                "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+                "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+                "batch_qps": round(len(SAMPLE_QUERIES) * 8 / batch_seconds, 1),
+                # ru_maxrss is reported in KiB on Linux
+                "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            }
+        )
+    )
+
+
+def spawn(variant: str, queries: int, out_path: str) -> dict:
+    backend, _, onnx_file = variant.partition(":")
+    cmd = [sys.executable, "-m", "benchmarks.embedding_backends", "--worker", backend, "--onnx-file", onnx_file,
+           "--queries", str(queries), "--out", out_path]
+    output = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def parity(reference: np.ndarray, candidate: np.ndarray, k: int = 3) -> dict:
+    """Cosine agreement and top-k neighbour overlap against the reference."""
+    cosines = np.sum(reference * candidate, axis=1)
+    ref_top = np.argsort(-(reference @ reference.T), axis=1)[:, 1 : k + 1]
+    cand_top = np.argsort(-(candidate @ candidate.T), axis=1)[:, 1 : k + 1]
+    overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(ref_top, cand_top)])
+    return {
+        "min_cosine": round(float(cosines.min()), 5),
+        "mean_cosine": round(float(cosines.mean()), 5),
+        f"top{k}_overlap": round(float(overlap), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--variant",
+        action="append",
+        help="backend[:onnx_file] to compare against torch (repeatable). "
+        "Defaults to onnx fp32 and onnx int8 (avx2).",
+    )
+    parser.add_argument("--queries", type=int, default=200, help="Single-query encodes to time")
+    parser.add_argument("--min-cosine", type=float, default=0.98, help="Parity threshold per vector")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--onnx-file", default="", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.onnx_file, args.queries, args.out)
+        return
+
+    variants = args.variant or ["onnx", "onnx:onnx/model_qint8_avx2.onnx"]
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for variant in ["torch"] + variants:
+            out_path = os.path.join(tmp, f"{len(results)}.npy")
+            print(f"Benchmarking {variant}...")
+            results[variant] = {**spawn(variant, args.queries, out_path), "vectors": out_path}
+
+        reference = np.load(results["torch"]["vectors"])
+        print(f"\n{'variant':40} {'load_s':>7} {'p50_ms':>7} {'p99_ms':>7} {'qps':>7} {'rss_mb':>7}  parity")
+        for variant, stats in results.items():
+            check = "reference"
+            if variant != "torch":
+                check_stats = parity(reference, np.load(stats["vectors"]))
+                failed |= check_stats["min_cosine"] < args.min_cosine
+                check = " ".join(f"{k}={v}" for k, v in check_stats.items())
+            print(
+                f"{variant:40} {stats['load_s']:>7} {stats['p50_ms']:>7} {stats['p99_ms']:>7} "
+                f"{stats['batch_qps']:>7} {stats['max_rss_mb']:>7}  {check}"
+            )
+
+    if failed:
+        print(f"\nParity check FAILED: a backend fell below min cosine {args.min_cosine}", file=sys.stderr)
+        sys.exit(1)
+    print("\nParity check passed.")
+
+
+if __name__ == "__main__":
+    main()
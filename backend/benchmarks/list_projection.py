@@ -0,0 +1,154 @@
+"""
+Benchmark: what list endpoints pay for columns they never return.
+
+Times one page of movies three ways and estimates the bytes each row puts on
+the wire (pgvector's binary format for the embedding, raw lengths for text):
+
+    full       select(Movie) with plot_embedding undeferred (the old behaviour)
+    deferred   select(Movie) with the embedding deferred (list/detail default)
+    summary    select(*SUMMARY_COLUMNS), plain rows for MovieSummary cards
+
+By default a synthetic catalog is loaded into a temporary SQLite database, so
+the run needs no server (the embedding then travels as text, which is slower
+to decode than asyncpg's binary format; relative costs still hold). Pass --db
+to read the real movies table through the configured Postgres instead.
+
+Usage:
+    python -m benchmarks.list_projection
+    python -m benchmarks.list_projection --rows 20000 --page 100
+    python -m benchmarks.list_projection --db
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import undefer
+
+from src.db.core import Base
+from src.db.entity import Movie
+from src.movies.models import MovieResponse, MovieSummary
+from src.search.service import SUMMARY_COLUMNS
+
+DIM = 384
+
+
+def wire_bytes(value) -> int:
+    """Approximate binary-protocol size of one column value (incl. 4-byte length)."""
+    if value is None:
+        return 4
+    if isinstance(value, np.ndarray):
+        return 4 + 4 + 4 * value.size  # length + pgvector header + float32s
+    if isinstance(value, str):
+        return 4 + len(value.encode())
+    if isinstance(value, float):
+        return 4 + 8
+    return 4 + 4
+
+
+def row_bytes(row, columns) -> int:
+    return sum(wire_bytes(getattr(row, name)) for name in columns)
+
+
+async def load_synthetic(session_factory, rows: int) -> None:
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((rows, DIM)).astype(np.float32)
+    async with session_factory() as db:
+        db.add_all(
+            Movie(
+                id=i + 1,
+                movie_name=f"Movie {i}",
+                rating=round(float(rng.uniform(1, 10)), 1),
+                runtime=int(rng.integers(80, 200)),
+                genre="Crime, Drama",
+                metascore=float(rng.integers(20, 100)),
+                plot="A synthetic plot description long enough to look like a real one. " * 3,
+                directors="Some Director",
+                stars="Star One, Star Two, Star Three",
+                votes="1.2M",
+                gross="100.0M",
+                poster_url=f"https://example.com/{i}.jpg",
+                plot_embedding=embeddings[i],
+            )
+            for i in range(rows)
+        )
+        await db.commit()
+
+
+async def run_case(session_factory, query, scalars: bool, model, columns, page: int, repeat: int):
+    """Median ms to fetch + hydrate + validate one page, and mean bytes per row of `columns`."""
+    timings, sizes = [], []
+    for _ in range(repeat):
+        async with session_factory() as db:
+            t0 = time.perf_counter()
+            result = await db.execute(query.order_by(Movie.id).limit(page))
+            rows = result.scalars().all() if scalars else result.all()
+            [model.model_validate(row) for row in rows]
+            timings.append((time.perf_counter() - t0) * 1000)
+            if not sizes:
+                sizes = [row_bytes(row, columns) for row in rows]
+    return statistics.median(timings), (sum(sizes) / len(sizes) if sizes else 0.0)
+
+
+async def main_async(args) -> None:
+    tmpdir = None
+    if args.db:
+        from src.db.core import engine
+    else:
+        tmpdir = tempfile.TemporaryDirectory()
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmpdir.name}/bench.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    try:
+        if not args.db:
+            t0 = time.perf_counter()
+            await load_synthetic(session_factory, args.rows)
+            print(f"Loaded {args.rows} synthetic movies in {time.perf_counter() - t0:.1f}s")
+
+        all_columns = [c.key for c in Movie.__table__.columns]
+        cases = [
+            ("full", select(Movie).options(undefer(Movie.plot_embedding)), True, MovieResponse, all_columns),
+            ("deferred", select(Movie), True, MovieResponse, [c for c in all_columns if c != "plot_embedding"]),
+            ("summary", select(*SUMMARY_COLUMNS), False, MovieSummary, [c.key for c in SUMMARY_COLUMNS]),
+        ]
+        results = {}
+        for label, query, scalars, model, columns in cases:
+            results[label] = await run_case(
+                session_factory, query, scalars, model, columns, args.page, args.repeat
+            )
+
+        base_ms, base_bytes = results["full"]
+        print(f"\nPage of {args.page} rows, median of {args.repeat} runs")
+        print(f"{'query':<10} {'ms/page':>9} {'bytes/row':>10} {'vs full':>16}")
+        for label, (ms, nbytes) in results.items():
+            print(f"{label:<10} {ms:9.2f} {nbytes:10.0f}   {base_ms / ms:5.1f}x faster, {base_bytes / max(nbytes, 1):4.1f}x smaller")
+    finally:
+        await engine.dispose()
+        if tmpdir:
+            tmpdir.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000, help="Synthetic catalog size (ignored with --db)")
+    parser.add_argument("--page", type=int, default=100, help="Rows per page")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed pages per query")
+    parser.add_argument("--db", action="store_true", help="Read the real movies table through the configured database")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
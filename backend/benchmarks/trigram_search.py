@@ -0,0 +1,157 @@
+"""
+Benchmark: ILIKE '%term%' and fuzzy name search with and without trigram indexes.
+
+Loads a synthetic catalog (default 100k rows) into a temp table shaped like
+`movies`, then runs the structural search filters before and after creating
+GIN trigram indexes the way src/db/schema.py does. For each query it prints the
+top plan node from EXPLAIN ANALYZE and the median latency. Nothing is written
+to the real movies table; the temp table is dropped on disconnect.
+
+Requires a reachable Postgres (DB_* settings) where pg_trgm can be created.
+
+Usage:
+    python -m benchmarks.trigram_search
+    python -m benchmarks.trigram_search --rows 500000 --repeat 20
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import psycopg2
+
+from src.config import settings
+from src.db.schema import trigram_index_sql
+
+TABLE = "movies_trgm_bench"
+
+WORDS = [
+    "dark", "knight", "god", "father", "pulp", "fiction", "shadow", "river", "silent", "empire",
+    "last", "night", "city", "star", "storm", "winter", "summer", "ghost", "iron", "golden",
+    "road", "queen", "king", "lost", "secret", "garden", "ocean", "fire", "blood", "moon",
+]
+GENRES = ["Action", "Adventure", "Comedy", "Crime", "Drama", "Fantasy", "Horror", "Mystery", "Romance", "Sci-Fi", "Thriller"]
+FIRST = ["Christopher", "Francis", "Quentin", "Martin", "Greta", "Sofia", "Denis", "Kathryn", "Steven", "Ava"]
+LAST = ["Nolan", "Coppola", "Tarantino", "Scorsese", "Gerwig", "Villeneuve", "Bigelow", "Spielberg", "Duvernay", "Kubrick"]
+
+# (label, WHERE clause, params) mirroring StructuralSearchService / build_filters
+QUERIES = [
+    ("name ILIKE", "movie_name ILIKE %s", ["%golden river%"]),
+    ("genre ILIKE", "genre ILIKE %s", ["%sci-fi%"]),
+    ("directors ILIKE", "directors ILIKE %s", ["%villeneuve%"]),
+    ("stars ILIKE", "stars ILIKE %s", ["%gerwig%"]),
+    ("name fuzzy", "%s <%% movie_name", ["goldn rivr"]),
+]
+
+
+def synthetic_rows(rows: int, seed: int = 0) -> io.StringIO:
+    """Tab-separated rows for COPY, with names/people drawn from small vocabularies."""
+    rng = np.random.default_rng(seed)
+    words = rng.integers(0, len(WORDS), size=(rows, 3))
+    genres = rng.integers(0, len(GENRES), size=(rows, 2))
+    people = rng.integers(0, len(LAST), size=(rows, 4, 2))
+
+    buf = io.StringIO()
+    for i in range(rows):
+        name = " ".join(WORDS[w].title() for w in words[i]) + f" {i}"
+        genre = ", ".join(dict.fromkeys(GENRES[g] for g in genres[i]))
+        names = [f"{FIRST[f]} {LAST[l]}" for f, l in people[i]]
+        buf.write(f"{i + 1}\t{name}\t{genre}\t{names[0]}\t{', '.join(names[1:])}\n")
+    buf.seek(0)
+    return buf
+
+
+def load(cur, rows: int) -> None:
+    cur.execute(f"""
+        CREATE TEMP TABLE {TABLE} (
+            id INTEGER PRIMARY KEY,
+            movie_name VARCHAR(255) NOT NULL,
+            genre TEXT,
+            directors TEXT,
+            stars TEXT
+        )
+    """)
+    # Same btree the ORM creates on movie_name, so "before" is today's schema
+    cur.execute(f"CREATE INDEX ON {TABLE} (movie_name)")
+    t0 = time.perf_counter()
+    cur.copy_expert(f"COPY {TABLE} (id, movie_name, genre, directors, stars) FROM STDIN", synthetic_rows(rows))
+    cur.execute(f"ANALYZE {TABLE}")
+    print(f"Loaded {rows} rows in {time.perf_counter() - t0:.1f}s")
+
+
+def plan_node(cur, where: str, params: list) -> str:
+    cur.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) SELECT id FROM {TABLE} WHERE {where} LIMIT 10", params)
+    plan = cur.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    node = plan[0]["Plan"]
+    while node.get("Node Type") == "Limit" and node.get("Plans"):
+        node = node["Plans"][0]
+    return node["Node Type"]
+
+
+def median_ms(cur, where: str, params: list, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        cur.execute(f"SELECT id FROM {TABLE} WHERE {where} LIMIT 10", params)
+        cur.fetchall()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings)
+
+
+def measure(cur, repeat: int) -> dict:
+    return {
+        label: (plan_node(cur, where, params), median_ms(cur, where, params, repeat))
+        for label, where, params in QUERIES
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic catalog size")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per query")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(
+        host=settings.db_host,
+        port=settings.db_port,
+        database=settings.db_name,
+        user=settings.db_user,
+        password=settings.db_password,
+    )
+    conn.autocommit = True
+    try:
+        cur = conn.cursor()
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        load(cur, args.rows)
+
+        before = measure(cur, args.repeat)
+
+        t0 = time.perf_counter()
+        for column in ("movie_name", "genre", "directors", "stars"):
+            cur.execute(trigram_index_sql(TABLE, column))
+        cur.execute(f"ANALYZE {TABLE}")
+        print(f"Built trigram indexes in {time.perf_counter() - t0:.1f}s\n")
+
+        after = measure(cur, args.repeat)
+
+        print(f"{'query':<16} {'before plan':<18} {'ms':>8}   {'after plan':<18} {'ms':>8}   speedup")
+        for label, _, _ in QUERIES:
+            plan_b, ms_b = before[label]
+            plan_a, ms_a = after[label]
+            print(f"{label:<16} {plan_b:<18} {ms_b:8.2f}   {plan_a:<18} {ms_a:8.2f}   {ms_b / ms_a:6.1f}x")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Microbenchmark: text vs binary pgvector parameter binding.
+
+Compares the old path (384 floats -> "[x,y,...]" string, parsed again by
+Postgres via CAST(... AS vector)) with float32 arrays sent in pgvector's
+binary format, per query and per ingested row. Client-side costs are always
+measured; pass --db to also time server round-trips through asyncpg.
+
+Usage:
+    python -m benchmarks.vector_binding
+    python -m benchmarks.vector_binding --rows 50000 --db
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from pgvector import Vector
+
+from src.db.pgcopy import pack_binary_copy
+
+DIM = 384
+
+
+def to_text(embedding) -> str:
+    """The string conversion previously done per query and per row."""
+    return "[" + ",".join(str(x) for x in embedding) + "]"
+
+
+def per_call_us(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def client_side(rows: int, repeat: int) -> None:
+    rng = np.random.default_rng(0)
+    query = rng.standard_normal(DIM).astype(np.float32)
+    query_list = query.tolist()
+
+    text_us = per_call_us(lambda: to_text(query_list), repeat)
+    binary_us = per_call_us(lambda: Vector(query).to_binary(), repeat)
+    text_bytes = len(to_text(query_list).encode())
+    binary_bytes = len(Vector(query).to_binary())
+
+    print(f"Per query ({DIM} dims, {repeat} reps)")
+    print(f"  text   : {text_us:8.1f} us encode, {text_bytes:6d} bytes on the wire")
+    print(f"  binary : {binary_us:8.1f} us encode, {binary_bytes:6d} bytes on the wire")
+    print(f"  saving : {text_us - binary_us:8.1f} us, {text_bytes / binary_bytes:.1f}x smaller")
+
+    matrix = rng.standard_normal((rows, DIM)).astype(np.float32)
+    ids = np.arange(1, rows + 1, dtype=np.int32)
+
+    t0 = time.perf_counter()
+    text_rows = [(to_text(row), int(i)) for i, row in zip(ids, matrix.tolist())]
+    text_s = time.perf_counter() - t0
+    text_total = sum(len(t) for t, _ in text_rows)
+
+    t0 = time.perf_counter()
+    payload = pack_binary_copy([("int4", ids), ("vector", matrix)])
+    binary_s = time.perf_counter() - t0
+
+    print(f"\nPer ingested row ({rows} rows)")
+    print(f"  text   : {text_s / rows * 1e6:8.2f} us/row, {text_total / rows:8.0f} bytes/row")
+    print(f"  binary : {binary_s / rows * 1e6:8.2f} us/row, {len(payload) / rows:8.0f} bytes/row (COPY binary)")
+
+
+async def server_side(repeat: int) -> None:
+    import asyncpg
+    from pgvector.asyncpg import register_vector
+
+    from src.config import settings
+
+    dsn = settings.ASYNC_DATABASE_URL.replace("postgresql+asyncpg", "postgresql")
+    rng = np.random.default_rng(1)
+    query = rng.standard_normal(DIM).astype(np.float32)
+
+    text_conn = await asyncpg.connect(dsn)
+    binary_conn = await asyncpg.connect(dsn)
+    await register_vector(binary_conn)
+    try:
+        text_stmt = await text_conn.prepare("SELECT CAST($1 AS vector) <=> CAST($1 AS vector)")
+        binary_stmt = await binary_conn.prepare("SELECT $1::vector <=> $1::vector")
+
+        async def timed(fn):
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                await fn()
+            return (time.perf_counter() - t0) / repeat * 1e6
+
+        text_us = await timed(lambda: text_stmt.fetchval(to_text(query.tolist())))
+        binary_us = await timed(lambda: binary_stmt.fetchval(query))
+    finally:
+        await text_conn.close()
+        await binary_conn.close()
+
+    print(f"\nRound trip incl. server parse ({repeat} reps)")
+    print(f"  text   : {text_us:8.1f} us")
+    print(f"  binary : {binary_us:8.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="Rows for the ingestion comparison")
+    parser.add_argument("--repeat", type=int, default=2000, help="Repetitions for per-query timings")
+    parser.add_argument("--db", action="store_true", help="Also time round-trips against the configured database")
+    args = parser.parse_args()
+
+    client_side(args.rows, args.repeat)
+    if args.db:
+        asyncio.run(server_side(args.repeat))
+
+
+if __name__ == "__main__":
+    main()
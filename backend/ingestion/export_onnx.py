@@ -0,0 +1,53 @@
+"""
+Export the embedding model to ONNX, optionally with dynamic int8 quantization,
+for the onnxruntime embedding backend.
+
+Usage:
+    python -m ingestion.export_onnx --output models/all-MiniLM-L6-v2
+    python -m ingestion.export_onnx --output models/all-MiniLM-L6-v2 --quantize avx2
+
+Then run the API with:
+    EMBEDDING_BACKEND=onnx
+    EMBEDDING_MODEL_PATH=models/all-MiniLM-L6-v2
+    EMBEDDING_ONNX_FILE=onnx/model_qint8_avx2.onnx   # omit for the fp32 graph
+"""
+
+import argparse
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.search.embedding import EMBEDDING_DIM, EMBEDDING_MODEL_NAME
+
+QUANTIZATION_TARGETS = ("arm64", "avx2", "avx512", "avx512_vnni")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX")
+    parser.add_argument("--output", required=True, help="Directory to save the exported model to")
+    parser.add_argument(
+        "--quantize",
+        choices=QUANTIZATION_TARGETS,
+        help="Also write a dynamically int8-quantized graph tuned for this CPU instruction set",
+    )
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    print(f"Exporting {EMBEDDING_MODEL_NAME} to ONNX...")
+    model = SentenceTransformer(EMBEDDING_MODEL_NAME, backend="onnx", device="cpu")
+    if model.get_sentence_embedding_dimension() != EMBEDDING_DIM:
+        raise ValueError(f"Expected {EMBEDDING_DIM}-dimension embeddings")
+    model.save_pretrained(args.output)
+    print(f"Saved fp32 graph to {os.path.join(args.output, 'onnx', 'model.onnx')}")
+
+    if args.quantize:
+        print(f"Quantizing to int8 for {args.quantize}...")
+        export_dynamic_quantized_onnx_model(model, args.quantize, args.output)
+        print(f"Saved int8 graph to {os.path.join(args.output, 'onnx', f'model_qint8_{args.quantize}.onnx')}")
+
+
+if __name__ == "__main__":
+    main()
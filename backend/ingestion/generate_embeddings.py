@@ -2,10 +2,17 @@
 Script to generate embeddings for all movie plots and store them in PostgreSQL.
 Run this script after pgvector extension is enabled and plot_embedding column is added.
 
+Also precomputes every movie's nearest neighbors into movie_neighbors for the
+"more like this" endpoint.
+
 Usage:
     python -m ingestion.generate_embeddings
+    python -m ingestion.generate_embeddings --neighbors 30
+    python -m ingestion.generate_embeddings --index hnsw --m 16 --ef-construction 64
 """
 
+import argparse
+import io
 import sys
 import os
 
@@ -16,15 +23,99 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import psycopg2
-from psycopg2.extras import execute_values
 import numpy as np
 
-from src.search.embedding import batch_generate_embeddings, EMBEDDING_DIM
+from src.db.catalog import bump_catalog_version_sync
+from src.db.pgcopy import pack_binary_copy
+from src.search.embedding import batch_embed, EMBEDDING_DIM
+from src.search.neighbors import MOVIE_NEIGHBORS_TABLE_SQL, top_k_neighbors
 from src.config import settings
 
 
-def main():
+def store_embeddings(cur, movie_ids: np.ndarray, embeddings: np.ndarray):
+    """
+    Bulk-write embeddings in pgvector's binary format.
+    
+    Rows are streamed into a temp table with binary COPY, then applied with a
+    single UPDATE ... FROM join instead of one UPDATE per movie.
+    """
+    cur.execute(f"""
+        CREATE TEMP TABLE movie_embeddings_stage (
+            id INTEGER PRIMARY KEY,
+            plot_embedding vector({EMBEDDING_DIM})
+        ) ON COMMIT DROP
+    """)
+    payload = pack_binary_copy([("int4", movie_ids), ("vector", embeddings)])
+    cur.copy_expert(
+        "COPY movie_embeddings_stage (id, plot_embedding) FROM STDIN WITH (FORMAT binary)",
+        io.BytesIO(payload),
+    )
+    cur.execute("""
+        UPDATE movies m
+        SET plot_embedding = s.plot_embedding
+        FROM movie_embeddings_stage s
+        WHERE m.id = s.id
+    """)
+
+
+def store_neighbors(cur, movie_ids: np.ndarray, embeddings: np.ndarray, k: int) -> int:
+    """
+    Replace movie_neighbors with each movie's top-k neighbors.
+
+    Scores come from blocked matrix products over the embeddings already in
+    memory and are written with one binary COPY. Runs inside the caller's
+    transaction, so readers switch from the old lists to the new ones at commit.
+    """
+    rows = top_k_neighbors(movie_ids, embeddings, k)
+    cur.execute(MOVIE_NEIGHBORS_TABLE_SQL)
+    cur.execute("TRUNCATE TABLE movie_neighbors")
+    payload = pack_binary_copy([
+        ("int4", rows.movie_ids),
+        ("int2", rows.ranks),
+        ("int4", rows.neighbor_ids),
+        ("float4", rows.scores),
+    ])
+    cur.copy_expert(
+        "COPY movie_neighbors (movie_id, rank, neighbor_id, score) FROM STDIN WITH (FORMAT binary)",
+        io.BytesIO(payload),
+    )
+    return len(rows.movie_ids)
+
+
+VECTOR_INDEX_NAME = "movies_plot_embedding_idx"
+
+
+def vector_index_sql(index_type: str, lists: int, m: int, ef_construction: int) -> str:
+    """CREATE INDEX statement for the pgvector ANN index on plot_embedding."""
+    if index_type == "hnsw":
+        params = f"m = {int(m)}, ef_construction = {int(ef_construction)}"
+    elif index_type == "ivfflat":
+        params = f"lists = {int(lists)}"
+    else:
+        raise ValueError(f"Unknown vector index type: {index_type!r}")
+    return f"""
+        CREATE INDEX {VECTOR_INDEX_NAME}
+        ON movies USING {index_type} (plot_embedding vector_cosine_ops)
+        WITH ({params})
+    """
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate plot embeddings and build the vector index")
+    parser.add_argument("--index", choices=["ivfflat", "hnsw"], default=settings.vector_index_type,
+                        help="ANN index type (the API's quality tiers follow VECTOR_INDEX_TYPE)")
+    parser.add_argument("--lists", type=int, default=settings.ivfflat_lists, help="ivfflat: number of lists")
+    parser.add_argument("--m", type=int, default=settings.hnsw_m, help="hnsw: max connections per node")
+    parser.add_argument("--ef-construction", type=int, default=settings.hnsw_ef_construction,
+                        help="hnsw: candidate list size while building")
+    parser.add_argument("--neighbors", type=int, default=settings.movie_neighbors_k,
+                        help="Similar movies precomputed per movie (0 = skip)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Generate and store embeddings for all movie plots."""
+    args = parse_args(argv)
     
     # Connect to database
     conn = psycopg2.connect(
@@ -60,41 +151,34 @@ def main():
             return
         
         # Extract plots
-        movie_ids = [m[0] for m in movies]
+        movie_ids = np.array([m[0] for m in movies], dtype=np.int32)
         plots = [m[1] or "" for m in movies]
         
-        # Generate embeddings in batches
+        # Generate embeddings in batches (float32 matrix, never converted to text)
         print("Generating embeddings...")
-        embeddings = batch_generate_embeddings(plots, batch_size=64)
+        embeddings = batch_embed(plots, batch_size=64)
         
         # Update database with embeddings
         print("Storing embeddings in database...")
-        
-        # Prepare data for batch update
-        update_data = []
-        for movie_id, embedding in zip(movie_ids, embeddings):
-            # Convert to string format for pgvector
-            embedding_str = "[" + ",".join(str(x) for x in embedding) + "]"
-            update_data.append((embedding_str, movie_id))
-        
-        # Batch update
-        cur.executemany(
-            "UPDATE movies SET plot_embedding = %s::vector WHERE id = %s",
-            update_data
-        )
+        store_embeddings(cur, movie_ids, embeddings)
+        if args.neighbors > 0:
+            print(f"Computing top-{args.neighbors} neighbors per movie...")
+            stored = store_neighbors(cur, movie_ids, embeddings, args.neighbors)
+            print(f"Stored {stored} neighbor rows")
+        version = bump_catalog_version_sync(cur)
         
         conn.commit()
-        print(f"Successfully stored embeddings for {len(embeddings)} movies!")
+        print(f"Successfully stored embeddings for {len(embeddings)} movies (catalog version {version})!")
         
-        # Create index for faster similarity search
-        print("Creating vector index...")
-        cur.execute("""
-            CREATE INDEX IF NOT EXISTS movies_plot_embedding_idx 
-            ON movies USING ivfflat (plot_embedding vector_cosine_ops)
-            WITH (lists = 100)
-        """)
+        # (Re)build the index after the bulk load so the type and build parameters
+        # always match the current run, and ivfflat lists are trained on the full data
+        print(f"Creating {args.index} vector index...")
+        cur.execute(f"DROP INDEX IF EXISTS {VECTOR_INDEX_NAME}")
+        cur.execute(vector_index_sql(args.index, args.lists, args.m, args.ef_construction))
         conn.commit()
         print("Vector index created!")
+        if args.index != settings.vector_index_type:
+            print(f"Note: set VECTOR_INDEX_TYPE={args.index} so search quality tiers tune the right index")
         
         # Verify
         cur.execute("SELECT COUNT(*) FROM movies WHERE plot_embedding IS NOT NULL")
@@ -1,5 +1,27 @@
+"""
+Load the processed movie CSV into PostgreSQL.
+
+Two load modes:
+    copy    (default) read the CSV in chunks and stream each chunk through
+            COPY ... FROM STDIN; memory stays bounded by --chunk-size no
+            matter how large the input is, and rows/sec progress is printed
+    insert  read the whole CSV into pandas and INSERT it with execute_values
+
+Usage:
+    python -m ingestion.ingest
+    python -m ingestion.ingest --csv dumps/catalog.csv --chunk-size 100000
+    python -m ingestion.ingest --mode insert
+"""
+
+import argparse
+import csv
+import io
 import os
 import sys
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import numpy as np
 import pandas as pd
@@ -7,6 +29,76 @@ import psycopg2
 from dotenv import load_dotenv
 from psycopg2.extras import execute_values
 
+from src.db.catalog import bump_catalog_version_sync
+from src.db.normalize import LinkBuilder, build_links
+from src.db.schema import apply_search_schema_sync
+from src.search.neighbors import MOVIE_NEIGHBORS_TABLE_SQL
+
+
+# Table columns filled from the CSV (excluding 'id', matching CREATE TABLE)
+EXPECTED_COLUMNS = [
+    "movie_name",
+    "rating",
+    "runtime",
+    "genre",
+    "metascore",
+    "plot",
+    "directors",
+    "stars",
+    "votes",
+    "gross",
+    "poster_url",
+]
+# Parsed in the streaming loader (which reads text) so COPY gets clean numbers;
+# unparseable values become NULL
+REAL_COLUMNS = ["rating", "metascore"]
+INTEGER_COLUMNS = ["runtime"]
+
+
+def standardize_columns(df, warn=True):
+    """Normalize CSV headers and return the EXPECTED_COLUMNS (missing ones as NULL)."""
+    df.columns = df.columns.str.lower().str.replace(" ", "_", regex=False).str.strip()
+
+    if "movie_name" not in df.columns:
+        raise ValueError("CSV must contain at least the 'movie_name' column after standardization.")
+
+    missing_cols = [col for col in EXPECTED_COLUMNS if col not in df.columns]
+    if missing_cols and warn:
+        print(f"Warning: CSV is missing expected columns: {missing_cols}. They will be NULL.", file=sys.stderr)
+    for col in missing_cols:
+        df[col] = np.nan
+
+    return df[EXPECTED_COLUMNS]
+
+
+def prepare_copy_chunk(chunk, first_id, warn=True):
+    """
+    Turn one CSV chunk (read with dtype=str) into COPY input for the movies table.
+
+    Columns are standardized, numbers parsed (unparseable values become NULL)
+    and ids assigned from `first_id` on.
+
+    Returns:
+        (frame with an 'id' column followed by EXPECTED_COLUMNS, CSV text for
+        COPY ... (id, EXPECTED_COLUMNS) FROM STDIN WITH (FORMAT csv))
+    """
+    df = standardize_columns(chunk, warn=warn).copy()
+    for col in REAL_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    for col in INTEGER_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").round().astype("Int64")
+    df.insert(0, "id", range(first_id, first_id + len(df)))
+    # Unquoted empty fields are NULL in COPY's csv format
+    return df, df.to_csv(header=False, index=False)
+
+
+def rows_to_csv(rows):
+    """Tuples as a CSV buffer for COPY ... WITH (FORMAT csv); None becomes NULL."""
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+    return buf
+
 
 class PostgresIngester:
     """
@@ -14,7 +106,7 @@ class PostgresIngester:
     into a PostgreSQL table. Assumes CSV has 'movie_name'.
     """
 
-    def __init__(self, csv_filepath, table_name="movies"):
+    def __init__(self, csv_filepath, table_name="movies", mode="copy", chunk_size=50_000):
         """
         Initializes the ingester, loading database configuration.
         """
@@ -35,8 +127,13 @@ class PostgresIngester:
         if not os.path.exists(csv_filepath):
             raise FileNotFoundError(f"CSV file not found at: {csv_filepath}")
 
+        if mode not in ("copy", "insert"):
+            raise ValueError(f"Unknown load mode: {mode!r} (expected 'copy' or 'insert')")
+
         self.csv_filepath = csv_filepath
         self.table_name = table_name
+        self.mode = mode
+        self.chunk_size = chunk_size
         self.conn = None
         self.cur = None
 
@@ -70,9 +167,41 @@ class PostgresIngester:
             poster_url TEXT
         );
         """
+        # Normalized genres / people (mirrors src/db/entity.py); filters join on these
+        create_link_tables_query = f"""
+        CREATE TABLE IF NOT EXISTS genres (
+            id INTEGER PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            key VARCHAR(100) NOT NULL UNIQUE
+        );
+        ALTER TABLE genres ADD COLUMN IF NOT EXISTS movie_count INTEGER NOT NULL DEFAULT 0;
+        CREATE TABLE IF NOT EXISTS people (
+            id INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            key VARCHAR(255) NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS movie_genres (
+            movie_id INTEGER REFERENCES {self.table_name} (id) ON DELETE CASCADE,
+            genre_id INTEGER REFERENCES genres (id) ON DELETE CASCADE,
+            PRIMARY KEY (movie_id, genre_id)
+        );
+        CREATE INDEX IF NOT EXISTS ix_movie_genres_genre_movie ON movie_genres (genre_id, movie_id);
+        CREATE TABLE IF NOT EXISTS movie_people (
+            movie_id INTEGER REFERENCES {self.table_name} (id) ON DELETE CASCADE,
+            person_id INTEGER REFERENCES people (id) ON DELETE CASCADE,
+            role VARCHAR(16),
+            PRIMARY KEY (movie_id, person_id, role)
+        );
+        CREATE INDEX IF NOT EXISTS ix_movie_people_person_role_movie ON movie_people (person_id, role, movie_id);
+        """
         try:
             print(f"Ensuring table '{self.table_name}' exists...")
             self.cur.execute(create_table_query)
+            self.cur.execute(create_link_tables_query)
+            # Filled by generate_embeddings.py; created here so the TRUNCATE below can clear it
+            self.cur.execute(MOVIE_NEIGHBORS_TABLE_SQL)
+            # pg_trgm + GIN trigram indexes for ILIKE '%term%' and fuzzy name search
+            apply_search_schema_sync(self.cur)
             self.conn.commit()
             print(f"Table '{self.table_name}' is ready.")
         except psycopg2.Error as e:
@@ -87,38 +216,7 @@ class PostgresIngester:
             df = pd.read_csv(self.csv_filepath)
 
             # --- Data Cleaning for DB Insertion ---
-            # 1. Standardize column names
-            df.columns = df.columns.str.lower().str.replace(" ", "_", regex=False).str.strip()
-
-            # 2. Define expected table columns (excluding 'id', matching CREATE TABLE)
-            #    Updated to use 'movie_name'
-            expected_cols = [
-                "movie_name",
-                "rating",
-                "runtime",
-                "genre",
-                "metascore",
-                "plot",
-                "directors",
-                "stars",
-                "votes",
-                "gross",
-                "poster_url",
-                # Verify these columns exist in your final CSV after standardization
-            ]
-
-            # 3. Check for essential columns (at least movie_name might be good)
-            if "movie_name" not in df.columns:
-                raise ValueError("CSV must contain at least the 'movie_name' column after standardization.")
-
-            # 4. Filter DataFrame to expected columns and handle missing ones
-            missing_cols = [col for col in expected_cols if col not in df.columns]
-            if missing_cols:
-                print(f"Warning: CSV is missing expected columns: {missing_cols}. They will be NULL.", file=sys.stderr)
-                for col in missing_cols:
-                    df[col] = np.nan  # Add missing columns as NaN
-
-            df_to_insert = df[expected_cols]  # Select only the columns for the table
+            df_to_insert = standardize_columns(df)
 
             # 5. Replace pandas NaN/NaT with None for SQL NULL
             df_processed = df_to_insert.replace({np.nan: None, pd.NaT: None})
@@ -131,18 +229,18 @@ class PostgresIngester:
                 return
 
             # --- Database Insertion ---
-            print(f"Clearing existing data from '{self.table_name}'...")
-            self.cur.execute(f"TRUNCATE TABLE {self.table_name} RESTART IDENTITY;")
+            self._truncate()
 
-            cols_sql = ", ".join(expected_cols)
-            placeholders = ", ".join(["%s"] * len(expected_cols))
-            insert_query = f"INSERT INTO {self.table_name} ({cols_sql}) VALUES %s"
+            cols_sql = ", ".join(EXPECTED_COLUMNS)
+            insert_query = f"INSERT INTO {self.table_name} ({cols_sql}) VALUES %s RETURNING id"
 
             print(f"Inserting {len(data_tuples)} rows into '{self.table_name}'...")
-            execute_values(self.cur, insert_query, data_tuples)
+            movie_ids = [row[0] for row in execute_values(self.cur, insert_query, data_tuples, fetch=True)]
+            self._ingest_links(movie_ids, df_processed)
+            version = bump_catalog_version_sync(self.cur)
 
             self.conn.commit()
-            print("Data ingestion successful.")
+            print(f"Data ingestion successful (catalog version {version}).")
 
         except pd.errors.EmptyDataError:
             print(f"Warning: CSV file '{self.csv_filepath}' is empty.", file=sys.stderr)
@@ -160,12 +258,110 @@ class PostgresIngester:
                 self.conn.rollback()
             raise
 
+    def _stream_csv_data(self):
+        """Streams the CSV into the PostgreSQL table chunk by chunk with COPY.
+
+        Only one chunk (plus the genre/person name maps) is in memory at a
+        time. Ids are assigned here so each chunk's links can be written right
+        after it; everything commits in one transaction with the version bump.
+        """
+        try:
+            print(f"Streaming CSV data from '{self.csv_filepath}' in chunks of {self.chunk_size:,} rows...")
+            # Read as text: numbers are parsed explicitly below, other columns pass through untouched
+            reader = pd.read_csv(self.csv_filepath, chunksize=self.chunk_size, dtype=str)
+
+            self._truncate()
+            links = LinkBuilder()
+            copy_query = (
+                f"COPY {self.table_name} (id, {', '.join(EXPECTED_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+            )
+            loaded = 0
+            started = time.perf_counter()
+
+            for chunk_number, chunk in enumerate(reader):
+                df, copy_text = prepare_copy_chunk(chunk, first_id=loaded + 1, warn=chunk_number == 0)
+                self.cur.copy_expert(copy_query, io.StringIO(copy_text))
+
+                text = {col: df[col].astype(object).where(df[col].notna(), None) for col in ("genre", "directors", "stars")}
+                self._copy_links(links.add(zip(df["id"], text["genre"], text["directors"], text["stars"])))
+
+                loaded += len(df)
+                elapsed = time.perf_counter() - started
+                print(f"  {loaded:,} rows loaded ({loaded / elapsed:,.0f} rows/s)")
+
+            if not loaded:
+                print("No data found in the CSV to ingest.")
+                self.conn.rollback()
+                return
+
+            # Ids were assigned explicitly, so move the SERIAL sequence past them
+            self.cur.execute(
+                "SELECT setval(pg_get_serial_sequence(%s, 'id'), %s)", (self.table_name, loaded)
+            )
+            version = bump_catalog_version_sync(self.cur)
+
+            self.conn.commit()
+            elapsed = time.perf_counter() - started
+            print(
+                f"Data ingestion successful: {loaded:,} rows in {elapsed:.1f}s "
+                f"({loaded / elapsed:,.0f} rows/s, catalog version {version})."
+            )
+
+        except pd.errors.EmptyDataError:
+            print(f"Warning: CSV file '{self.csv_filepath}' is empty.", file=sys.stderr)
+            if self.conn:
+                self.conn.rollback()
+        except (psycopg2.Error, ValueError) as e:
+            print(f"Error during ingestion: {e}", file=sys.stderr)
+            if self.conn:
+                self.conn.rollback()
+            raise
+        except Exception as e:
+            print(f"An unexpected error occurred during ingestion: {e}", file=sys.stderr)
+            if self.conn:
+                self.conn.rollback()
+            raise
+
+    def _copy_links(self, links):
+        """COPY one chunk's new genres/people, then its association rows (FKs need them first)."""
+        for table, columns, rows in (
+            ("genres", "id, name, key", links.genres),
+            ("people", "id, name, key", links.people),
+            ("movie_genres", "movie_id, genre_id", links.movie_genres),
+            ("movie_people", "movie_id, person_id, role", links.movie_people),
+        ):
+            if rows:
+                self.cur.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", rows_to_csv(rows))
+
+    def _truncate(self):
+        print(f"Clearing existing data from '{self.table_name}'...")
+        self.cur.execute(
+            f"TRUNCATE TABLE movie_neighbors, movie_genres, movie_people, genres, people, {self.table_name} RESTART IDENTITY;"
+        )
+
+    def _ingest_links(self, movie_ids, df):
+        """Fill genres, people and the movie_* association tables from the text columns."""
+        links = build_links(zip(movie_ids, df["genre"], df["directors"], df["stars"]))
+        execute_values(self.cur, "INSERT INTO genres (id, name, key) VALUES %s", links.genres)
+        execute_values(self.cur, "INSERT INTO people (id, name, key) VALUES %s", links.people)
+        execute_values(self.cur, "INSERT INTO movie_genres (movie_id, genre_id) VALUES %s", links.movie_genres)
+        execute_values(
+            self.cur, "INSERT INTO movie_people (movie_id, person_id, role) VALUES %s", links.movie_people
+        )
+        print(
+            f"Linked {len(links.genres)} genres and {len(links.people)} people "
+            f"({len(links.movie_genres)} + {len(links.movie_people)} associations)."
+        )
+
     def run(self):
         """Runs the complete ingestion process."""
         try:
             self._connect()
             self._create_movies_table()
-            self._ingest_csv_data()
+            if self.mode == "copy":
+                self._stream_csv_data()
+            else:
+                self._ingest_csv_data()
         except Exception as e:
             print(f"Ingestion failed: {e}", file=sys.stderr)
             # sys.exit(1) # Optional exit on failure
@@ -177,20 +373,27 @@ class PostgresIngester:
                 print("Database connection closed.")
 
 
-if __name__ == "__main__":
-    # --- Configuration ---
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load the processed movie CSV into PostgreSQL")
     # Ensure this points to your final processed CSV file (the one without 'link')
-    CSV_FILE = "ingestion/data/final.csv"  # Make sure this is the correct filename
-    # ---------------------
+    parser.add_argument("--csv", default="ingestion/data/final.csv", help="Processed CSV file")
+    parser.add_argument("--mode", choices=["copy", "insert"], default="copy",
+                        help="copy: chunked COPY streaming (bounded memory); insert: whole file via execute_values")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="copy mode: CSV rows per chunk")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
 
     try:
         # Check for DB env vars before initializing
         if not all([os.getenv("DB_NAME"), os.getenv("DB_USER"), os.getenv("DB_PASSWORD")]):
             raise ValueError("Missing required DB environment variables.")
-        if not os.path.exists(CSV_FILE):
-            raise FileNotFoundError(f"Input CSV file not found: {CSV_FILE}")
+        if not os.path.exists(args.csv):
+            raise FileNotFoundError(f"Input CSV file not found: {args.csv}")
 
-        ingester = PostgresIngester(csv_filepath=CSV_FILE)
+        ingester = PostgresIngester(csv_filepath=args.csv, mode=args.mode, chunk_size=args.chunk_size)
         ingester.run()
     except (ValueError, FileNotFoundError) as init_error:
         print(f"Initialization failed: {init_error}", file=sys.stderr)
@@ -1,13 +1,34 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from src import metrics
 from src.movies.views import router as movie_router
 from src.search.views import router as search_router
+from src.startup import readiness, shut_down, warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so liveness checks answer while /ready is still 503
+    readiness.reset()
+    warmup_task = asyncio.create_task(readiness.run(warm_up))
+    try:
+        yield
+    finally:
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+        await shut_down()
+
 
 app = FastAPI(
     title="FlickFindr API",
     description="Movie search API with hybrid semantic + structural search",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS configuration
@@ -29,3 +50,16 @@ app.include_router(search_router)
 @app.get("/")
 async def index():
     return {"message": "API is running !!!"}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until the model and DB pool are warmed up."""
+    status = readiness.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """In-process counters and histograms for this worker."""
+    return metrics.snapshot()
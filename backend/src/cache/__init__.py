@@ -0,0 +1,18 @@
+# Caching primitives for FlickFindr
+from .local import TTLCache
+from .shared import RedisBytesCache, RedisJsonCache, RedisVectorCache, get_redis
+from .responses import ResponseCache, request_fingerprint
+from .singleflight import SingleFlight
+from .snapshot import VersionedSnapshot
+
+__all__ = [
+    "RedisBytesCache",
+    "RedisJsonCache",
+    "RedisVectorCache",
+    "ResponseCache",
+    "SingleFlight",
+    "TTLCache",
+    "VersionedSnapshot",
+    "get_redis",
+    "request_fingerprint",
+]
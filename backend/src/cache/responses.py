@@ -0,0 +1,191 @@
+"""
+Response cache for read-only search endpoints.
+
+Entries are pre-serialized JSON bytes keyed by endpoint, catalog version and
+a canonical hash of the request model, so a hit skips SQL, query embedding
+and Pydantic validation/serialization entirely. An in-process LRU tier sits
+in front of an optional Redis tier shared by every worker.
+
+An entry is fresh for `ttl` seconds. For another `stale_ttl` seconds it is
+still served, while a single background task recomputes it
+(stale-while-revalidate). A catalog version bump changes every key, so a
+response never outlives the catalog it was computed from.
+
+Concurrent misses for the same key are coalesced: one request computes,
+the rest wait for its body (see `SingleFlight`).
+"""
+
+import asyncio
+import hashlib
+import json
+import struct
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from ..logging import logger
+from .local import TTLCache
+from .shared import RedisBytesCache
+from .singleflight import SingleFlight
+from .snapshot import VersionedSnapshot
+
+# Shared-tier values are the creation time (wall clock, comparable across
+# workers) followed by the body
+_CREATED_AT = struct.Struct(">d")
+
+
+def request_fingerprint(request: BaseModel) -> str:
+    """Canonical hash of a request: field order, defaults and enum spelling don't matter."""
+    payload = json.dumps(request.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+class ResponseCache:
+    """Pre-serialized responses of one endpoint, with stale-while-revalidate."""
+
+    def __init__(
+        self,
+        name: str,
+        version: VersionedSnapshot,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        maxsize: int = 1024,
+        shared: Optional[RedisBytesCache] = None,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.name = name
+        self.version = version
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl + stale_ttl)
+        self.shared = shared
+        self.enabled = enabled
+        self._clock = clock
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.flight: SingleFlight[bytes] = SingleFlight(name)
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_errors = 0
+        self.version_errors = 0
+
+    def key_for(self, request: BaseModel, version: int) -> str:
+        return f"{self.name}:v{version}:{request_fingerprint(request)}"
+
+    async def get_or_compute(
+        self, db: AsyncSession, request: BaseModel, compute: Callable[[AsyncSession], Awaitable[bytes]]
+    ) -> Tuple[bytes, str]:
+        """
+        Return (body, status) for `request`; status is hit, stale, miss or bypass.
+
+        `compute(session)` renders the response body. On a stale hit it runs
+        later on a session of its own, after this request has finished.
+        """
+        if not self.enabled:
+            return await self._bypass(db, request, compute), "bypass"
+
+        try:
+            version = await self.version.get(db)
+        except Exception as e:
+            # Without a version there is no safe key: serve uncached rather than fail
+            self.version_errors += 1
+            logger.warning(f"Catalog version lookup for {self.name} failed, serving uncached: {e}")
+            await db.rollback()
+            return await self._bypass(db, request, compute), "bypass"
+
+        key = self.key_for(request, version)
+        entry = await self._lookup(key)
+        if entry is not None:
+            created_at, body = entry
+            if self._clock() - created_at < self.ttl:
+                self.hits += 1
+                return body, "hit"
+            self.stale_hits += 1
+            self._schedule_refresh(key, db.bind, compute)
+            return body, "stale"
+
+        async def compute_and_store() -> bytes:
+            # Only the single-flight leader gets here; coalesced followers are counted there
+            self.misses += 1
+            body = await compute(db)
+            await self._store(key, body)
+            return body
+
+        return await self.flight.do(key, compute_and_store), "miss"
+
+    async def _bypass(
+        self, db: AsyncSession, request: BaseModel, compute: Callable[[AsyncSession], Awaitable[bytes]]
+    ) -> bytes:
+        # Nothing is stored, but identical concurrent requests still share one computation
+        return await self.flight.do(f"{self.name}:{request_fingerprint(request)}", lambda: compute(db))
+
+    def _lifetime(self) -> float:
+        return self.ttl + self.stale_ttl
+
+    async def _lookup(self, key: str) -> Optional[Tuple[float, bytes]]:
+        entry = self.local.get(key)
+        if entry is not None or self.shared is None:
+            return entry
+
+        raw = await run_in_threadpool(self.shared.get, key)
+        if raw is None or len(raw) < _CREATED_AT.size:
+            return None
+        (created_at,) = _CREATED_AT.unpack_from(raw)
+        remaining = self._lifetime() - (self._clock() - created_at)
+        if remaining <= 0:
+            return None
+        entry = (created_at, raw[_CREATED_AT.size:])
+        self.local.set(key, entry, ttl=remaining)
+        return entry
+
+    async def _store(self, key: str, body: bytes) -> None:
+        created_at = self._clock()
+        self.local.set(key, (created_at, body))
+        if self.shared is not None:
+            ttl = max(1, int(self._lifetime()))
+            await run_in_threadpool(self.shared.set, key, _CREATED_AT.pack(created_at) + body, ttl)
+
+    def _schedule_refresh(self, key: str, bind, compute: Callable[[AsyncSession], Awaitable[bytes]]) -> None:
+        # One refresh per key at a time; concurrent stale hits share it
+        if key in self._refreshing:
+            return
+        task = asyncio.create_task(self._refresh(key, bind, compute))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: str, bind, compute: Callable[[AsyncSession], Awaitable[bytes]]) -> None:
+        try:
+            async with AsyncSession(bind=bind) as session:
+                body = await compute(session)
+            await self._store(key, body)
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.warning(f"Background refresh of {self.name} response failed: {e}")
+
+    async def wait_for_refreshes(self) -> None:
+        """Wait until in-flight background refreshes finish (tests, shutdown)."""
+        if self._refreshing:
+            await asyncio.gather(*self._refreshing.values(), return_exceptions=True)
+
+    def clear(self) -> None:
+        self.local.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "size": len(self.local),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refresh_errors": self.refresh_errors,
+            "version_errors": self.version_errors,
+            "coalesced": self.flight.coalesced,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+        }
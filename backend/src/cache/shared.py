@@ -0,0 +1,174 @@
+"""
+Redis-backed cache tier shared by every API worker.
+"""
+
+import hashlib
+import json
+import time
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from ..config import settings
+from ..logging import logger
+
+_client = None
+
+
+def get_redis():
+    """Return the process-wide Redis client (lazily created)."""
+    global _client
+    if _client is None:
+        import redis
+
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_socket_timeout,
+        )
+    return _client
+
+
+class RedisTier:
+    """
+    Base for values stored under `<namespace>:<key>` in the shared Redis.
+
+    Redis failures never fail a request: the cache backs off for
+    `retry_after` seconds and callers fall through to computing the value.
+    """
+
+    label = "Redis cache"
+
+    def __init__(self, namespace: str, ttl: int, client=None, retry_after: float = 30.0):
+        self.namespace = namespace
+        self.ttl = ttl
+        self._client = client
+        self.retry_after = retry_after
+        self._disabled_until = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def client(self):
+        return self._client if self._client is not None else get_redis()
+
+    def key_for(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+
+    def _record_error(self, action: str, error: Exception) -> None:
+        self.errors += 1
+        self._disabled_until = time.monotonic() + self.retry_after
+        logger.warning(f"{self.label} {action} failed, bypassing for {self.retry_after}s: {error}")
+
+    def _get_raw(self, key: str) -> Optional[bytes]:
+        if not self._available():
+            return None
+        try:
+            return self.client.get(self.key_for(key))
+        except Exception as e:
+            self._record_error("get", e)
+            return None
+
+    def _set_raw(self, key: str, raw: bytes, ttl: Optional[int] = None) -> None:
+        if not self._available():
+            return
+        try:
+            self.client.set(self.key_for(key), raw, ex=ttl or self.ttl)
+        except Exception as e:
+            self._record_error("set", e)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class RedisVectorCache(RedisTier):
+    """Stores float32 vectors as packed bytes under `<namespace>:<sha1(key)>`."""
+
+    label = "Redis vector cache"
+
+    def __init__(self, namespace: str, ttl: int, dim: int, client=None, retry_after: float = 30.0):
+        super().__init__(namespace, ttl, client=client, retry_after=retry_after)
+        self.dim = dim
+
+    def key_for(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{digest}"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return the cached vector for `key`, or None."""
+        if not self._available():
+            return None
+        raw = self._get_raw(key)
+        if raw is None or len(raw) != self.dim * 4:
+            if self._available():
+                self.misses += 1
+            return None
+        self.hits += 1
+        return np.frombuffer(raw, dtype=np.float32)
+
+    def set(self, key: str, vector: Sequence[float]) -> None:
+        """Store `vector` with the configured expiry."""
+        if not self._available():
+            return
+        self._set_raw(key, np.asarray(vector, dtype=np.float32).tobytes())
+
+
+class RedisJsonCache(RedisTier):
+    """Stores JSON-serializable values (catalog summaries) under `<namespace>:<key>`."""
+
+    label = "Redis JSON cache"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for `key`, or None."""
+        if not self._available():
+            return None
+        raw = self._get_raw(key)
+        if raw is None:
+            if self._available():
+                self.misses += 1
+            return None
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store `value` with the configured expiry."""
+        self._set_raw(key, json.dumps(value, separators=(",", ":")).encode())
+
+
+class RedisBytesCache(RedisTier):
+    """Stores opaque byte strings (pre-serialized responses) under `<namespace>:<key>`."""
+
+    label = "Redis response cache"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached bytes for `key`, or None."""
+        if not self._available():
+            return None
+        raw = self._get_raw(key)
+        if raw is None:
+            if self._available():
+                self.misses += 1
+            return None
+        self.hits += 1
+        return raw
+
+    def set(self, key: str, raw: bytes, ttl: Optional[int] = None) -> None:
+        """Store `raw` with the configured (or given) expiry."""
+        self._set_raw(key, raw, ttl)
@@ -0,0 +1,70 @@
+"""
+Request coalescing ("single flight") for identical in-flight work.
+
+When a popular search misses the cache, every concurrent request for it
+would otherwise embed the same query and run the same SQL. `SingleFlight`
+lets the first caller for a key (the leader) do the work while the others
+(followers) wait for, and share, its result or exception.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+from .. import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Coalesces concurrent `do(key, fn)` calls with the same key into one `fn()` call."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._leaders = metrics.counter(f"singleflight_{name}_leaders", f"{name}: computations started")
+        self._coalesced = metrics.counter(
+            f"singleflight_{name}_coalesced", f"{name}: requests that shared an in-flight computation"
+        )
+        self.leaders = 0
+        self.coalesced = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            self._coalesced.inc()
+            try:
+                # Shielded: a follower that gives up must not cancel the shared work
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    # The leader was cancelled (e.g. client disconnect), not us: try again
+                    return await self.do(key, fn)
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.leaders += 1
+        self._leaders.inc()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved; followers still re-raise it
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> dict:
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": self.in_flight}
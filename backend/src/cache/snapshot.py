@@ -0,0 +1,88 @@
+"""
+In-process snapshots of catalog-derived data, keyed by catalog version.
+
+Read-mostly endpoints (genre list, filter stats) return a value computed once
+per catalog version instead of querying on every request. The version is
+re-checked at most once per `refresh_interval` seconds, so between checks a
+request costs no database work at all.
+
+An optional shared Redis tier stores each version's value under its version
+number, so after a catalog change only the first worker runs the loader and
+the rest (and restarted workers) read the result from Redis.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Generic, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from ..db.catalog import get_catalog_version
+from .shared import RedisJsonCache
+
+T = TypeVar("T")
+
+
+class VersionedSnapshot(Generic[T]):
+    """Value loaded by `loader(db)` and reloaded when the catalog version changes."""
+
+    def __init__(
+        self,
+        loader: Callable[[AsyncSession], Awaitable[T]],
+        refresh_interval: float = 5.0,
+        shared: Optional[RedisJsonCache] = None,
+        encode: Callable[[T], Any] = lambda value: value,
+        decode: Callable[[Any], T] = lambda value: value,
+    ):
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        # Shared tier: values go through encode/decode to and from plain JSON
+        self.shared = shared
+        self.encode = encode
+        self.decode = decode
+        self.value: Optional[T] = None
+        self.version: Optional[int] = None
+        self.loads = 0
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.version is not None
+
+    def _is_fresh(self) -> bool:
+        return self.loaded and time.monotonic() - self._checked_at < self.refresh_interval
+
+    async def get(self, db: AsyncSession) -> T:
+        if self._is_fresh():
+            return self.value
+        async with self._lock:
+            if self._is_fresh():
+                return self.value
+            version = await get_catalog_version(db)
+            if version != self.version:
+                self.value = await self._load(db, version)
+                self.version = version
+            self._checked_at = time.monotonic()
+            return self.value
+
+    async def _load(self, db: AsyncSession, version: int) -> T:
+        key = f"v{version}"
+        if self.shared is not None:
+            # Sync Redis client: keep its network I/O off the event loop
+            cached = await run_in_threadpool(self.shared.get, key)
+            if cached is not None:
+                return self.decode(cached)
+
+        value = await self.loader(db)
+        self.loads += 1
+        if self.shared is not None:
+            await run_in_threadpool(self.shared.set, key, self.encode(value))
+        return value
+
+    def clear(self) -> None:
+        """Drop the snapshot; the next `get` reloads."""
+        self.value = None
+        self.version = None
+        self._checked_at = 0.0
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -9,6 +11,80 @@ class Settings(BaseSettings):
     db_password: str
     REDIS_URL: str = "redis://localhost:6379"
 
+    # Async connection pool (one pool per API worker)
+    db_pool_size: int = 20
+    db_max_overflow: int = 30
+    db_pool_timeout: float = 30.0
+    db_pool_warm_connections: int = 5
+
+    # Embedding inference backend: "torch" or "onnx"
+    embedding_backend: str = "torch"
+    # Load the model from a local directory (e.g. an ONNX export) instead of the Hub
+    embedding_model_path: Optional[str] = None
+    # ONNX graph inside the model repo, e.g. "onnx/model_qint8_avx2.onnx" (int8-quantized)
+    embedding_onnx_file: Optional[str] = None
+
+    # Where inference runs: "thread" (in-process) or "process" (pool of model processes)
+    embedding_execution: str = "thread"
+    embedding_processes: int = 0  # 0 = cpu_count // embedding_process_threads
+    embedding_process_threads: int = 1
+
+    # Semantic search engine: "postgres" (pgvector index) or "memory" (exact, in-process matrix)
+    semantic_search_engine: str = "postgres"
+    vector_index_refresh_seconds: float = 30.0
+
+    # Structural search: rows counted before total_mode=estimate reports "N+"
+    search_count_cap: int = 1000
+
+    # Hybrid search, mode=rrf: reciprocal rank fusion of keyword and vector top-k
+    hybrid_rrf_depth: int = 50  # candidates taken from each ranking
+    hybrid_rrf_k: int = 60  # rank smoothing constant: weight / (k + rank)
+    hybrid_keyword_weight: float = 1.0
+    hybrid_vector_weight: float = 1.0
+
+    # /search/semantic/batch: queries per embedding call + database round trip (one streamed chunk)
+    semantic_batch_chunk_size: int = 64
+
+    # Response cache for structural / hybrid search (pre-serialized JSON per request + catalog version)
+    response_cache_enabled: bool = True
+    response_cache_size: int = 2048
+    response_cache_stale_seconds: float = 300.0  # served stale while one background refresh runs
+    response_cache_redis_enabled: bool = False
+    structural_cache_ttl: float = 60.0
+    hybrid_cache_ttl: float = 300.0
+
+    # "More like this": neighbors precomputed per movie by ingestion/generate_embeddings.py
+    movie_neighbors_k: int = 20
+
+    # How often in-process catalog snapshots (genre counts, ...) re-check the catalog version
+    catalog_snapshot_refresh_seconds: float = 5.0
+    # Share each catalog version's snapshots (stats, genres) between workers through Redis
+    catalog_redis_cache_enabled: bool = False
+    catalog_redis_cache_ttl: int = 24 * 3600
+
+    # pgvector ANN index: "ivfflat" or "hnsw" (built by ingestion/generate_embeddings.py)
+    vector_index_type: str = "ivfflat"
+    ivfflat_lists: int = 100
+    hnsw_m: int = 16
+    hnsw_ef_construction: int = 64
+
+    # Query embedding cache (per process)
+    embedding_cache_enabled: bool = True
+    embedding_cache_size: int = 2048
+    embedding_cache_ttl: float = 3600.0
+    # Cache keys ignore case; correct for the default (uncased) model, set False for a cased one
+    embedding_model_uncased: bool = True
+
+    # Shared query embedding cache in Redis (across workers and restarts)
+    embedding_redis_cache_enabled: bool = False
+    embedding_redis_cache_ttl: int = 7 * 24 * 3600
+    redis_socket_timeout: float = 0.1
+
+    # Micro-batching of concurrent query embeddings
+    embedding_batching_enabled: bool = True
+    embedding_batch_max_size: int = 32
+    embedding_batch_max_wait_ms: float = 5.0
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -18,6 +94,10 @@ class Settings(BaseSettings):
     def DATABASE_URL(self) -> str:
         return f"postgresql://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return f"postgresql+asyncpg://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
+
 
 settings = Settings()
 
@@ -0,0 +1,84 @@
+"""
+Catalog version marker.
+
+Ingestion and embedding jobs bump the version after they change the movies
+table; in-process snapshots (vector index, caches) compare versions to know
+when to refresh instead of re-reading the catalog on every request.
+"""
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .entity import CatalogVersion, Genre, MovieGenre
+
+# Plain SQL for the psycopg2 ingestion scripts
+CREATE_CATALOG_VERSION_SQL = """
+    CREATE TABLE IF NOT EXISTS catalog_version (
+        id INTEGER PRIMARY KEY,
+        version BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMPTZ
+    )
+"""
+
+BUMP_CATALOG_VERSION_SQL = """
+    INSERT INTO catalog_version (id, version, updated_at) VALUES (1, 1, now())
+    ON CONFLICT (id) DO UPDATE
+    SET version = catalog_version.version + 1, updated_at = now()
+    RETURNING version
+"""
+
+# O(movie_genres) once per catalog change, so reads are O(genres)
+REFRESH_GENRE_COUNTS_SQL = """
+    UPDATE genres g
+    SET movie_count = (SELECT count(*) FROM movie_genres mg WHERE mg.genre_id = g.id)
+"""
+
+
+async def get_catalog_version(db: AsyncSession) -> int:
+    """Current catalog version (0 before the first ingestion run).
+
+    Databases ingested before the version marker existed have no
+    catalog_version table; they read as version 0 until the next ingestion
+    run creates it. The lookup runs in a savepoint so a missing table
+    doesn't abort the caller's transaction.
+    """
+    try:
+        async with db.begin_nested():
+            version = await db.scalar(select(CatalogVersion.version).where(CatalogVersion.id == 1))
+    except (OperationalError, ProgrammingError):
+        return 0
+    return version or 0
+
+
+async def refresh_genre_counts(db: AsyncSession) -> None:
+    """Recompute `Genre.movie_count` from movie_genres (caller commits)."""
+    count = select(func.count()).where(MovieGenre.genre_id == Genre.id).scalar_subquery()
+    await db.execute(update(Genre).values(movie_count=count))
+
+
+async def bump_catalog_version(db: AsyncSession) -> int:
+    """Increment the version from application code (and tests)."""
+    await refresh_genre_counts(db)
+    row = await db.get(CatalogVersion, 1)
+    if row is None:
+        row = CatalogVersion(id=1, version=0)
+        db.add(row)
+    row.version += 1
+    await db.commit()
+    return row.version
+
+
+def bump_catalog_version_sync(cur) -> int:
+    """Increment the version from a psycopg2 cursor (ingestion scripts).
+
+    Runs in the caller's transaction, so the bump commits with the data change.
+    Catalog summaries are refreshed first, so readers that see the new version
+    also see the new summaries.
+    """
+    cur.execute("SELECT to_regclass('movie_genres') IS NOT NULL")
+    if cur.fetchone()[0]:
+        cur.execute(REFRESH_GENRE_COUNTS_SQL)
+    cur.execute(CREATE_CATALOG_VERSION_SQL)
+    cur.execute(BUMP_CATALOG_VERSION_SQL)
+    return cur.fetchone()[0]
@@ -1,26 +1,48 @@
 from typing import Annotated
 
 from fastapi import Depends
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from pgvector.asyncpg import register_vector
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 
 from ..config import settings
+from ..logging import logger
 
-engine = create_engine(url=settings.DATABASE_URL)
-LocalSession = sessionmaker(autocommit=False, autoflush=True, bind=engine)
+engine = create_async_engine(
+    url=settings.ASYNC_DATABASE_URL,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_pre_ping=True,
+)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def register_vector_codec(dbapi_connection, connection_record):
+    """Exchange vector values with asyncpg in pgvector's binary format."""
+    try:
+        dbapi_connection.run_async(register_vector)
+    except ValueError as e:
+        # The vector extension does not exist yet (fresh database before ingestion)
+        logger.warning(f"pgvector codec not registered: {e}")
+
+
+LocalSession = async_sessionmaker(bind=engine, autoflush=True, expire_on_commit=False)
 Base = declarative_base()
 
 
-def init_db():
-    Base.metadata.create_all(bind=engine)
+async def init_db():
+    from .schema import apply_search_schema
 
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await apply_search_schema(conn)
 
-def get_db():
-    db = LocalSession()
-    try:
+
+async def get_db():
+    async with LocalSession() as db:
         yield db
-    finally:
-        db.close()
 
 
-DbSession = Annotated[Session, Depends(get_db)]
+DbSession = Annotated[AsyncSession, Depends(get_db)]
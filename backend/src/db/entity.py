@@ -1,7 +1,8 @@
-from pgvector.sqlalchemy import Vector
-from sqlalchemy import Column, Float, Integer, String, Text
+from sqlalchemy import BigInteger, Column, DateTime, Float, ForeignKey, Index, Integer, SmallInteger, String, Text
+from sqlalchemy.orm import deferred
 
 from .core import Base
+from .types import Float32Vector
 
 
 class Movie(Base):
@@ -19,8 +20,76 @@ class Movie(Base):
     votes = Column(String(20), nullable=True)
     gross = Column(String(20), nullable=True)
     poster_url = Column(Text, nullable=True)
-    plot_embedding = Column(Vector(384), nullable=True)
+    # Deferred: list and detail queries never need the vector, and decoding 384
+    # floats per row is wasted work. Select it explicitly where it is used;
+    # raiseload turns an accidental lazy load (an implicit query) into an error.
+    plot_embedding = deferred(Column(Float32Vector(384), nullable=True), raiseload=True)
 
     def __repr__(self):
         """Provides a helpful representation of the Movie object."""
         return f"<Movie(id={self.id}, name='{self.movie_name}', rating={self.rating})>"
+
+
+class Genre(Base):
+    """Distinct genre parsed from the comma-separated `Movie.genre` column."""
+
+    __tablename__ = "genres"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(100), nullable=False)
+    # Lower-cased name: the exact, case-insensitive lookup key for filters
+    key = Column(String(100), nullable=False, unique=True)
+    # Summary maintained by refresh_genre_counts() whenever the catalog version is bumped
+    movie_count = Column(Integer, nullable=False, default=0)
+
+
+class Person(Base):
+    """Distinct director or star parsed from `Movie.directors` / `Movie.stars`."""
+
+    __tablename__ = "people"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(255), nullable=False)
+    key = Column(String(255), nullable=False, unique=True)
+
+
+class MovieGenre(Base):
+    __tablename__ = "movie_genres"
+    __table_args__ = (Index("ix_movie_genres_genre_movie", "genre_id", "movie_id"),)
+
+    movie_id = Column(Integer, ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True)
+    genre_id = Column(Integer, ForeignKey("genres.id", ondelete="CASCADE"), primary_key=True)
+
+
+class MoviePerson(Base):
+    __tablename__ = "movie_people"
+    __table_args__ = (Index("ix_movie_people_person_role_movie", "person_id", "role", "movie_id"),)
+
+    DIRECTOR = "director"
+    STAR = "star"
+
+    movie_id = Column(Integer, ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True)
+    person_id = Column(Integer, ForeignKey("people.id", ondelete="CASCADE"), primary_key=True)
+    role = Column(String(16), primary_key=True)
+
+
+class MovieNeighbor(Base):
+    """Precomputed "more like this" list: a movie's top-N neighbors by plot embedding."""
+
+    __tablename__ = "movie_neighbors"
+
+    movie_id = Column(Integer, ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True)
+    # 1 = most similar; the primary key serves a movie's list in order
+    rank = Column(SmallInteger, primary_key=True, autoincrement=False)
+    neighbor_id = Column(Integer, ForeignKey("movies.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Float, nullable=False)
+
+
+class CatalogVersion(Base):
+    """Single-row marker bumped whenever ingestion or embedding jobs change the catalog."""
+
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,91 @@
+"""
+Normalization of the comma-separated genre / directors / stars columns.
+
+`build_links` turns movie rows into the rows for `genres`, `people`,
+`movie_genres` and `movie_people`. It is pure Python so the psycopg2 ingestion
+script and the ORM test fixtures share the same parsing and id assignment.
+`LinkBuilder` does the same incrementally for loaders that stream the catalog
+in chunks.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .entity import MoviePerson
+
+
+def split_names(value: Optional[str]) -> List[str]:
+    """Split "Crime, Drama" into ["Crime", "Drama"], dropping blanks and duplicates."""
+    if not value:
+        return []
+    names = (part.strip() for part in value.split(","))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def name_key(name: str) -> str:
+    """Case-insensitive lookup key stored in `Genre.key` / `Person.key`."""
+    return " ".join(name.split()).lower()
+
+
+class CatalogLinks(NamedTuple):
+    genres: List[Tuple[int, str, str]]  # (id, name, key)
+    people: List[Tuple[int, str, str]]  # (id, name, key)
+    movie_genres: List[Tuple[int, int]]  # (movie_id, genre_id)
+    movie_people: List[Tuple[int, int, str]]  # (movie_id, person_id, role)
+
+
+class _Registry:
+    """Assigns stable ids to names in first-seen order; the first spelling wins."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.rows: List[Tuple[int, str, str]] = []
+
+    def id_for(self, name: str) -> int:
+        key = name_key(name)
+        if key not in self.ids:
+            self.ids[key] = len(self.ids) + 1
+            self.rows.append((self.ids[key], name, key))
+        return self.ids[key]
+
+    def take_new(self) -> List[Tuple[int, str, str]]:
+        """Rows registered since the previous call (handed over, not retained)."""
+        new, self.rows = self.rows, []
+        return new
+
+
+MovieLinkSource = Tuple[int, Optional[str], Optional[str], Optional[str]]
+
+
+class LinkBuilder:
+    """
+    Incremental `build_links` for catalogs loaded in chunks.
+
+    Each `add` returns the genres and people first seen in that chunk plus
+    the chunk's association rows, so a loader can write them before the next
+    chunk; ids match what `build_links` assigns over the whole catalog. Only
+    the name -> id maps are kept between chunks.
+    """
+
+    def __init__(self):
+        self._genres = _Registry()
+        self._people = _Registry()
+
+    def add(self, movies: Iterable[MovieLinkSource]) -> CatalogLinks:
+        """Link (movie_id, genre, directors, stars) tuples of one chunk."""
+        movie_genres: List[Tuple[int, int]] = []
+        movie_people: List[Tuple[int, int, str]] = []
+
+        for movie_id, genre, directors, stars in movies:
+            genre_ids = dict.fromkeys(self._genres.id_for(name) for name in split_names(genre))
+            movie_genres.extend((movie_id, genre_id) for genre_id in genre_ids)
+
+            for role, value in ((MoviePerson.DIRECTOR, directors), (MoviePerson.STAR, stars)):
+                person_ids = dict.fromkeys(self._people.id_for(name) for name in split_names(value))
+                movie_people.extend((movie_id, person_id, role) for person_id in person_ids)
+
+        return CatalogLinks(self._genres.take_new(), self._people.take_new(), movie_genres, movie_people)
+
+
+def build_links(movies: Iterable[MovieLinkSource]) -> CatalogLinks:
+    """Build join-table rows from (movie_id, genre, directors, stars) tuples."""
+    return LinkBuilder().add(movies)
@@ -0,0 +1,68 @@
+"""
+Vectorized encoder for PostgreSQL's binary COPY format.
+
+Builds the whole `COPY ... FROM STDIN WITH (FORMAT binary)` payload with one
+numpy structured array instead of formatting every value as text, so bulk
+loads of embeddings never go through "[x,y,...]" strings.
+
+Only fixed-width, non-NULL columns are supported.
+"""
+
+from typing import Sequence, Tuple
+
+import numpy as np
+
+COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + (0).to_bytes(4, "big") + (0).to_bytes(4, "big")
+COPY_TRAILER = (-1).to_bytes(2, "big", signed=True)
+
+# Postgres binary send format of each supported column kind
+_SCALAR_DTYPES = {
+    "int2": ">i2",
+    "int4": ">i4",
+    "int8": ">i8",
+    "float4": ">f4",
+    "float8": ">f8",
+}
+
+
+def pack_binary_copy(columns: Sequence[Tuple[str, np.ndarray]]) -> bytes:
+    """
+    Encode rows for binary COPY.
+
+    Args:
+        columns: (kind, values) per column, where kind is one of int2, int4,
+            int8, float4, float8 (values shaped (n,)) or vector (values shaped (n, dim))
+
+    Returns:
+        Complete COPY payload including header and trailer
+    """
+    if not columns:
+        raise ValueError("at least one column is required")
+    n_rows = len(columns[0][1])
+
+    fields = [("n_fields", ">i2")]
+    for i, (kind, values) in enumerate(columns):
+        if len(values) != n_rows:
+            raise ValueError("all columns must have the same number of rows")
+        fields.append((f"len{i}", ">i4"))
+        if kind == "vector":
+            dim = values.shape[1]
+            fields += [(f"dim{i}", ">u2"), (f"unused{i}", ">u2"), (f"val{i}", ">f4", (dim,))]
+        elif kind in _SCALAR_DTYPES:
+            fields.append((f"val{i}", _SCALAR_DTYPES[kind]))
+        else:
+            raise ValueError(f"unsupported column kind '{kind}'")
+
+    rows = np.zeros(n_rows, dtype=np.dtype(fields))
+    rows["n_fields"] = len(columns)
+    for i, (kind, values) in enumerate(columns):
+        if kind == "vector":
+            dim = values.shape[1]
+            rows[f"len{i}"] = 4 + 4 * dim
+            rows[f"dim{i}"] = dim
+            rows[f"val{i}"] = values
+        else:
+            rows[f"len{i}"] = np.dtype(_SCALAR_DTYPES[kind]).itemsize
+            rows[f"val{i}"] = values
+
+    return COPY_HEADER + rows.tobytes() + COPY_TRAILER
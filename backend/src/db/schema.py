@@ -0,0 +1,93 @@
+"""
+Schema objects the ORM can't express portably.
+
+`Base.metadata.create_all` only creates tables and btree indexes. Postgres
+extensions, the generated tsvector column, GIN indexes and NULLS LAST sort
+indexes are declared here as idempotent DDL and applied both by `init_db`
+(async engine) and by the ingestion scripts (psycopg2 cursor). On other
+dialects (SQLite in tests) they are skipped.
+"""
+
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# (table, column) pairs filtered with ILIKE '%term%' or fuzzy matching. A leading
+# wildcard can't use a btree, but pg_trgm's GIN operator class serves ILIKE as
+# well as the similarity operators (`%`, `<%`). Genres are matched exactly
+# through movie_genres, so only names need trigram indexes.
+TRIGRAM_COLUMNS = (("movies", "movie_name"), ("people", "name"))
+
+# Superseded by the normalized join tables
+OBSOLETE_INDEXES = ("movies_genre_trgm_idx", "movies_directors_trgm_idx", "movies_stars_trgm_idx")
+
+# Weighted full-text document for keyword search: name (A) > people (B) > plot (C).
+# A STORED generated column stays in sync with every write, ingestion included.
+SEARCH_DOCUMENT_COLUMN = "search_document"
+TEXT_SEARCH_CONFIG = "english"
+
+SEARCH_DOCUMENT_SQL = f"""
+    ALTER TABLE movies ADD COLUMN IF NOT EXISTS {SEARCH_DOCUMENT_COLUMN} tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(movie_name, '')), 'A') ||
+        setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(directors, '') || ' ' || coalesce(stars, '')), 'B') ||
+        setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(plot, '')), 'C')
+    ) STORED
+"""
+
+SEARCH_DOCUMENT_INDEX_SQL = (
+    f"CREATE INDEX IF NOT EXISTS movies_{SEARCH_DOCUMENT_COLUMN}_idx "
+    f"ON movies USING gin ({SEARCH_DOCUMENT_COLUMN})"
+)
+
+# Sort keys for keyset pagination. Each gets one index per direction so that
+# "ORDER BY col <dir> NULLS LAST, id <dir>" after a cursor is an index range scan
+# (a backward scan of an ASC NULLS LAST index yields NULLS FIRST, not LAST).
+KEYSET_SORT_COLUMNS = ("rating", "runtime", "movie_name", "metascore")
+
+
+def keyset_index_sql(column: str, direction: str) -> str:
+    return (
+        f"CREATE INDEX IF NOT EXISTS movies_{column}_{direction.lower()}_keyset_idx "
+        f"ON movies ({column} {direction} NULLS LAST, id {direction})"
+    )
+
+
+def trigram_index_name(table: str, column: str) -> str:
+    return f"{table}_{column}_trgm_idx"
+
+
+def trigram_index_sql(table: str, column: str) -> str:
+    return (
+        f"CREATE INDEX IF NOT EXISTS {trigram_index_name(table, column)} "
+        f"ON {table} USING gin ({column} gin_trgm_ops)"
+    )
+
+
+def search_schema_ddl() -> List[str]:
+    """Extension, column and index DDL for substring / fuzzy / keyword search and keyset paging, in apply order."""
+    statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+    statements += [trigram_index_sql(table, column) for table, column in TRIGRAM_COLUMNS]
+    statements += [SEARCH_DOCUMENT_SQL, SEARCH_DOCUMENT_INDEX_SQL]
+    statements += [
+        keyset_index_sql(column, direction)
+        for column in KEYSET_SORT_COLUMNS
+        for direction in ("ASC", "DESC")
+    ]
+    statements += [f"DROP INDEX IF EXISTS {name}" for name in OBSOLETE_INDEXES]
+    return statements
+
+
+async def apply_search_schema(conn: AsyncConnection) -> None:
+    """Apply the search DDL through an async connection (Postgres only)."""
+    if conn.dialect.name != "postgresql":
+        return
+    for statement in search_schema_ddl():
+        await conn.execute(text(statement))
+
+
+def apply_search_schema_sync(cur) -> None:
+    """Apply the search DDL from a psycopg2 cursor, in the caller's transaction."""
+    for statement in search_schema_ddl():
+        cur.execute(statement)
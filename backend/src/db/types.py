@@ -0,0 +1,43 @@
+"""
+Column and parameter types for pgvector embeddings.
+"""
+
+import numpy as np
+from pgvector import Vector
+from pgvector.sqlalchemy import VECTOR
+
+
+class Float32Vector(VECTOR):
+    """
+    pgvector type that moves float32 numpy arrays in both directions.
+
+    On asyncpg (where `core.py` registers pgvector's binary codec) vectors are
+    sent and received in pgvector's binary wire format instead of being
+    formatted to and parsed from "[x,y,...]" text. Other drivers fall back to
+    the text form.
+    """
+
+    cache_ok = True
+
+    def bind_processor(self, dialect):
+        if dialect.driver != "asyncpg":
+            return super().bind_processor(dialect)
+
+        def process(value):
+            if value is None or isinstance(value, Vector):
+                return value
+            return np.asarray(value, dtype=np.float32)
+
+        return process
+
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            if value is None:
+                return None
+            if isinstance(value, Vector):
+                return value.to_numpy()
+            if isinstance(value, str):
+                return np.array(Vector._from_text(value), dtype=np.float32)
+            return np.asarray(value, dtype=np.float32)
+
+        return process
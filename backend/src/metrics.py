@@ -0,0 +1,96 @@
+"""
+Lightweight in-process metrics (counters and histograms) exposed at /metrics.
+"""
+
+import bisect
+import threading
+from typing import Callable, Dict, List, Sequence
+
+# Default latency buckets in milliseconds
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class Counter:
+    """Monotonically increasing counter."""
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> dict:
+        return {"type": "counter", "description": self.description, "value": self.value}
+
+
+class Histogram:
+    """Fixed-bucket histogram; bucket counts are cumulative like Prometheus `le`."""
+
+    def __init__(self, name: str, description: str = "", buckets: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.name = name
+        self.description = description
+        self.buckets: List[float] = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative, running = {}, 0
+            for bound, count in zip(self.buckets, self._counts):
+                running += count
+                cumulative[str(bound)] = running
+            cumulative["+Inf"] = self.count
+            return {
+                "type": "histogram",
+                "description": self.description,
+                "count": self.count,
+                "sum": round(self.sum, 4),
+                "buckets": cumulative,
+            }
+
+
+_metrics: Dict[str, object] = {}
+_collectors: Dict[str, Callable[[], dict]] = {}
+_registry_lock = threading.Lock()
+
+
+def counter(name: str, description: str = "") -> Counter:
+    """Get or create the counter `name`."""
+    with _registry_lock:
+        if name not in _metrics:
+            _metrics[name] = Counter(name, description)
+        return _metrics[name]
+
+
+def histogram(name: str, description: str = "", buckets: Sequence[float] = LATENCY_BUCKETS_MS) -> Histogram:
+    """Get or create the histogram `name`."""
+    with _registry_lock:
+        if name not in _metrics:
+            _metrics[name] = Histogram(name, description, buckets)
+        return _metrics[name]
+
+
+def register_collector(name: str, collect: Callable[[], dict]) -> None:
+    """Register a callable whose dict output is included in the snapshot."""
+    _collectors[name] = collect
+
+
+def snapshot() -> dict:
+    """All registered metrics and collector outputs."""
+    data = {name: metric.snapshot() for name, metric in sorted(_metrics.items())}
+    for name, collect in sorted(_collectors.items()):
+        data[name] = collect()
+    return data
@@ -19,3 +19,24 @@ class MovieResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class MovieSummary(BaseModel):
+    """Compact movie card for list and grid views."""
+
+    id: int
+    movie_name: str
+    rating: Optional[float] = None
+    runtime: Optional[int] = None
+    genre: Optional[str] = None
+    metascore: Optional[float] = None
+    poster_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class SimilarMovie(MovieSummary):
+    """Movie card in a "more like this" list."""
+
+    similarity_score: float
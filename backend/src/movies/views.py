@@ -5,27 +5,65 @@
 
 # need pagination
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
+from sqlalchemy import select
 
 from ..db.core import DbSession
-from ..db.entity import Movie
+from ..db.entity import Movie, MovieNeighbor, MoviePerson
 from ..logging import logger
-from .models import MovieResponse
+from ..search.pagination import InvalidCursor, decode_cursor, encode_cursor
+from ..search.service import SUMMARY_COLUMNS, genre_filter, person_filter
+from .models import MovieResponse, MovieSummary, SimilarMovie
 
 router = APIRouter(prefix="/flicks")
 
 
+async def fetch_page_by_id(
+    db, response: Response, query, limit: int, skip: int, cursor: Optional[str], entities: bool = True
+) -> list:
+    """One page of `query` in id order, by offset or by keyset cursor (X-Next-Cursor).
+
+    Returns Movie entities, or plain rows when `entities` is False (column projections).
+    """
+    query = query.order_by(Movie.id)
+    if cursor:
+        # Keyset page: primary-key range scan, independent of depth
+        _, last_id = decode_cursor(cursor, "id", "asc")
+        query = query.where(Movie.id > last_id)
+    else:
+        query = query.offset(skip)
+
+    # One extra row tells whether another page exists
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.scalars().all() if entities else result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if has_more and rows:
+        last_id = rows[-1].id
+        response.headers["X-Next-Cursor"] = encode_cursor("id", "asc", last_id, last_id)
+    return rows
+
+
 @router.get("/")
-async def get_movies(db: DbSession, skip: int = Query(ge=0), limit: int = Query(ge=0)) -> List[MovieResponse]:
+async def get_movies(
+    db: DbSession,
+    response: Response,
+    limit: int = Query(ge=0),
+    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+) -> List[MovieResponse]:
     try:
-        movies = db.query(Movie).offset(skip).limit(limit).all()
-        if not movies:
+        # Full rows minus the deferred plot_embedding
+        rows = await fetch_page_by_id(db, response, select(Movie), limit, skip, cursor)
+        if not rows:
             raise HTTPException(status_code=404, detail="Movies not found")
         logger.info("Movies fetched")
-        return movies
+        return rows
 
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -33,13 +71,40 @@ async def get_movies(db: DbSession, skip: int = Query(ge=0), limit: int = Query(
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+@router.get("/summary")
+async def get_movie_summaries(
+    db: DbSession,
+    response: Response,
+    limit: int = Query(ge=0),
+    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+) -> List[MovieSummary]:
+    try:
+        # Column projection: plain rows, no ORM entity hydration
+        rows = await fetch_page_by_id(
+            db, response, select(*SUMMARY_COLUMNS), limit, skip, cursor, entities=False
+        )
+        if not rows:
+            raise HTTPException(status_code=404, detail="Movies not found")
+        logger.info("Movie summaries fetched")
+        return [MovieSummary.model_validate(row) for row in rows]
+
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Could not fetch movie summaries: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
 @router.get("/movie/{movie_id}")
 async def get_movie_by_id(
     db: DbSession,
     movie_id: int,
 ) -> MovieResponse:
     try:
-        movie = db.query(Movie).filter(Movie.id == movie_id).first()
+        movie = await db.get(Movie, movie_id)
         if not movie:
             raise HTTPException(status_code=404, detail=f"Movie not found for ID: {movie_id}")
         logger.info(f"Found movie: {movie} for ID: {movie_id}")
@@ -52,6 +117,36 @@ async def get_movie_by_id(
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+@router.get("/movie/{movie_id}/similar")
+async def get_similar_movies(
+    db: DbSession,
+    movie_id: int,
+    limit: int = Query(10, ge=1, le=100),
+) -> List[SimilarMovie]:
+    """Movies most similar to `movie_id`, from the precomputed movie_neighbors lists."""
+    try:
+        # One primary-key range read on (movie_id, rank), joined to the neighbor cards
+        query = (
+            select(*SUMMARY_COLUMNS, MovieNeighbor.score.label("similarity_score"))
+            .join(MovieNeighbor, MovieNeighbor.neighbor_id == Movie.id)
+            .where(MovieNeighbor.movie_id == movie_id)
+            .order_by(MovieNeighbor.rank)
+            .limit(limit)
+        )
+        rows = (await db.execute(query)).all()
+        # An empty list is only an error when the movie itself doesn't exist
+        if not rows and not await db.scalar(select(Movie.id).where(Movie.id == movie_id)):
+            raise HTTPException(status_code=404, detail=f"Movie not found for ID: {movie_id}")
+        logger.info(f"Found {len(rows)} similar movies for ID: {movie_id}")
+        return [SimilarMovie.model_validate(row) for row in rows]
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching similar movies for ID: {movie_id}: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
 @router.get("/filter")
 async def filter_movies(
     db: DbSession,
@@ -62,16 +157,16 @@ async def filter_movies(
     limit: int = Query(10, ge=0),
 ):
     try:
-        query = db.query(Movie)
+        query = select(Movie)
 
         if genre:
-            query = query.filter(Movie.genre.ilike(f"%{genre}%"))
+            query = query.where(genre_filter(genre))
         if directors:
-            query = query.filter(Movie.directors.ilike(f"%{directors}%"))
+            query = query.where(person_filter(MoviePerson.DIRECTOR, directors))
         if stars:
-            query = query.filter(Movie.stars.ilike(f"%{stars}%"))
+            query = query.where(person_filter(MoviePerson.STAR, stars))
 
-        movies = query.offset(skip).limit(limit).all()
+        movies = (await db.scalars(query.offset(skip).limit(limit))).all()
 
         if not movies:
             raise HTTPException(status_code=404, detail="No movies found for matching criteria")
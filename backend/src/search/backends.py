@@ -0,0 +1,53 @@
+"""
+Pluggable inference backends for the sentence embedding model.
+
+Every backend returns a `SentenceTransformer` exposing the same `encode` API,
+so callers never need to know which runtime is underneath:
+
+- ``torch``: the default PyTorch model.
+- ``onnx``: an exported ONNX graph run through onnxruntime. Point
+  ``EMBEDDING_ONNX_FILE`` at a dynamically int8-quantized export (see
+  ``ingestion/export_onnx.py``) for the fastest CPU inference.
+"""
+
+from pathlib import PurePosixPath
+from typing import Optional
+
+from ..logging import logger
+
+BACKENDS = ("torch", "onnx")
+
+
+def backend_label(backend: str, onnx_file: Optional[str] = None) -> str:
+    """Short identifier of a backend variant, e.g. ``onnx-model_qint8_avx2``.
+
+    Quantized graphs produce slightly different vectors, so cache namespaces
+    include this label.
+    """
+    if backend == "onnx" and onnx_file:
+        return f"onnx-{PurePosixPath(onnx_file).stem}"
+    return backend
+
+
+def load_embedding_model(model_name: str, backend: str, onnx_file: Optional[str], expected_dim: int):
+    """Load `model_name` on the requested backend and check its output size."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {BACKENDS}")
+
+    from sentence_transformers import SentenceTransformer
+
+    kwargs = {}
+    if backend == "onnx":
+        kwargs["backend"] = "onnx"
+        if onnx_file:
+            kwargs["model_kwargs"] = {"file_name": onnx_file}
+
+    logger.info(f"Loading embedding model: {model_name} ({backend_label(backend, onnx_file)})")
+    model = SentenceTransformer(model_name, device="cpu" if backend == "onnx" else None, **kwargs)
+
+    dim = model.get_sentence_embedding_dimension()
+    if dim != expected_dim:
+        raise ValueError(
+            f"Embedding backend produced {dim}-dimension vectors, but plot_embedding stores {expected_dim}"
+        )
+    return model
@@ -0,0 +1,163 @@
+"""
+Dynamic micro-batching for query embeddings.
+
+Concurrent requests each need one query vector. Instead of running one
+`encode` per request, the scheduler collects queries that arrive within
+`max_wait_ms` of the first one (up to `max_batch_size`) and embeds them with a
+single batched `encode` call. `encode_batch` may be a coroutine function (e.g.
+dispatching to a process pool); plain functions run in the threadpool.
+
+Up to `max_in_flight` batches encode at once, so a pool of embedding
+processes gets one batch per process instead of a single busy worker.
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Callable, List, Optional, Sequence, Set, Union
+
+from starlette.concurrency import run_in_threadpool
+
+from .. import metrics
+from ..logging import logger
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+batch_size_histogram = metrics.histogram(
+    "embedding_batch_size", "Queries per batched encode call", BATCH_SIZE_BUCKETS
+)
+queue_wait_histogram = metrics.histogram(
+    "embedding_queue_wait_ms", "Time a query waited before its batch started encoding"
+)
+encode_time_histogram = metrics.histogram(
+    "embedding_batch_encode_ms", "Wall time of one batched encode call"
+)
+
+
+class SchedulerClosed(RuntimeError):
+    """Raised to queries that were still queued when the batcher closed."""
+
+
+def _fail(batch: list, error: Exception) -> None:
+    for _, future, _ in batch:
+        if not future.done():
+            future.set_exception(error)
+
+
+class EmbeddingBatcher:
+    """Collects concurrent `embed` calls into batched `encode_batch` calls."""
+
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str]], Sequence[Sequence[float]]],  # or async
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        max_in_flight: Union[int, Callable[[], int]] = 1,  # or resolved per batch
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.encode_batch = encode_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_in_flight = max_in_flight
+        self._in_flight: Set[asyncio.Task] = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            # Queues and tasks are bound to one event loop; start fresh on a new one
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._in_flight = set()
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed one text as part of the next batch."""
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((text, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> list:
+        queue = self._queue
+        batch = [await queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        try:
+            while len(batch) < self.max_batch_size:
+                # Drain anything already queued without waiting
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # Closed while this batch was filling up: its queries are out of the queue already
+            _fail(batch, SchedulerClosed("Embedding scheduler is shutting down"))
+            raise
+        return batch
+
+    def _in_flight_limit(self) -> int:
+        limit = self.max_in_flight() if callable(self.max_in_flight) else self.max_in_flight
+        return max(1, limit)
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            self._in_flight.add(asyncio.create_task(self._encode(batch)))
+            # Collect the next batch right away unless max_in_flight batches are still encoding
+            while len(self._in_flight) >= self._in_flight_limit():
+                _, self._in_flight = await asyncio.wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+    async def _encode(self, batch: list) -> None:
+        started = time.perf_counter()
+        for _, _, enqueued_at in batch:
+            queue_wait_histogram.observe((started - enqueued_at) * 1000)
+        batch_size_histogram.observe(len(batch))
+
+        texts = [text for text, _, _ in batch]
+        try:
+            if inspect.iscoroutinefunction(self.encode_batch):
+                vectors = await self.encode_batch(texts)
+            else:
+                vectors = await run_in_threadpool(self.encode_batch, texts)
+        except Exception as e:
+            logger.error(f"Batched embedding failed for {len(texts)} queries: {e}")
+            _fail(batch, e)
+            return
+        finally:
+            encode_time_histogram.observe((time.perf_counter() - started) * 1000)
+
+        for (_, future, _), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    async def close(self) -> None:
+        """Stop the background worker.
+
+        Batches already encoding finish; queries still queued fail with
+        SchedulerClosed instead of leaving their callers waiting forever.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+            self._in_flight = set()
+        if self._queue is not None:
+            pending = []
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            _fail(pending, SchedulerClosed("Embedding scheduler is shutting down"))
@@ -1,31 +1,158 @@
 """
 Embedding generation service using sentence-transformers.
+
+The inference runtime (PyTorch or ONNX Runtime) is chosen by
+`settings.embedding_backend`; see `backends.py`.
 """
 
+import hashlib
+from pathlib import PurePosixPath
 from typing import List, Optional
 import numpy as np
+from starlette.concurrency import run_in_threadpool
 
+from .. import metrics
+from ..cache import RedisVectorCache, TTLCache
+from ..config import settings
 from ..logging import logger
+from .backends import backend_label, load_embedding_model
+from .batching import EmbeddingBatcher
+from .workers import EmbeddingProcessPool
+
+# Embedding model and dimension constants
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_DIM = 384
 
 # Lazy loading of model to avoid slow import times
 _model = None
 
+# Long-lived embedding processes, used when settings.embedding_execution == "process"
+_process_pool: Optional[EmbeddingProcessPool] = None
+
+# Query embeddings keyed by normalized text; repeated queries skip the model
+_query_cache = TTLCache(maxsize=settings.embedding_cache_size, ttl=settings.embedding_cache_ttl)
+
+
+
+def shared_cache_namespace() -> str:
+    """Redis namespace of the model actually loaded.
+
+    Covers the model path (or Hub name), backend variant, dimension and key
+    casing, so pointing a deployment at another model never serves its
+    predecessor's vectors.
+    """
+    model = settings.embedding_model_path or EMBEDDING_MODEL_NAME
+    label = backend_label(settings.embedding_backend, settings.embedding_onnx_file)
+    identity = f"{model}|{label}|{EMBEDDING_DIM}|uncased={settings.embedding_model_uncased}"
+    digest = hashlib.sha256(identity.encode()).hexdigest()[:12]
+    return f"flickfindr:emb:{PurePosixPath(model).name}:{EMBEDDING_DIM}:{label}:{digest}"
+
+
+# Shared tier, namespaced per model so a change never serves stale vectors
+_shared_cache = RedisVectorCache(
+    namespace=shared_cache_namespace(),
+    ttl=settings.embedding_redis_cache_ttl,
+    dim=EMBEDDING_DIM,
+)
+
 
 def get_model():
     """Load the embedding model (lazy loading)."""
     global _model
     if _model is None:
-        from sentence_transformers import SentenceTransformer
-        logger.info("Loading embedding model: all-MiniLM-L6-v2")
-        _model = SentenceTransformer("all-MiniLM-L6-v2")
+        _model = load_embedding_model(
+            settings.embedding_model_path or EMBEDDING_MODEL_NAME,
+            backend=settings.embedding_backend,
+            onnx_file=settings.embedding_onnx_file,
+            expected_dim=EMBEDDING_DIM,
+        )
         logger.info("Embedding model loaded successfully")
     return _model
 
 
+def get_process_pool() -> EmbeddingProcessPool:
+    """Create the embedding process pool (lazy; processes start on first use)."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = EmbeddingProcessPool(
+            settings.embedding_model_path or EMBEDDING_MODEL_NAME,
+            backend=settings.embedding_backend,
+            onnx_file=settings.embedding_onnx_file,
+            expected_dim=EMBEDDING_DIM,
+            processes=settings.embedding_processes,
+            threads_per_process=settings.embedding_process_threads,
+        )
+    return _process_pool
+
+
+def uses_process_pool() -> bool:
+    return settings.embedding_execution == "process"
+
+
+def normalize_query(text: str) -> str:
+    """Canonical cache key for a query: collapsed whitespace, lowercased for uncased models.
+
+    all-MiniLM-L6-v2 uses an uncased tokenizer, so case never changes the
+    vector; `embedding_model_uncased` must be turned off for a cased model.
+    """
+    if settings.embedding_model_uncased:
+        text = text.lower()
+    return " ".join(text.split())
+
+
+def embedding_cache_info() -> dict:
+    """Hit/miss counters for the query embedding cache tiers."""
+    return {
+        "enabled": settings.embedding_cache_enabled,
+        **_query_cache.stats(),
+        "shared": {"enabled": settings.embedding_redis_cache_enabled, **_shared_cache.stats()},
+    }
+
+
+def clear_embedding_cache() -> None:
+    _query_cache.clear()
+
+
+metrics.register_collector("embedding_cache", embedding_cache_info)
+
+
+def _zero_vector() -> np.ndarray:
+    return np.zeros(EMBEDDING_DIM, dtype=np.float32)
+
+
+def _cached_embedding(key: str) -> Optional[np.ndarray]:
+    """Look `key` up in the local tier, then the shared tier."""
+    if settings.embedding_cache_enabled:
+        cached = _query_cache.get(key)
+        if cached is not None:
+            return cached
+    
+    if settings.embedding_redis_cache_enabled:
+        shared = _shared_cache.get(key)
+        if shared is not None:
+            if settings.embedding_cache_enabled:
+                _query_cache.set(key, shared)
+            return shared
+    return None
+
+
+def _store_embedding(key: str, embedding: np.ndarray) -> None:
+    # Cached arrays are shared between callers, so freeze them
+    embedding.setflags(write=False)
+    if settings.embedding_cache_enabled:
+        _query_cache.set(key, embedding)
+    if settings.embedding_redis_cache_enabled:
+        _shared_cache.set(key, embedding)
+
+
 def generate_embedding(text: str) -> List[float]:
     """
     Generate embedding for a single text.
     
+    Served from the in-process cache, then the shared Redis tier, when the
+    normalized text was embedded recently; otherwise runs the model and
+    writes the result to both tiers.
+    
     Args:
         text: Input text to embed
         
@@ -36,46 +163,186 @@ def generate_embedding(text: str) -> List[float]:
         # Return zero vector for empty text
         return [0.0] * 384
     
-    model = get_model()
-    embedding = model.encode(text, convert_to_numpy=True)
+    key = normalize_query(text)
+    cached = _cached_embedding(key)
+    if cached is not None:
+        return cached.tolist()
+    
+    embedding = encode_queries([text])[0]
+    
+    _store_embedding(key, embedding)
     return embedding.tolist()
 
 
-def batch_generate_embeddings(texts: List[str], batch_size: int = 32) -> List[List[float]]:
+def encode_queries(texts: List[str]) -> np.ndarray:
+    """Run one batched model call for a list of short query texts.
+    
+    Returns a (len(texts), EMBEDDING_DIM) float32 array.
     """
-    Generate embeddings for multiple texts efficiently.
+    if uses_process_pool():
+        return get_process_pool().encode(texts, batch_size=len(texts))
+    model = get_model()
+    embeddings = model.encode(texts, batch_size=len(texts), show_progress_bar=False, convert_to_numpy=True)
+    return np.asarray(embeddings, dtype=np.float32).reshape(len(texts), -1)
+
+
+async def aencode_queries(texts: List[str]) -> np.ndarray:
+    """`encode_queries` for the event loop: awaits a worker process or the threadpool."""
+    if uses_process_pool():
+        return await get_process_pool().aencode(texts, batch_size=len(texts))
+    return await run_in_threadpool(encode_queries, texts)
+
+
+def _batch_concurrency() -> int:
+    """Batches encoded at once: one per embedding process, one at a time in thread mode."""
+    return get_process_pool().processes if uses_process_pool() else 1
+
+
+# Micro-batches concurrent query embeddings into one encode call
+_batcher = EmbeddingBatcher(
+    aencode_queries,
+    max_batch_size=settings.embedding_batch_max_size,
+    max_wait_ms=settings.embedding_batch_max_wait_ms,
+    max_in_flight=_batch_concurrency,
+)
+
+
+async def close_embedding_scheduler() -> None:
+    """Stop the micro-batching worker and embedding processes (on application shutdown)."""
+    await _batcher.close()
+    if _process_pool is not None:
+        await run_in_threadpool(_process_pool.shutdown)
+
+
+async def embed_query(text: str) -> np.ndarray:
+    """
+    Embed a search query from async request handlers.
+    
+    Returns a float32 array that is bound to SQL as a binary pgvector value;
+    it is never converted to a Python list or a "[x,y,...]" string.
+    
+    Same cache tiers as `generate_embedding`, but model inference never runs
+    on the event loop: misses go through the micro-batching scheduler, or
+    straight to the threadpool / process pool when batching is disabled.
+    """
+    if not text or not text.strip():
+        return _zero_vector()
+    
+    key = normalize_query(text)
+    if settings.embedding_redis_cache_enabled:
+        # The shared tier does network I/O, so keep it off the event loop
+        cached = await run_in_threadpool(_cached_embedding, key)
+    else:
+        cached = _cached_embedding(key)
+    if cached is not None:
+        return cached
+    
+    if settings.embedding_batching_enabled:
+        embedding = await _batcher.embed(text)
+    else:
+        embedding = (await aencode_queries([text]))[0]
+    
+    if settings.embedding_redis_cache_enabled:
+        await run_in_threadpool(_store_embedding, key, embedding)
+    else:
+        _store_embedding(key, embedding)
+    return embedding
+
+
+def _lookup_embeddings(keys: List[str]) -> List[Optional[np.ndarray]]:
+    return [_cached_embedding(key) for key in keys]
+
+
+def _store_embeddings(keys: List[str], embeddings: np.ndarray) -> None:
+    for key, embedding in zip(keys, embeddings):
+        _store_embedding(key, embedding)
+
+
+async def embed_queries(texts: List[str]) -> np.ndarray:
+    """
+    Embed many search queries at once (batch endpoints).
+
+    Same cache tiers as `embed_query`; all distinct misses go to the model in
+    a single encode call instead of one micro-batched call per query.
+
+    Returns a (len(texts), EMBEDDING_DIM) float32 array.
+    """
+    result = np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+    keys = [normalize_query(text) if text and text.strip() else None for text in texts]
+    unique_keys = list(dict.fromkeys(key for key in keys if key))
+    if not unique_keys:
+        return result
+
+    if settings.embedding_redis_cache_enabled:
+        # One threadpool hop for the whole batch of shared-tier lookups
+        cached = await run_in_threadpool(_lookup_embeddings, unique_keys)
+    else:
+        cached = _lookup_embeddings(unique_keys)
+    vectors = dict(zip(unique_keys, cached))
+
+    misses = [key for key, vector in vectors.items() if vector is None]
+    if misses:
+        # The key is the normalized text, which embeds the same (see normalize_query)
+        encoded = await aencode_queries(misses)
+        vectors.update(zip(misses, encoded))
+        if settings.embedding_redis_cache_enabled:
+            await run_in_threadpool(_store_embeddings, misses, encoded)
+        else:
+            _store_embeddings(misses, encoded)
+
+    for i, key in enumerate(keys):
+        if key:
+            result[i] = vectors[key]
+    return result
+
+
+def batch_embed(texts: List[Optional[str]], batch_size: int = 32) -> np.ndarray:
+    """
+    Generate embeddings for multiple texts as one float32 matrix.
     
     Args:
-        texts: List of texts to embed
+        texts: List of texts to embed (None/empty texts get zero vectors)
         batch_size: Batch size for processing
         
     Returns:
-        List of embedding vectors
+        (len(texts), EMBEDDING_DIM) float32 array
     """
-    model = get_model()
-    
     # Replace None/empty with placeholder
     processed_texts = [t if t and t.strip() else "" for t in texts]
     
     logger.info(f"Generating embeddings for {len(texts)} texts...")
-    embeddings = model.encode(
-        processed_texts,
-        batch_size=batch_size,
-        show_progress_bar=True,
-        convert_to_numpy=True
-    )
+    if uses_process_pool():
+        # Chunks are spread over all embedding processes
+        embeddings = get_process_pool().encode(processed_texts, batch_size=batch_size)
+    else:
+        model = get_model()
+        embeddings = model.encode(
+            processed_texts,
+            batch_size=batch_size,
+            show_progress_bar=True,
+            convert_to_numpy=True
+        )
+    
+    result = np.array(embeddings, dtype=np.float32).reshape(len(processed_texts), -1)
     
     # Replace zero vectors for empty texts
-    result = []
     for i, text in enumerate(processed_texts):
         if not text:
-            result.append([0.0] * 384)
-        else:
-            result.append(embeddings[i].tolist())
+            result[i] = 0.0
     
     logger.info(f"Generated {len(result)} embeddings")
     return result
 
 
-# Embedding dimension constant
-EMBEDDING_DIM = 384
+def batch_generate_embeddings(texts: List[str], batch_size: int = 32) -> List[List[float]]:
+    """
+    Generate embeddings for multiple texts efficiently.
+    
+    Args:
+        texts: List of texts to embed
+        batch_size: Batch size for processing
+        
+    Returns:
+        List of embedding vectors
+    """
+    return batch_embed(texts, batch_size=batch_size).tolist()
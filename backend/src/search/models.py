@@ -1,7 +1,9 @@
 from enum import Enum
-from typing import List, Optional
+from typing import Annotated, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+from ..movies.models import MovieSummary
 
 
 class SortOrder(str, Enum):
@@ -17,14 +19,48 @@ class SortBy(str, Enum):
     SIMILARITY = "similarity"
 
 
+class NameMatch(str, Enum):
+    """How `query` is matched: against the movie name, or as keywords over the whole record."""
+    SUBSTRING = "substring"
+    FUZZY = "fuzzy"
+    KEYWORD = "keyword"  # full-text search over name, people and plot
+
+
+class TotalMode(str, Enum):
+    """How `SearchResponse.total` is computed."""
+    EXACT = "exact"  # separate COUNT query
+    WINDOW = "window"  # COUNT(*) OVER () on the page query: one round trip, still exact
+    ESTIMATE = "estimate"  # count capped at `search_count_cap`; "1000+" for broad filters
+
+
+class HybridMode(str, Enum):
+    """How hybrid search ranks the filtered movies."""
+    VECTOR = "vector"  # cosine similarity only
+    RRF = "rrf"  # reciprocal rank fusion of full-text and vector rankings
+
+
+class SearchQuality(str, Enum):
+    """Recall/latency trade-off for the approximate vector index."""
+    FAST = "fast"
+    BALANCED = "balanced"
+    ACCURATE = "accurate"
+
+
 class StructuralSearchRequest(BaseModel):
     """Request model for structural search with multiple filter options."""
 
     # Text search
     query: Optional[str] = Field(None, description="Search query for movie name")
+    name_match: NameMatch = Field(
+        NameMatch.SUBSTRING,
+        description=(
+            "substring (case-insensitive contains) or fuzzy (typo-tolerant trigram similarity) on the name, "
+            "or keyword (full-text search over name, directors, stars and plot)"
+        ),
+    )
 
     # Categorical filters
-    genre: Optional[str] = Field(None, description="Filter by genre (partial match)")
+    genre: Optional[str] = Field(None, description="Filter by genre (exact name, case-insensitive)")
     directors: Optional[str] = Field(None, description="Filter by director name (partial match)")
     stars: Optional[str] = Field(None, description="Filter by actor name (partial match)")
 
@@ -35,12 +71,26 @@ class StructuralSearchRequest(BaseModel):
     max_runtime: Optional[int] = Field(None, description="Maximum runtime in minutes")
 
     # Sorting
-    sort_by: SortBy = Field(SortBy.RATING, description="Field to sort by")
+    sort_by: SortBy = Field(
+        SortBy.RATING,
+        description="Field to sort by (similarity: relevance to `query`; the default for fuzzy and keyword queries)",
+    )
     sort_order: SortOrder = Field(SortOrder.DESC, description="Sort order")
 
-    # Pagination
-    skip: int = Field(0, ge=0, description="Number of results to skip")
+    # Pagination: `cursor` (keyset, from the previous page's next_cursor) or `skip` (offset)
+    cursor: Optional[str] = Field(None, description="Opaque cursor from a previous response's next_cursor")
+    skip: int = Field(0, ge=0, description="Number of results to skip (ignored when cursor is set)")
     limit: int = Field(10, ge=1, le=100, description="Number of results to return")
+    total_mode: TotalMode = Field(TotalMode.EXACT, description="exact, window (single round trip) or estimate (capped)")
+
+    @model_validator(mode="after")
+    def rank_matches_by_relevance(self):
+        # Fuzzy and keyword searches are ranked searches: order by word_similarity / ts_rank_cd
+        # unless the client picked a sort
+        ranked = self.name_match in (NameMatch.FUZZY, NameMatch.KEYWORD)
+        if ranked and self.query and "sort_by" not in self.model_fields_set:
+            self.sort_by = SortBy.SIMILARITY
+        return self
 
 
 class SemanticSearchRequest(BaseModel):
@@ -48,6 +98,26 @@ class SemanticSearchRequest(BaseModel):
 
     query: str = Field(..., min_length=3, description="Natural language query describing the movie")
     limit: int = Field(10, ge=1, le=100, description="Number of results to return")
+    quality: Optional[SearchQuality] = Field(None, description="Vector index recall/latency tier (server default if omitted)")
+
+
+class GenreRowsRequest(BaseModel):
+    """Request model for the homepage: the top movies of several genres at once."""
+
+    genres: List[Annotated[str, Field(min_length=1)]] = Field(
+        ..., min_length=1, max_length=20, description="Genre names, one row each, in display order"
+    )
+    limit: int = Field(15, ge=1, le=50, description="Movies per row")
+
+
+class SemanticBatchRequest(BaseModel):
+    """Request model for many semantic searches in one call (offline jobs, partners)."""
+
+    queries: List[Annotated[str, Field(min_length=3)]] = Field(
+        ..., min_length=1, max_length=1000, description="Natural language queries, answered in order"
+    )
+    limit: int = Field(10, ge=1, le=100, description="Number of results per query")
+    quality: Optional[SearchQuality] = Field(None, description="Vector index recall/latency tier (server default if omitted)")
 
 
 class HybridSearchRequest(BaseModel):
@@ -65,8 +135,12 @@ class HybridSearchRequest(BaseModel):
     min_runtime: Optional[int] = Field(None, ge=0, description="Minimum runtime in minutes")
     max_runtime: Optional[int] = Field(None, description="Maximum runtime in minutes")
 
+    # Ranking
+    mode: HybridMode = Field(HybridMode.VECTOR, description="vector (semantic only) or rrf (keyword + semantic fusion)")
+
     # Pagination
     limit: int = Field(10, ge=1, le=100, description="Number of results to return")
+    quality: Optional[SearchQuality] = Field(None, description="Vector index recall/latency tier (server default if omitted)")
 
 
 class MovieResult(BaseModel):
@@ -94,10 +168,37 @@ class SearchResponse(BaseModel):
     """Paginated search response with metadata."""
 
     results: List[MovieResult]
-    total: int = Field(description="Total number of matching results")
+    total: int = Field(description="Total number of matching results (a lower bound when total_is_exact is false)")
+    total_is_exact: bool = Field(True, description="False when total is a capped estimate, e.g. 1000 meaning 1000+")
+    skip: int = Field(description="Number of results skipped")
+    limit: int = Field(description="Number of results returned")
+    has_more: bool = Field(description="Whether there are more results")
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+
+
+class SummarySearchResponse(BaseModel):
+    """Paginated structural search response with compact movie cards."""
+
+    results: List[MovieSummary]
+    total: int = Field(description="Total number of matching results (a lower bound when total_is_exact is false)")
+    total_is_exact: bool = Field(True, description="False when total is a capped estimate")
     skip: int = Field(description="Number of results skipped")
     limit: int = Field(description="Number of results returned")
     has_more: bool = Field(description="Whether there are more results")
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+
+
+class GenreRow(BaseModel):
+    """One genre's top-rated movies."""
+
+    genre: str = Field(description="Genre name as requested")
+    results: List[MovieSummary]
+
+
+class GenreRowsResponse(BaseModel):
+    """Rows for every requested genre, in request order (empty for unknown genres)."""
+
+    rows: List[GenreRow]
 
 
 class SemanticSearchResponse(BaseModel):
@@ -114,6 +215,20 @@ class SemanticSearchResponse(BaseModel):
         "Movies found matching your query",
         description="User-facing message about the results"
     )
+    timings: Optional[Dict[str, float]] = Field(
+        None, description="Per-stage latency in ms (hybrid rrf mode: keyword, embed, vector, hydrate)"
+    )
+
+
+class SemanticBatchResult(BaseModel):
+    """One line of the /search/semantic/batch NDJSON stream."""
+
+    index: int = Field(description="Position of the query in the request")
+    query: str
+    results: List[MovieResult] = Field(default_factory=list)
+    exact_matches: bool = False
+    message: str
+    error: Optional[str] = Field(None, description="Set when this query could not be answered")
 
 
 class MovieStats(BaseModel):
@@ -0,0 +1,89 @@
+"""
+Precomputed "more like this" neighbor lists.
+
+Every movie's top-k most similar movies (cosine similarity of plot
+embeddings) are computed offline by ingestion/generate_embeddings.py and
+stored in `movie_neighbors`, so /flicks/movie/{id}/similar is a primary-key
+range read: no model inference and no vector scan per page view.
+
+The whole catalog is scored with blocked matrix products: each block of
+`batch_size` normalized rows is multiplied against the full matrix, and the
+best k per row are picked with `argpartition`. Peak memory is one
+batch_size x n score block instead of the full n x n matrix.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+# Raw DDL for the psycopg2 ingestion scripts (mirrors MovieNeighbor in src/db/entity.py)
+MOVIE_NEIGHBORS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS movie_neighbors (
+    movie_id INTEGER REFERENCES movies (id) ON DELETE CASCADE,
+    rank SMALLINT,
+    neighbor_id INTEGER NOT NULL REFERENCES movies (id) ON DELETE CASCADE,
+    score REAL NOT NULL,
+    PRIMARY KEY (movie_id, rank)
+);
+"""
+
+
+class NeighborRows(NamedTuple):
+    """Flat, equal-length columns ready for binary COPY into movie_neighbors."""
+
+    movie_ids: np.ndarray  # int32
+    ranks: np.ndarray  # int16, 1 = most similar
+    neighbor_ids: np.ndarray  # int32
+    scores: np.ndarray  # float32 cosine similarity
+
+
+def top_k_neighbors(ids: np.ndarray, embeddings: np.ndarray, k: int, batch_size: int = 1024) -> NeighborRows:
+    """
+    Exact top-k neighbors of every row, excluding the row itself.
+
+    Rows with a zero embedding (no plot) are left out on both sides.
+
+    Args:
+        ids: Movie id of each embedding row
+        embeddings: (n, dim) embedding matrix
+        k: Neighbors kept per movie (fewer when the catalog is smaller)
+        batch_size: Rows scored per matrix product
+
+    Returns:
+        NeighborRows ordered by (movie_id row, rank)
+    """
+    ids = np.asarray(ids)
+    matrix = np.array(embeddings, dtype=np.float32, order="C", ndmin=2)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    # Zero vectors (movies without a plot) would score 0 against everything:
+    # they get no neighbor list and are never anyone's neighbor
+    has_plot = norms.ravel() > 0
+    ids, matrix = ids[has_plot], matrix[has_plot] / norms[has_plot]
+
+    n = len(ids)
+    k = min(k, n - 1)
+    if k <= 0:
+        return NeighborRows(
+            np.empty(0, np.int32), np.empty(0, np.int16), np.empty(0, np.int32), np.empty(0, np.float32)
+        )
+
+    neighbors = np.empty((n, k), dtype=np.int64)
+    scores = np.empty((n, k), dtype=np.float32)
+    for start in range(0, n, batch_size):
+        stop = min(start + batch_size, n)
+        block = matrix[start:stop] @ matrix.T
+        # A movie is never its own neighbor
+        block[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        neighbors[start:stop] = np.take_along_axis(top, order, axis=1)
+        scores[start:stop] = np.take_along_axis(top_scores, order, axis=1)
+
+    return NeighborRows(
+        movie_ids=np.repeat(ids, k).astype(np.int32),
+        ranks=np.tile(np.arange(1, k + 1, dtype=np.int16), n),
+        neighbor_ids=ids[neighbors.ravel()].astype(np.int32),
+        scores=scores.ravel(),
+    )
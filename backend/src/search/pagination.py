@@ -0,0 +1,36 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor records the sort it was issued for and the sort key + id of the
+last row on the page. The next page starts strictly after that row, so deep
+pages are index range scans instead of OFFSET scans, and rows inserted or
+deleted mid-scroll don't shift later pages.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Tuple
+
+
+class InvalidCursor(ValueError):
+    """The cursor is malformed or was issued for a different sort."""
+
+
+def encode_cursor(sort: str, order: str, value: Any, last_id: int) -> str:
+    payload = json.dumps({"s": sort, "o": order, "v": value, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, order: str) -> Tuple[Any, int]:
+    """Return (last sort value, last id); the value is None for the NULLs tail."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, last_id = payload["v"], int(payload["id"])
+        issued_for = (payload["s"], payload["o"])
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+        raise InvalidCursor("Malformed cursor")
+    if issued_for != (sort, order):
+        raise InvalidCursor("Cursor was issued for a different sort order")
+    return value, last_id
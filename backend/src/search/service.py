@@ -1,314 +1,791 @@
-from typing import List, Tuple
-
-from sqlalchemy import func, text
-from sqlalchemy.orm import Session
-
-from ..db.entity import Movie
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from sqlalchemy import Integer, bindparam, cast, column, exists, func, literal, literal_column, select, true, tuple_, values
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import metrics
+from ..cache import RedisJsonCache, VersionedSnapshot
+from ..config import settings
+from ..db.catalog import get_catalog_version
+from ..db.entity import Genre, Movie, MovieGenre, MoviePerson, Person
+from ..db.normalize import name_key
+from ..db.schema import SEARCH_DOCUMENT_COLUMN, TEXT_SEARCH_CONFIG
+from ..db.types import Float32Vector
 from ..logging import logger
 from .models import (
     GenreItem,
+    HybridMode,
     HybridSearchRequest,
     MovieStats,
+    NameMatch,
+    SearchQuality,
+    SemanticBatchRequest,
     SemanticSearchRequest,
     SortBy,
     SortOrder,
     StructuralSearchRequest,
+    TotalMode,
+)
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+# Generated tsvector column managed by db/schema.py (not mapped: Postgres only)
+SEARCH_DOCUMENT = literal_column(f"movies.{SEARCH_DOCUMENT_COLUMN}", type_=TSVECTOR)
+
+
+def keyword_query(text: str):
+    """Parse user input with websearch syntax: quoted phrases, OR, -exclusions."""
+    return func.websearch_to_tsquery(literal(TEXT_SEARCH_CONFIG).cast(REGCONFIG), text)
+
+
+def genre_filter(genre: str):
+    """Semi-join on movie_genres: exact, case-insensitive genre name."""
+    return exists().where(
+        MovieGenre.movie_id == Movie.id,
+        MovieGenre.genre_id == Genre.id,
+        Genre.key == name_key(genre),
+    )
+
+
+def person_filter(role: str, name: str):
+    """Semi-join on movie_people: the person's name contains `name` ("Nolan")."""
+    return exists().where(
+        MoviePerson.movie_id == Movie.id,
+        MoviePerson.role == role,
+        MoviePerson.person_id == Person.id,
+        Person.name.ilike(f"%{name}%"),
+    )
+
+
+def build_filters(request: Union[StructuralSearchRequest, HybridSearchRequest]) -> list:
+    """WHERE clauses for the categorical and range filters shared by all search modes."""
+    filters = []
+
+    # Categorical filters (normalized join tables)
+    if request.genre:
+        filters.append(genre_filter(request.genre))
+    if request.directors:
+        filters.append(person_filter(MoviePerson.DIRECTOR, request.directors))
+    if request.stars:
+        filters.append(person_filter(MoviePerson.STAR, request.stars))
+
+    # Range filters
+    if request.min_rating is not None:
+        filters.append(Movie.rating >= request.min_rating)
+    if request.max_rating is not None:
+        filters.append(Movie.rating <= request.max_rating)
+    if request.min_runtime is not None:
+        filters.append(Movie.runtime >= request.min_runtime)
+    if request.max_runtime is not None:
+        filters.append(Movie.runtime <= request.max_runtime)
+
+    return filters
+
+
+async def load_genres(db: AsyncSession) -> List[GenreItem]:
+    """Read the materialized genre counts: one row per genre, no movie scan."""
+    rows = await db.execute(
+        select(Genre.name, Genre.movie_count)
+        .where(Genre.movie_count > 0)
+        .order_by(Genre.movie_count.desc(), Genre.name)
+    )
+    return [GenreItem(name=name, count=count) for name, count in rows]
+
+
+async def load_stats(db: AsyncSession) -> MovieStats:
+    """Full-table MIN/MAX/COUNT for the filter UI; runs once per catalog version."""
+    result = await db.execute(
+        select(
+            func.min(Movie.rating).label("min_rating"),
+            func.max(Movie.rating).label("max_rating"),
+            func.min(Movie.runtime).label("min_runtime"),
+            func.max(Movie.runtime).label("max_runtime"),
+            func.count(Movie.id).label("total_movies"),
+        )
+    )
+    stats = result.first()
+
+    return MovieStats(
+        min_rating=stats.min_rating or 0.0,
+        max_rating=stats.max_rating or 10.0,
+        min_runtime=stats.min_runtime or 0,
+        max_runtime=stats.max_runtime or 300,
+        total_movies=stats.total_movies or 0,
+    )
+
+
+def catalog_cache(name: str) -> Optional[RedisJsonCache]:
+    """Shared Redis tier for a catalog snapshot, when enabled."""
+    if not settings.catalog_redis_cache_enabled:
+        return None
+    return RedisJsonCache(namespace=f"flickfindr:catalog:{name}", ttl=settings.catalog_redis_cache_ttl)
+
+
+# The catalog version itself, re-read at most once per refresh interval (response cache keys)
+catalog_version_snapshot = VersionedSnapshot(
+    get_catalog_version, refresh_interval=settings.catalog_snapshot_refresh_seconds
+)
+genre_snapshot = VersionedSnapshot(
+    load_genres,
+    refresh_interval=settings.catalog_snapshot_refresh_seconds,
+    shared=catalog_cache("genres"),
+    encode=lambda genres: [genre.model_dump() for genre in genres],
+    decode=lambda rows: [GenreItem.model_validate(row) for row in rows],
+)
+stats_snapshot = VersionedSnapshot(
+    load_stats,
+    refresh_interval=settings.catalog_snapshot_refresh_seconds,
+    shared=catalog_cache("stats"),
+    encode=lambda stats: stats.model_dump(),
+    decode=MovieStats.model_validate,
+)
+
+
+# Columns behind MovieSummary card views: no plot, people or embedding, and
+# every keyset sort key, so summary pages can be cursor-paged too
+SUMMARY_COLUMNS = (
+    Movie.id,
+    Movie.movie_name,
+    Movie.rating,
+    Movie.runtime,
+    Movie.genre,
+    Movie.metascore,
+    Movie.poster_url,
 )
 
 
+class SearchPage(NamedTuple):
+    results: List[Movie]
+    total: int
+    total_is_exact: bool
+    has_more: bool
+    next_cursor: Optional[str]
+
+
 class StructuralSearchService:
     """Service for building and executing structural search queries."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def build_query(self, request: StructuralSearchRequest):
-        """Build SQLAlchemy query from search request filters."""
-        query = self.db.query(Movie)
+    def build_query(self, request: StructuralSearchRequest, columns: Optional[tuple] = None):
+        """Build SQLAlchemy select statement from search request filters.
+
+        `columns` projects plain rows (e.g. SUMMARY_COLUMNS) instead of Movie entities.
+        """
+        query = select(*columns) if columns else select(Movie)
 
-        # Text search on movie name
+        # Text search on movie name (or the full-text document in keyword mode)
         if request.query:
-            query = query.filter(Movie.movie_name.ilike(f"%{request.query}%"))
-
-        # Categorical filters (partial match)
-        if request.genre:
-            query = query.filter(Movie.genre.ilike(f"%{request.genre}%"))
-        if request.directors:
-            query = query.filter(Movie.directors.ilike(f"%{request.directors}%"))
-        if request.stars:
-            query = query.filter(Movie.stars.ilike(f"%{request.stars}%"))
-
-        # Range filters
-        if request.min_rating is not None:
-            query = query.filter(Movie.rating >= request.min_rating)
-        if request.max_rating is not None:
-            query = query.filter(Movie.rating <= request.max_rating)
-        if request.min_runtime is not None:
-            query = query.filter(Movie.runtime >= request.min_runtime)
-        if request.max_runtime is not None:
-            query = query.filter(Movie.runtime <= request.max_runtime)
+            if request.name_match == NameMatch.KEYWORD:
+                # GIN index on the generated tsvector; no model inference involved
+                query = query.where(SEARCH_DOCUMENT.op("@@")(keyword_query(request.query)))
+            elif request.name_match == NameMatch.FUZZY:
+                # pg_trgm `<%`: query is word-similar to part of the name (GIN trigram index)
+                query = query.where(literal(request.query).op("<%")(Movie.movie_name))
+            else:
+                query = query.where(Movie.movie_name.ilike(f"%{request.query}%"))
+
+        filters = build_filters(request)
+        if filters:
+            query = query.where(*filters)
 
         return query
 
+    @staticmethod
+    def sort_column(request: StructuralSearchRequest):
+        """Expression the results are ordered by (before the `id` tie-breaker)."""
+        if request.sort_by == SortBy.SIMILARITY:
+            # Relevance to the query; nothing to compare without one
+            if not request.query:
+                return Movie.rating
+            if request.name_match == NameMatch.KEYWORD:
+                # Cover density rank honours the A/B/C weights of name, people and plot
+                return func.ts_rank_cd(SEARCH_DOCUMENT, keyword_query(request.query))
+            return func.word_similarity(request.query, Movie.movie_name)
+        return getattr(Movie, request.sort_by.value)
+
+    @staticmethod
+    def supports_cursor(request: StructuralSearchRequest) -> bool:
+        """Keyset pages need a plain column key; computed similarity scores only page by offset."""
+        return not (request.sort_by == SortBy.SIMILARITY and request.query)
+
     def apply_sorting(self, query, request: StructuralSearchRequest):
         """Apply sorting to the query."""
-        sort_column = getattr(Movie, request.sort_by.value)
+        sort_column = self.sort_column(request)
 
+        # `id` breaks ties so the order is total and cursors are unambiguous
         if request.sort_order == SortOrder.DESC:
-            query = query.order_by(sort_column.desc().nulls_last())
+            query = query.order_by(sort_column.desc().nulls_last(), Movie.id.desc())
         else:
-            query = query.order_by(sort_column.asc().nulls_last())
+            query = query.order_by(sort_column.asc().nulls_last(), Movie.id.asc())
 
         return query
 
-    def execute_search(self, request: StructuralSearchRequest) -> Tuple[List[Movie], int]:
-        """Execute search and return results with total count."""
+    async def _fetch(self, query, projected: bool) -> list:
+        result = await self.db.execute(query)
+        return list(result.all() if projected else result.scalars().all())
+
+    async def _fetch_after_cursor(
+        self, query, request: StructuralSearchRequest, n: int, projected: bool = False
+    ) -> list:
+        """Up to `n` rows strictly after the cursor position, in nulls-last order.
+
+        Non-null keys and the NULLs tail are fetched as separate range scans:
+        a row-value comparison never matches NULL, and an OR across both
+        would stop the planner from walking the composite index in order.
+        """
+        if not self.supports_cursor(request):
+            raise InvalidCursor("Cursor pagination is not available for similarity sorting; use skip")
+        value, last_id = decode_cursor(request.cursor, request.sort_by.value, request.sort_order.value)
+        column = self.sort_column(request)
+        descending = request.sort_order == SortOrder.DESC
+
+        rows = []
+        if value is not None:
+            position = tuple_(column, Movie.id)
+            after = position < tuple_(value, last_id) if descending else position > tuple_(value, last_id)
+            rows = await self._fetch(self.apply_sorting(query.where(after), request).limit(n), projected)
+            if len(rows) == n:
+                return rows
+            tail = query.where(column.is_(None))
+        else:
+            tail = query.where(column.is_(None), Movie.id < last_id if descending else Movie.id > last_id)
+
+        tail = tail.order_by(Movie.id.desc() if descending else Movie.id.asc()).limit(n - len(rows))
+        rows.extend(await self._fetch(tail, projected))
+        return rows
+
+    def next_cursor(self, last, request: StructuralSearchRequest) -> Optional[str]:
+        """Cursor pointing just past `last`, or None if this sort can't be keyset-paged."""
+        if not self.supports_cursor(request):
+            return None
+        value = getattr(last, self.sort_column(request).key)
+        return encode_cursor(request.sort_by.value, request.sort_order.value, value, last.id)
+
+    async def count_total(self, query, mode: TotalMode) -> Tuple[int, bool]:
+        """(total, is_exact) for the filtered query; ESTIMATE stops counting at the cap."""
+        if mode == TotalMode.ESTIMATE:
+            cap = settings.search_count_cap
+            capped = query.with_only_columns(Movie.id).limit(cap + 1).subquery()
+            n = await self.db.scalar(select(func.count()).select_from(capped))
+            return min(n, cap), n <= cap
+        return await self.db.scalar(select(func.count()).select_from(query.subquery())), True
+
+    async def execute_page(self, request: StructuralSearchRequest, columns: Optional[tuple] = None) -> SearchPage:
+        """Execute search and return one page with its total and the cursor for the next page.
+
+        With `request.cursor` the page is a keyset range scan; otherwise
+        `skip`/`limit` is used (compatibility mode). One extra row is fetched
+        to know whether another page exists.
+
+        `total_mode=window` reads the total from COUNT(*) OVER () on the
+        offset page itself, saving the separate count pass. Cursor pages and
+        empty offset pages past the end can't see the whole result set, so
+        they fall back to the separate count.
+
+        With `columns`, results are plain rows with just those columns (no ORM
+        hydration); otherwise Movie entities without the deferred embedding.
+        """
         try:
             # Build base query with filters
-            query = self.build_query(request)
-
-            # Get total count before pagination
-            total = query.count()
+            query = self.build_query(request, columns)
+            projected = columns is not None
+            total: Optional[int] = None
+            total_is_exact = True
+
+            if request.cursor:
+                results = await self._fetch_after_cursor(query, request, request.limit + 1, projected)
+            elif request.total_mode == TotalMode.WINDOW:
+                windowed = self.apply_sorting(query.add_columns(func.count().over().label("total")), request)
+                rows = (await self.db.execute(windowed.offset(request.skip).limit(request.limit + 1))).all()
+                results = rows if projected else [row[0] for row in rows]
+                if rows:
+                    total = rows[0].total
+                elif request.skip == 0:
+                    total = 0
+            else:
+                query_page = self.apply_sorting(query, request)
+                results = await self._fetch(query_page.offset(request.skip).limit(request.limit + 1), projected)
 
-            # Apply sorting
-            query = self.apply_sorting(query, request)
+            if total is None:
+                mode = TotalMode.ESTIMATE if request.total_mode == TotalMode.ESTIMATE else TotalMode.EXACT
+                total, total_is_exact = await self.count_total(query, mode)
 
-            # Apply pagination
-            results = query.offset(request.skip).limit(request.limit).all()
+            has_more = len(results) > request.limit
+            results = results[:request.limit]
+            cursor = self.next_cursor(results[-1], request) if has_more else None
 
             logger.info(
-                f"Search executed: {len(results)} results returned, {total} total matches"
+                f"Search executed: {len(results)} results returned, "
+                f"{total}{'' if total_is_exact else '+'} total matches"
             )
 
-            return results, total
+            return SearchPage(results, total, total_is_exact, has_more, cursor)
 
+        except InvalidCursor:
+            raise
         except Exception as e:
             logger.error(f"Search execution failed: {str(e)}")
             raise
 
-    def get_genres(self) -> List[GenreItem]:
-        """Get list of unique genres with movie counts."""
-        try:
-            # Get all genres (they are comma-separated in the genre field)
-            movies = self.db.query(Movie.genre).filter(Movie.genre.isnot(None)).all()
-
-            # Parse and count genres
-            genre_counts: dict = {}
-            for (genre_str,) in movies:
-                if genre_str:
-                    for genre in genre_str.split(","):
-                        genre = genre.strip()
-                        if genre:
-                            genre_counts[genre] = genre_counts.get(genre, 0) + 1
+    async def execute_search(self, request: StructuralSearchRequest) -> Tuple[List[Movie], int]:
+        """Execute search and return results with total count."""
+        page = await self.execute_page(request)
+        return page.results, page.total
 
-            # Sort by count descending
-            sorted_genres = sorted(genre_counts.items(), key=lambda x: x[1], reverse=True)
+    async def genre_rows(self, genres: List[str], limit: int) -> Dict[str, list]:
+        """
+        Top `limit` movies by rating for each genre, from one statement.
 
-            return [GenreItem(name=name, count=count) for name, count in sorted_genres]
+        ROW_NUMBER() is partitioned by genre over the movie_genres join, so
+        every row comes back from a single query instead of a count query
+        plus a page query per genre. Returns summary rows keyed by `name_key`.
+        """
+        keys = list(dict.fromkeys(name_key(genre) for genre in genres))
+        rank = func.row_number().over(
+            partition_by=MovieGenre.genre_id,
+            order_by=(Movie.rating.desc().nulls_last(), Movie.id),
+        )
+        ranked = (
+            select(Genre.key.label("genre_key"), *SUMMARY_COLUMNS, rank.label("row_rank"))
+            .join(MovieGenre, MovieGenre.movie_id == Movie.id)
+            .join(Genre, Genre.id == MovieGenre.genre_id)
+            .where(Genre.key.in_(keys))
+            .subquery()
+        )
+        query = (
+            select(ranked)
+            .where(ranked.c.row_rank <= limit)
+            .order_by(ranked.c.genre_key, ranked.c.row_rank)
+        )
+
+        rows: Dict[str, list] = {key: [] for key in keys}
+        for row in await self.db.execute(query):
+            rows[row.genre_key].append(row)
+        return rows
+
+    async def get_genres(self) -> List[GenreItem]:
+        """Get list of unique genres with movie counts (snapshot per catalog version)."""
+        try:
+            return await genre_snapshot.get(self.db)
 
         except Exception as e:
             logger.error(f"Failed to get genres: {str(e)}")
             raise
 
-    def get_stats(self) -> MovieStats:
-        """Get movie statistics for filter UI."""
+    async def get_stats(self) -> MovieStats:
+        """Get movie statistics for filter UI (snapshot per catalog version)."""
         try:
-            stats = self.db.query(
-                func.min(Movie.rating).label("min_rating"),
-                func.max(Movie.rating).label("max_rating"),
-                func.min(Movie.runtime).label("min_runtime"),
-                func.max(Movie.runtime).label("max_runtime"),
-                func.count(Movie.id).label("total_movies"),
-            ).first()
-
-            return MovieStats(
-                min_rating=stats.min_rating or 0.0,
-                max_rating=stats.max_rating or 10.0,
-                min_runtime=stats.min_runtime or 0,
-                max_runtime=stats.max_runtime or 300,
-                total_movies=stats.total_movies or 0,
-            )
+            return await stats_snapshot.get(self.db)
 
         except Exception as e:
             logger.error(f"Failed to get stats: {str(e)}")
             raise
 
 
+# Query vectors are bound as float32 arrays (binary on asyncpg), never as text
+EMBEDDING_PARAM = bindparam("embedding", type_=Float32Vector(384))
+
+# Columns returned by semantic and hybrid search (everything except the embedding)
+RESULT_COLUMNS = (
+    Movie.id,
+    Movie.movie_name,
+    Movie.rating,
+    Movie.runtime,
+    Movie.genre,
+    Movie.metascore,
+    Movie.plot,
+    Movie.directors,
+    Movie.stars,
+    Movie.votes,
+    Movie.gross,
+    Movie.poster_url,
+)
+
+
+# Per-transaction search parameter for each quality tier, keyed by pgvector index type.
+# hnsw.ef_search is the candidate list size; ivfflat.probes is the number of lists scanned.
+QUALITY_SEARCH_PARAMS = {
+    "hnsw": ("hnsw.ef_search", {
+        SearchQuality.FAST: 20,
+        SearchQuality.BALANCED: 64,
+        SearchQuality.ACCURATE: 200,
+    }),
+    "ivfflat": ("ivfflat.probes", {
+        SearchQuality.FAST: 1,
+        SearchQuality.BALANCED: 10,
+        SearchQuality.ACCURATE: 40,
+    }),
+}
+
+
+def quality_search_param(quality: SearchQuality, limit: int) -> Tuple[str, int]:
+    """Resolve a quality tier to the (GUC name, value) for the configured index type."""
+    name, values = QUALITY_SEARCH_PARAMS[settings.vector_index_type]
+    value = values[quality]
+    if name == "hnsw.ef_search":
+        # HNSW can't return more rows than its candidate list
+        value = max(value, limit)
+    return name, value
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Tuple[Sequence[int], float]], k: int = 60) -> List[Tuple[int, float]]:
+    """Merge ranked id lists: score(id) = sum of weight / (k + rank), best first."""
+    scores: Dict[int, float] = {}
+    for ids, weight in rankings:
+        for rank, movie_id in enumerate(ids, start=1):
+            scores[movie_id] = scores.get(movie_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+def elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+stage_histograms = {
+    stage: metrics.histogram(f"hybrid_rrf_{stage}", f"Hybrid rrf {stage.removesuffix('_ms')} stage time")
+    for stage in ("keyword_ms", "embed_ms", "vector_ms", "hydrate_ms")
+}
+
+
 class SemanticSearchService:
-    """Service for semantic search using vector embeddings."""
+    """Service for semantic search using vector embeddings.
+    
+    Ranking runs either in Postgres (pgvector index) or in the in-process
+    exact vector index, selected by `settings.semantic_search_engine`.
+    """
     
     # Similarity threshold - results below this are considered "similar suggestions"
     SIMILARITY_THRESHOLD = 0.6
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def semantic_search(self, request: SemanticSearchRequest) -> dict:
+    @property
+    def uses_memory_index(self) -> bool:
+        return settings.semantic_search_engine == "memory"
+
+    async def semantic_search(self, request: SemanticSearchRequest) -> dict:
         """
         Perform semantic search using cosine similarity on plot embeddings.
         
         Returns dict with movies, exact_matches flag, and message.
         """
         try:
-            from .embedding import generate_embedding
-            
-            # Generate embedding for the query
-            query_embedding = generate_embedding(request.query)
-            embedding_str = "[" + ",".join(str(x) for x in query_embedding) + "]"
-            
-            # Use raw SQL for vector similarity search
-            # 1 - cosine distance = cosine similarity (0 to 1)
-            sql = text("""
-                SELECT 
-                    id, movie_name, rating, runtime, genre, metascore, 
-                    plot, directors, stars, votes, gross, poster_url,
-                    1 - (plot_embedding <=> CAST(:embedding AS vector)) as similarity_score
-                FROM movies 
-                WHERE plot_embedding IS NOT NULL
-                ORDER BY plot_embedding <=> CAST(:embedding AS vector)
-                LIMIT :limit
-            """)
+            from .embedding import embed_query
             
-            result = self.db.execute(sql, {"embedding": embedding_str, "limit": request.limit})
-            
-            movies = []
-            for row in result:
-                movies.append({
-                    "id": row.id,
-                    "movie_name": row.movie_name,
-                    "rating": row.rating,
-                    "runtime": row.runtime,
-                    "genre": row.genre,
-                    "metascore": row.metascore,
-                    "plot": row.plot,
-                    "directors": row.directors,
-                    "stars": row.stars,
-                    "votes": row.votes,
-                    "gross": row.gross,
-                    "poster_url": row.poster_url,
-                    "similarity_score": round(float(row.similarity_score), 4) if row.similarity_score else None,
-                })
-            
-            # Check if any results are above the threshold
-            exact_matches = any(
-                m["similarity_score"] and m["similarity_score"] >= self.SIMILARITY_THRESHOLD 
-                for m in movies
-            )
+            # Generate embedding for the query (cached / micro-batched, off the event loop)
+            query_embedding = await embed_query(request.query)
             
-            if exact_matches:
-                message = "Movies found matching your query"
-            elif movies:
-                message = "No exact matches found, but here are some similar movies"
+            if self.uses_memory_index:
+                movies = await self._rank_in_memory(query_embedding, request.limit)
             else:
-                message = "No movies found"
+                movies = await self._rank_in_postgres(query_embedding, request.limit, [], request.quality)
             
-            logger.info(f"Semantic search returned {len(movies)} results (exact_matches={exact_matches}) for query: {request.query[:50]}...")
-            
-            return {
-                "movies": movies,
-                "exact_matches": exact_matches,
-                "message": message,
-            }
+            result = self._build_result(movies, empty_message="No movies found")
+            logger.info(f"Semantic search returned {len(movies)} results (exact_matches={result['exact_matches']}) for query: {request.query[:50]}...")
+            return result
             
         except Exception as e:
             logger.error(f"Semantic search failed: {str(e)}")
             raise
 
-    def hybrid_search(self, request: HybridSearchRequest) -> dict:
+    async def semantic_batch(self, request: SemanticBatchRequest) -> AsyncIterator[dict]:
+        """
+        Semantic search for many queries, yielded one result dict per query in order.
+        
+        Queries are processed in chunks of `settings.semantic_batch_chunk_size`:
+        one embedding call and one ranking round trip per chunk, so the first
+        results stream back while later chunks are still being ranked. A
+        failed chunk yields an `error` entry per query and the batch goes on.
+        """
+        from .embedding import embed_queries
+        
+        chunk_size = max(1, settings.semantic_batch_chunk_size)
+        for start in range(0, len(request.queries), chunk_size):
+            texts = request.queries[start:start + chunk_size]
+            try:
+                embeddings = await embed_queries(texts)
+                if self.uses_memory_index:
+                    rankings = await self._rank_many_in_memory(embeddings, request.limit)
+                else:
+                    rankings = await self._rank_many_in_postgres(embeddings, request.limit, request.quality)
+            except Exception as e:
+                logger.error(f"Semantic batch chunk at {start} failed: {str(e)}")
+                await self.db.rollback()
+                for offset, text in enumerate(texts):
+                    yield {
+                        "index": start + offset,
+                        "query": text,
+                        "movies": [],
+                        "exact_matches": False,
+                        "message": "Search failed",
+                        "error": "Search failed",
+                    }
+                continue
+            
+            for offset, (text, movies) in enumerate(zip(texts, rankings)):
+                yield {"index": start + offset, "query": text, **self._build_result(movies, empty_message="No movies found")}
+        logger.info(f"Semantic batch answered {len(request.queries)} queries")
+
+    async def hybrid_search(self, request: HybridSearchRequest) -> dict:
         """
         Perform hybrid search: apply structural filters, then rank by semantic similarity.
         
         Returns dict with movies, exact_matches flag, and message.
         """
         try:
-            from .embedding import generate_embedding
-            
-            # Generate embedding for the query
-            query_embedding = generate_embedding(request.query)
-            embedding_str = "[" + ",".join(str(x) for x in query_embedding) + "]"
-            
-            # Build WHERE clauses for structural filters
-            where_clauses = ["plot_embedding IS NOT NULL"]
-            params = {"embedding": embedding_str, "limit": request.limit}
-            
-            if request.genre:
-                where_clauses.append("genre ILIKE :genre")
-                params["genre"] = f"%{request.genre}%"
-            if request.directors:
-                where_clauses.append("directors ILIKE :directors")
-                params["directors"] = f"%{request.directors}%"
-            if request.stars:
-                where_clauses.append("stars ILIKE :stars")
-                params["stars"] = f"%{request.stars}%"
-            if request.min_rating is not None:
-                where_clauses.append("rating >= :min_rating")
-                params["min_rating"] = request.min_rating
-            if request.max_rating is not None:
-                where_clauses.append("rating <= :max_rating")
-                params["max_rating"] = request.max_rating
-            if request.min_runtime is not None:
-                where_clauses.append("runtime >= :min_runtime")
-                params["min_runtime"] = request.min_runtime
-            if request.max_runtime is not None:
-                where_clauses.append("runtime <= :max_runtime")
-                params["max_runtime"] = request.max_runtime
-            
-            where_sql = " AND ".join(where_clauses)
-            
-            sql = text(f"""
-                SELECT 
-                    id, movie_name, rating, runtime, genre, metascore, 
-                    plot, directors, stars, votes, gross, poster_url,
-                    1 - (plot_embedding <=> CAST(:embedding AS vector)) as similarity_score
-                FROM movies 
-                WHERE {where_sql}
-                ORDER BY plot_embedding <=> CAST(:embedding AS vector)
-                LIMIT :limit
-            """)
-            
-            result = self.db.execute(sql, params)
-            
-            movies = []
-            for row in result:
-                movies.append({
-                    "id": row.id,
-                    "movie_name": row.movie_name,
-                    "rating": row.rating,
-                    "runtime": row.runtime,
-                    "genre": row.genre,
-                    "metascore": row.metascore,
-                    "plot": row.plot,
-                    "directors": row.directors,
-                    "stars": row.stars,
-                    "votes": row.votes,
-                    "gross": row.gross,
-                    "poster_url": row.poster_url,
-                    "similarity_score": round(float(row.similarity_score), 4) if row.similarity_score else None,
-                })
-            
-            # Check if any results are above the threshold
-            exact_matches = any(
-                m["similarity_score"] and m["similarity_score"] >= self.SIMILARITY_THRESHOLD 
-                for m in movies
-            )
+            from .embedding import embed_query
             
-            if exact_matches:
-                message = "Movies found matching your query"
-            elif movies:
-                message = "No exact matches found, but here are some similar movies"
+            filters = build_filters(request)
+            timings = None
+            if request.mode == HybridMode.RRF:
+                movies, timings = await self._rank_fused(request, filters)
             else:
-                message = "No movies found matching your criteria"
+                # Generate embedding for the query (cached / micro-batched, off the event loop)
+                query_embedding = await embed_query(request.query)
+                
+                if self.uses_memory_index:
+                    movies = await self._rank_in_memory(query_embedding, request.limit, filters)
+                else:
+                    movies = await self._rank_in_postgres(query_embedding, request.limit, filters, request.quality)
             
-            logger.info(f"Hybrid search returned {len(movies)} results (exact_matches={exact_matches}) for query: {request.query[:50]}...")
-            
-            return {
-                "movies": movies,
-                "exact_matches": exact_matches,
-                "message": message,
-            }
+            result = self._build_result(movies, empty_message="No movies found matching your criteria")
+            if timings is not None:
+                result["timings"] = timings
+            logger.info(f"Hybrid search returned {len(movies)} results (exact_matches={result['exact_matches']}) for query: {request.query[:50]}...")
+            return result
             
         except Exception as e:
             logger.error(f"Hybrid search failed: {str(e)}")
             raise
 
+    async def _rank_in_postgres(
+        self, query_embedding, limit: int, filters: list, quality: Optional[SearchQuality] = None
+    ) -> List[dict]:
+        """Top-k by cosine distance through the pgvector index."""
+        result = await self._vector_top_k(RESULT_COLUMNS, query_embedding, limit, filters, quality)
+        return [self._movie_dict(row, row.similarity_score) for row in result]
+
+    async def _vector_top_k(
+        self, columns: tuple, query_embedding, limit: int, filters: list, quality: Optional[SearchQuality]
+    ):
+        """Run the pgvector ranking query selecting `columns` plus similarity_score."""
+        if quality is not None:
+            # set_config(..., is_local => true) is SET LOCAL: scoped to this request's transaction
+            name, value = quality_search_param(quality, limit)
+            await self.db.execute(select(func.set_config(name, str(value), True)))
+        
+        # 1 - cosine distance = cosine similarity
+        distance = Movie.plot_embedding.cosine_distance(EMBEDDING_PARAM)
+        query = (
+            select(*columns, (1 - distance).label("similarity_score"))
+            .where(Movie.plot_embedding.isnot(None), *filters)
+            .order_by(distance)
+            .limit(limit)
+        )
+        return await self.db.execute(query, {"embedding": query_embedding})
+
+    async def _keyword_top_ids(self, text: str, limit: int, filters: list) -> List[int]:
+        """Full-text top-k ids, on the request session like every other query."""
+        tsquery = keyword_query(text)
+        query = (
+            select(Movie.id)
+            .where(SEARCH_DOCUMENT.op("@@")(tsquery), *filters)
+            .order_by(func.ts_rank_cd(SEARCH_DOCUMENT, tsquery).desc(), Movie.id)
+            .limit(limit)
+        )
+        return list((await self.db.scalars(query)).all())
+
+    async def _vector_top_ids(
+        self, query_embedding, limit: int, filters: list, quality: Optional[SearchQuality], timings: dict
+    ) -> Dict[int, float]:
+        """Vector top-k as {movie id: cosine similarity}, best first."""
+        started = time.perf_counter()
+        if self.uses_memory_index:
+            ids, scores = await self._memory_top_k(query_embedding, limit, filters)
+            hits = dict(zip(ids.tolist(), scores.tolist()))
+        else:
+            rows = await self._vector_top_k((Movie.id,), query_embedding, limit, filters, quality)
+            hits = {row.id: row.similarity_score for row in rows}
+        timings["vector_ms"] = elapsed_ms(started)
+        return hits
 
+    async def _rank_fused(self, request: HybridSearchRequest, filters: list) -> Tuple[List[dict], Dict[str, float]]:
+        """Reciprocal rank fusion of the keyword and vector rankings.
+        
+        Both rankings return ids only; just the fused winners are hydrated.
+        The keyword query overlaps the query embedding, and every SQL
+        statement runs on the request session, so a request holds a single
+        pooled connection. `similarity_score` stays the cosine similarity
+        (None for keyword-only hits beyond the vector depth).
+        """
+        from .embedding import embed_query
+        
+        depth = max(settings.hybrid_rrf_depth, request.limit)
+        timings: Dict[str, float] = {}
+        
+        async def keyword_branch():
+            started = time.perf_counter()
+            ids = await self._keyword_top_ids(request.query, depth, filters)
+            timings["keyword_ms"] = elapsed_ms(started)
+            return ids
+        
+        async def embed_branch():
+            started = time.perf_counter()
+            embedding = await embed_query(request.query)
+            timings["embed_ms"] = elapsed_ms(started)
+            return embedding
+        
+        keyword_ids, query_embedding = await asyncio.gather(keyword_branch(), embed_branch())
+        vector_hits = await self._vector_top_ids(query_embedding, depth, filters, request.quality, timings)
+        fused = reciprocal_rank_fusion(
+            [(keyword_ids, settings.hybrid_keyword_weight), (list(vector_hits), settings.hybrid_vector_weight)],
+            k=settings.hybrid_rrf_k,
+        )[:request.limit]
+        
+        started = time.perf_counter()
+        movies = []
+        if fused:
+            winners = [movie_id for movie_id, _ in fused]
+            rows = (await self.db.execute(select(*RESULT_COLUMNS).where(Movie.id.in_(winners)))).all()
+            by_id = {row.id: row for row in rows}
+            movies = [
+                self._movie_dict(by_id[movie_id], vector_hits.get(movie_id))
+                for movie_id in winners
+                if movie_id in by_id
+            ]
+        timings["hydrate_ms"] = elapsed_ms(started)
+        
+        for stage, ms in timings.items():
+            stage_histograms[stage].observe(ms)
+        logger.info(
+            f"Hybrid rrf: {len(keyword_ids)} keyword + {len(vector_hits)} vector candidates -> "
+            f"{len(movies)} results, timings={timings}"
+        )
+        return movies, timings
+
+    async def _rank_many_in_postgres(
+        self, embeddings: np.ndarray, limit: int, quality: Optional[SearchQuality] = None
+    ) -> List[List[dict]]:
+        """Top-k for every query vector in one statement: a LATERAL index scan per VALUES row."""
+        if quality is not None:
+            name, value = quality_search_param(quality, limit)
+            await self.db.execute(select(func.set_config(name, str(value), True)))
+        
+        # Explicit casts: untyped VALUES parameters would otherwise be inferred as text
+        vector_type = Float32Vector(384)
+        queries = values(column("ord", Integer), column("embedding", vector_type), name="q").data([
+            (cast(literal(i), Integer), cast(literal(embedding, vector_type), vector_type))
+            for i, embedding in enumerate(embeddings)
+        ])
+        distance = Movie.plot_embedding.cosine_distance(queries.c.embedding)
+        top = (
+            select(*RESULT_COLUMNS, (1 - distance).label("similarity_score"))
+            .where(Movie.plot_embedding.isnot(None))
+            .order_by(distance)
+            .limit(limit)
+            .lateral("top")
+        )
+        query = (
+            select(queries.c.ord, top)
+            .select_from(queries)
+            .join(top, true())
+            .order_by(queries.c.ord, top.c.similarity_score.desc())
+        )
+        
+        rankings: List[List[dict]] = [[] for _ in range(len(embeddings))]
+        for row in await self.db.execute(query):
+            rankings[row.ord].append(self._movie_dict(row, row.similarity_score))
+        return rankings
+
+    async def _rank_many_in_memory(self, embeddings: np.ndarray, limit: int) -> List[List[dict]]:
+        """Exact top-k for every query vector with one matrix product, then one fetch of all winners."""
+        from .vector_index import vector_index
+        
+        await vector_index.ensure_fresh(self.db)
+        hits = vector_index.search_many(embeddings, limit)
+        
+        winners = sorted({movie_id for ids, _ in hits for movie_id in ids.tolist()})
+        by_id = {}
+        if winners:
+            rows = (await self.db.execute(select(*RESULT_COLUMNS).where(Movie.id.in_(winners)))).all()
+            by_id = {row.id: row for row in rows}
+        return [
+            [
+                self._movie_dict(by_id[movie_id], score)
+                for movie_id, score in zip(ids.tolist(), scores.tolist())
+                if movie_id in by_id
+            ]
+            for ids, scores in hits
+        ]
+
+    async def _rank_in_memory(self, query_embedding, limit: int, filters: Optional[list] = None) -> List[dict]:
+        """Exact top-k in the in-process index, then fetch only the winners' rows."""
+        ids, scores = await self._memory_top_k(query_embedding, limit, filters)
+        if len(ids) == 0:
+            return []
+        
+        rows = (await self.db.execute(select(*RESULT_COLUMNS).where(Movie.id.in_(ids.tolist())))).all()
+        by_id = {row.id: row for row in rows}
+        return [
+            self._movie_dict(by_id[movie_id], score)
+            for movie_id, score in zip(ids.tolist(), scores.tolist())
+            if movie_id in by_id
+        ]
+
+    async def _memory_top_k(self, query_embedding, limit: int, filters: Optional[list] = None):
+        """(ids, cosine similarities) from the in-process index, restricted by `filters`."""
+        from .vector_index import vector_index
+        
+        await vector_index.ensure_fresh(self.db)
+        
+        candidate_ids = None
+        if filters:
+            candidate_ids = np.fromiter(
+                (await self.db.scalars(select(Movie.id).where(*filters))), dtype=np.int64
+            )
+        return vector_index.search(query_embedding, limit, candidate_ids)
+
+    @staticmethod
+    def _movie_dict(row, similarity_score) -> dict:
+        return {
+            "id": row.id,
+            "movie_name": row.movie_name,
+            "rating": row.rating,
+            "runtime": row.runtime,
+            "genre": row.genre,
+            "metascore": row.metascore,
+            "plot": row.plot,
+            "directors": row.directors,
+            "stars": row.stars,
+            "votes": row.votes,
+            "gross": row.gross,
+            "poster_url": row.poster_url,
+            "similarity_score": round(float(similarity_score), 4) if similarity_score else None,
+        }
+
+    def _build_result(self, movies: List[dict], empty_message: str) -> dict:
+        # Check if any results are above the threshold
+        exact_matches = any(
+            m["similarity_score"] and m["similarity_score"] >= self.SIMILARITY_THRESHOLD 
+            for m in movies
+        )
+        
+        if exact_matches:
+            message = "Movies found matching your query"
+        elif movies:
+            message = "No exact matches found, but here are some similar movies"
+        else:
+            message = empty_message
+        
+        return {
+            "movies": movies,
+            "exact_matches": exact_matches,
+            "message": message,
+        }
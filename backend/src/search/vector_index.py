@@ -0,0 +1,186 @@
+"""
+In-process exact vector search over all plot embeddings.
+
+The whole catalog fits in RAM (384 float32 values per movie), so instead of
+an approximate ivfflat scan in Postgres the "memory" semantic engine keeps
+every embedding in one contiguous, L2-normalized float32 matrix. Top-k is a
+single matrix-vector product plus `argpartition`: exact recall, and scoring
+takes well under a millisecond for catalogs of this size.
+"""
+
+import asyncio
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from .. import metrics
+from ..config import settings
+from ..db.catalog import get_catalog_version
+from ..db.entity import Movie
+from ..logging import logger
+
+score_time_histogram = metrics.histogram("vector_index_score_ms", "In-process top-k scoring time")
+
+
+class VectorIndex:
+    """Normalized embedding matrix with the movie id of every row."""
+
+    def __init__(self, refresh_interval: float = 30.0):
+        self.refresh_interval = refresh_interval
+        self.ids = np.empty(0, dtype=np.int64)
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+        self.version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.version is not None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def prepare(ids, vectors) -> Tuple[np.ndarray, np.ndarray]:
+        """(int64 ids, L2-normalized float32 matrix) for `build`; CPU-bound."""
+        matrix = np.array(vectors, dtype=np.float32, order="C", ndmin=2)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        # Zero vectors (movies without a plot) keep a zero score
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return np.asarray(ids, dtype=np.int64), matrix
+
+    def swap(self, ids: np.ndarray, matrix: np.ndarray, version: int) -> None:
+        """Install prepared arrays; concurrent searches see the old or the new index, never a mix."""
+        self.ids, self.matrix = ids, matrix
+        self.version = version
+
+    def build(self, ids: np.ndarray, vectors: np.ndarray, version: int) -> None:
+        """Replace the index contents (rows are normalized here)."""
+        self.swap(*self.prepare(ids, vectors), version)
+
+    @staticmethod
+    def _stack_rows(rows) -> Tuple[np.ndarray, np.ndarray]:
+        ids = np.fromiter((row.id for row in rows), dtype=np.int64, count=len(rows))
+        if rows:
+            vectors = np.stack([row.plot_embedding for row in rows])
+        else:
+            vectors = np.empty((0, 0), dtype=np.float32)
+        return VectorIndex.prepare(ids, vectors)
+
+    async def load(self, db: AsyncSession) -> None:
+        """Read every stored embedding from the database.
+
+        Stacking and normalizing the catalog runs in the threadpool, so a
+        reload never blocks the event loop; searches keep using the current
+        arrays until the new ones are swapped in.
+        """
+        started = time.perf_counter()
+        version = await get_catalog_version(db)
+        rows = (
+            await db.execute(
+                select(Movie.id, Movie.plot_embedding)
+                .where(Movie.plot_embedding.isnot(None))
+                .order_by(Movie.id)
+            )
+        ).all()
+
+        ids, matrix = await run_in_threadpool(self._stack_rows, rows)
+        self.swap(ids, matrix, version)
+        self._checked_at = time.monotonic()
+        logger.info(
+            f"Vector index loaded {len(ids)} embeddings (catalog v{version}) "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """Load on first use and reload when the catalog version changed.
+
+        The version is checked at most once per `refresh_interval` seconds.
+        The lock only keeps reloads from running twice: once an index is
+        loaded, requests arriving during a reload search the current one
+        instead of waiting.
+        """
+        if self.loaded and (time.monotonic() - self._checked_at < self.refresh_interval or self._lock.locked()):
+            return
+        async with self._lock:
+            if self.loaded and time.monotonic() - self._checked_at < self.refresh_interval:
+                return
+            if not self.loaded or await get_catalog_version(db) != self.version:
+                await self.load(db)
+            self._checked_at = time.monotonic()
+
+    def search(
+        self, query: np.ndarray, k: int, candidate_ids: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact top-k by cosine similarity.
+
+        Args:
+            query: Query embedding
+            k: Number of results
+            candidate_ids: Restrict results to these movie ids (structural filters)
+
+        Returns:
+            (movie ids, cosine similarities), best first
+        """
+        started = time.perf_counter()
+        ids, matrix = self.ids, self.matrix
+        if len(ids) == 0 or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if candidate_ids is not None:
+            rows = np.flatnonzero(np.isin(ids, candidate_ids))
+            ids, matrix = ids[rows], matrix[rows]
+            if len(ids) == 0:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        q = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm > 0:
+            q = q / norm
+        scores = matrix @ q
+
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        score_time_histogram.observe((time.perf_counter() - started) * 1000)
+        return ids[top], scores[top]
+
+    def search_many(self, queries: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Exact top-k for a batch of queries with one matrix-matrix product.
+
+        Returns one (movie ids, cosine similarities) pair per query, best first.
+        """
+        started = time.perf_counter()
+        ids, matrix = self.ids, self.matrix
+        queries = np.array(queries, dtype=np.float32, ndmin=2)
+        if len(ids) == 0 or k <= 0:
+            empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+            return [empty for _ in range(len(queries))]
+
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        np.divide(queries, norms, out=queries, where=norms > 0)
+        scores = queries @ matrix.T  # (queries, movies)
+
+        k = min(k, len(ids))
+        if k < len(ids):
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(len(ids)), scores.shape)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        score_time_histogram.observe((time.perf_counter() - started) * 1000)
+        return [(ids[row], row_scores) for row, row_scores in zip(top, top_scores)]
+
+
+vector_index = VectorIndex(refresh_interval=settings.vector_index_refresh_seconds)
@@ -1,24 +1,71 @@
 from typing import List
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import StreamingResponse
 
+from .. import metrics
+from ..cache import RedisBytesCache, ResponseCache, SingleFlight, request_fingerprint
+from ..config import settings
 from ..db.core import DbSession
+from ..db.normalize import name_key
 from ..logging import logger
+from ..movies.models import MovieSummary
 from .models import (
     GenreItem,
+    GenreRow,
+    GenreRowsRequest,
+    GenreRowsResponse,
     HybridSearchRequest,
     MovieResult,
     MovieStats,
     SearchResponse,
+    SemanticBatchRequest,
+    SemanticBatchResult,
     SemanticSearchRequest,
     SemanticSearchResponse,
     StructuralSearchRequest,
+    SummarySearchResponse,
 )
-from .service import SemanticSearchService, StructuralSearchService
+from .pagination import InvalidCursor
+from .service import SUMMARY_COLUMNS, SemanticSearchService, StructuralSearchService, catalog_version_snapshot
 
 router = APIRouter(prefix="/search", tags=["Search"])
 
 
+def response_cache(name: str, ttl: float) -> ResponseCache:
+    shared = None
+    if settings.response_cache_redis_enabled:
+        shared = RedisBytesCache(
+            namespace="flickfindr:responses", ttl=int(ttl + settings.response_cache_stale_seconds)
+        )
+    return ResponseCache(
+        name,
+        catalog_version_snapshot,
+        ttl=ttl,
+        stale_ttl=settings.response_cache_stale_seconds,
+        maxsize=settings.response_cache_size,
+        shared=shared,
+        enabled=settings.response_cache_enabled,
+    )
+
+
+structural_cache = response_cache("structural", settings.structural_cache_ttl)
+structural_summary_cache = response_cache("structural_summary", settings.structural_cache_ttl)
+hybrid_cache = response_cache("hybrid", settings.hybrid_cache_ttl)
+rows_cache = response_cache("rows", settings.structural_cache_ttl)
+RESPONSE_CACHES = (structural_cache, structural_summary_cache, hybrid_cache, rows_cache)
+
+metrics.register_collector("response_cache", lambda: {cache.name: cache.stats() for cache in RESPONSE_CACHES})
+
+# Semantic results aren't cached, but identical concurrent queries share one embedding + ranking
+semantic_flight: SingleFlight[SemanticSearchResponse] = SingleFlight("semantic")
+
+
+def json_response(body: bytes, cache_status: str) -> Response:
+    """Send already-serialized JSON as is (no response_model validation on the way out)."""
+    return Response(content=body, media_type="application/json", headers={"X-Cache": cache_status})
+
+
 @router.post("/structural", response_model=SearchResponse)
 async def structural_search(
     db: DbSession,
@@ -32,20 +79,27 @@ async def structural_search(
     - Filtering by genre, directors, stars
     - Rating and runtime range filters
     - Sorting by rating, runtime, name, metascore
-    - Pagination
-    """
-    try:
-        service = StructuralSearchService(db)
-        results, total = service.execute_search(request)
+    - Pagination: keyset via `cursor`/`next_cursor`, or `skip`/`limit`
 
+    Responses are cached per request and catalog version (`X-Cache` header).
+    """
+    async def render(session) -> bytes:
+        page = await StructuralSearchService(session).execute_page(request)
         return SearchResponse(
-            results=[MovieResult.model_validate(movie) for movie in results],
-            total=total,
+            results=[MovieResult.model_validate(movie) for movie in page.results],
+            total=page.total,
+            total_is_exact=page.total_is_exact,
             skip=request.skip,
             limit=request.limit,
-            has_more=(request.skip + len(results)) < total,
-        )
+            has_more=page.has_more,
+            next_cursor=page.next_cursor,
+        ).model_dump_json().encode()
+
+    try:
+        return json_response(*await structural_cache.get_or_compute(db, request, render))
 
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -53,12 +107,78 @@ async def structural_search(
         raise HTTPException(status_code=500, detail="Search failed")
 
 
+@router.post("/structural/summary", response_model=SummarySearchResponse)
+async def structural_search_summary(
+    db: DbSession,
+    request: StructuralSearchRequest,
+) -> SummarySearchResponse:
+    """
+    Structural search returning compact movie cards.
+
+    Same filters, sorting and pagination as `/search/structural`, but only the
+    card columns are selected: no plot, people or embedding.
+    """
+    async def render(session) -> bytes:
+        page = await StructuralSearchService(session).execute_page(request, columns=SUMMARY_COLUMNS)
+        return SummarySearchResponse(
+            results=[MovieSummary.model_validate(row) for row in page.results],
+            total=page.total,
+            total_is_exact=page.total_is_exact,
+            skip=request.skip,
+            limit=request.limit,
+            has_more=page.has_more,
+            next_cursor=page.next_cursor,
+        ).model_dump_json().encode()
+
+    try:
+        return json_response(*await structural_summary_cache.get_or_compute(db, request, render))
+
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Structural summary search failed: {str(e)}")
+        raise HTTPException(status_code=500, detail="Search failed")
+
+
+@router.post("/rows", response_model=GenreRowsResponse)
+async def genre_rows(
+    db: DbSession,
+    request: GenreRowsRequest,
+) -> GenreRowsResponse:
+    """
+    Homepage rows: the top-rated movies of each requested genre.
+
+    One request and one SQL statement (a per-genre ROW_NUMBER() window)
+    replace a structural search per genre. Cached like structural search.
+    """
+    async def render(session) -> bytes:
+        rows = await StructuralSearchService(session).genre_rows(request.genres, request.limit)
+        return GenreRowsResponse(
+            rows=[
+                GenreRow(
+                    genre=genre,
+                    results=[MovieSummary.model_validate(row) for row in rows[name_key(genre)]],
+                )
+                for genre in dict.fromkeys(request.genres)
+            ]
+        ).model_dump_json().encode()
+
+    try:
+        return json_response(*await rows_cache.get_or_compute(db, request, render))
+
+    except Exception as e:
+        logger.error(f"Genre rows failed: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve genre rows")
+
+
 @router.get("/genres", response_model=List[GenreItem])
 async def get_genres(db: DbSession) -> List[GenreItem]:
     """Get list of all unique genres with movie counts."""
     try:
         service = StructuralSearchService(db)
-        return service.get_genres()
+        return await service.get_genres()
 
     except Exception as e:
         logger.error(f"Failed to get genres: {str(e)}")
@@ -70,7 +190,7 @@ async def get_stats(db: DbSession) -> MovieStats:
     """Get movie statistics (min/max values) for filter UI."""
     try:
         service = StructuralSearchService(db)
-        return service.get_stats()
+        return await service.get_stats()
 
     except Exception as e:
         logger.error(f"Failed to get stats: {str(e)}")
@@ -93,10 +213,8 @@ async def semantic_search(
     - "superhero fights crime in a dark city"
     - "time travel and romance"
     """
-    try:
-        service = SemanticSearchService(db)
-        result = service.semantic_search(request)
-
+    async def search() -> SemanticSearchResponse:
+        result = await SemanticSearchService(db).semantic_search(request)
         return SemanticSearchResponse(
             results=[MovieResult(**movie) for movie in result["movies"]],
             query=request.query,
@@ -105,6 +223,9 @@ async def semantic_search(
             message=result["message"],
         )
 
+    try:
+        return await semantic_flight.do(request_fingerprint(request), search)
+
     except HTTPException:
         raise
     except Exception as e:
@@ -112,6 +233,36 @@ async def semantic_search(
         raise HTTPException(status_code=500, detail="Semantic search failed")
 
 
+@router.post("/semantic/batch", response_class=StreamingResponse)
+async def semantic_search_batch(
+    db: DbSession,
+    request: SemanticBatchRequest,
+) -> StreamingResponse:
+    """
+    Semantic search for many queries in one call.
+
+    Streams newline-delimited JSON, one `SemanticBatchResult` per query in
+    request order. Queries are embedded together and ranked together (one
+    database round trip per chunk), instead of one HTTP call, model call
+    and query each.
+    """
+    service = SemanticSearchService(db)
+
+    async def lines():
+        async for result in service.semantic_batch(request):
+            line = SemanticBatchResult(
+                index=result["index"],
+                query=result["query"],
+                results=[MovieResult(**movie) for movie in result["movies"]],
+                exact_matches=result["exact_matches"],
+                message=result["message"],
+                error=result.get("error"),
+            )
+            yield line.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.post("/hybrid", response_model=SemanticSearchResponse)
 async def hybrid_search(
     db: DbSession,
@@ -125,18 +276,27 @@ async def hybrid_search(
 
     This is useful when you want to find movies matching specific criteria
     AND also matching a descriptive query about the plot.
-    """
-    try:
-        service = SemanticSearchService(db)
-        result = service.hybrid_search(request)
 
+    With `mode=rrf`, a full-text ranking and a vector ranking run concurrently
+    and are merged with reciprocal rank fusion, so exact title and name
+    matches rank well too; `timings` reports each stage.
+
+    Responses are cached per request and catalog version (`X-Cache` header);
+    a cached response keeps the `timings` of the request that computed it.
+    """
+    async def render(session) -> bytes:
+        result = await SemanticSearchService(session).hybrid_search(request)
         return SemanticSearchResponse(
             results=[MovieResult(**movie) for movie in result["movies"]],
             query=request.query,
             limit=request.limit,
             exact_matches=result["exact_matches"],
             message=result["message"],
-        )
+            timings=result.get("timings"),
+        ).model_dump_json().encode()
+
+    try:
+        return json_response(*await hybrid_cache.get_or_compute(db, request, render))
 
     except HTTPException:
         raise
@@ -0,0 +1,113 @@
+"""
+Process-pool execution for embedding inference.
+
+Tokenization and the Python side of `model.encode` hold the GIL, so threads
+plateau at roughly one core. In process mode each long-lived worker process
+loads the model once (with an explicit torch thread count) and the API
+process only ships texts over and float32 arrays back.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+from ..logging import logger
+
+# Model loaded once per worker process by `_init_worker`
+_worker_model = None
+
+
+def _init_worker(model_name: str, backend: str, onnx_file: Optional[str], expected_dim: int, threads: int) -> None:
+    global _worker_model
+    # Must be set before torch / onnxruntime spin up their thread pools
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    from .backends import load_embedding_model
+
+    _worker_model = load_embedding_model(model_name, backend, onnx_file, expected_dim)
+
+
+def _encode_in_worker(texts: List[str], batch_size: int) -> np.ndarray:
+    return _worker_model.encode(
+        texts, batch_size=batch_size, show_progress_bar=False, convert_to_numpy=True
+    ).astype(np.float32, copy=False)
+
+
+class EmbeddingProcessPool:
+    """Pool of embedding processes, each holding its own copy of the model."""
+
+    def __init__(
+        self,
+        model_name: str,
+        backend: str,
+        onnx_file: Optional[str],
+        expected_dim: int,
+        processes: int = 0,
+        threads_per_process: int = 1,
+    ):
+        self.processes = processes or max(1, (os.cpu_count() or 1) // max(1, threads_per_process))
+        self.threads_per_process = threads_per_process
+        self._initargs = (model_name, backend, onnx_file, expected_dim, threads_per_process)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            logger.info(
+                f"Starting {self.processes} embedding processes "
+                f"({self.threads_per_process} torch thread(s) each)"
+            )
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                # spawn: never fork a process that already holds torch / event loop state
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=self._initargs,
+            )
+        return self._executor
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Blocking encode, split across processes for large inputs."""
+        chunks = self._chunks(texts, batch_size)
+        futures = [self.executor.submit(_encode_in_worker, chunk, batch_size) for chunk in chunks]
+        return np.concatenate([f.result() for f in futures]) if futures else np.empty((0, 0), np.float32)
+
+    async def aencode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Encode without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        chunks = self._chunks(texts, batch_size)
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self.executor, _encode_in_worker, chunk, batch_size) for chunk in chunks)
+        )
+        return np.concatenate(results) if results else np.empty((0, 0), np.float32)
+
+    async def warm_up(self) -> None:
+        """Start every process (each loads the model) and run one encode in each."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(self.executor, _encode_in_worker, ["warm up"], 1)
+                for _ in range(self.processes)
+            )
+        )
+
+    def _chunks(self, texts: List[str], batch_size: int) -> List[List[str]]:
+        # Spread large inputs over all processes, but never below one model batch per chunk
+        size = max(batch_size, -(-len(texts) // self.processes))
+        return [texts[i : i + size] for i in range(0, len(texts), size)]
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
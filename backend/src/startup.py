@@ -0,0 +1,109 @@
+"""
+Startup warm-up and readiness tracking.
+
+The API starts accepting connections immediately, but `/ready` reports
+unhealthy until the embedding model is loaded, a warm-up encode has run, the
+database pool holds open connections and (for the memory engine) the vector
+index is loaded, so the load balancer never routes
+traffic to a cold worker.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+from .db.core import LocalSession, engine
+from .logging import logger
+
+
+class Readiness:
+    """Tracks whether this worker has finished warming up."""
+
+    def __init__(self):
+        self.ready = False
+        self.error: Optional[str] = None
+        self.started_at = time.monotonic()
+        self.warmup_seconds: Optional[float] = None
+
+    def reset(self) -> None:
+        self.__init__()
+
+    async def run(self, warm_up: Callable[[], Awaitable[None]], retry_delay: float = 2.0) -> None:
+        """Run `warm_up` until it succeeds, then mark the worker ready."""
+        delay = retry_delay
+        while True:
+            try:
+                await warm_up()
+                break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.error = str(e)
+                logger.error(f"Warm-up failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
+
+        self.error = None
+        self.warmup_seconds = round(time.monotonic() - self.started_at, 2)
+        self.ready = True
+        logger.info(f"Worker ready after {self.warmup_seconds}s warm-up")
+
+    def status(self) -> dict:
+        return {"ready": self.ready, "warmup_seconds": self.warmup_seconds, "error": self.error}
+
+
+readiness = Readiness()
+
+
+async def warm_up_model() -> None:
+    """Load the embedding model and run one encode so first requests are fast."""
+    from .search.embedding import encode_queries, get_model, get_process_pool, uses_process_pool
+
+    if uses_process_pool():
+        # Each embedding process loads its own model; the API process never does
+        await get_process_pool().warm_up()
+    else:
+        await run_in_threadpool(get_model)
+        await run_in_threadpool(encode_queries, ["warm up the embedding model"])
+    logger.info("Embedding model warmed up")
+
+
+async def prime_db_pool() -> None:
+    """Open `db_pool_warm_connections` pooled connections concurrently."""
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    count = min(settings.db_pool_warm_connections, settings.db_pool_size)
+    await asyncio.gather(*(ping() for _ in range(count)))
+    logger.info(f"Database pool primed with {count} connections")
+
+
+async def load_vector_index() -> None:
+    """Load the in-process embedding matrix when the memory engine is selected."""
+    if settings.semantic_search_engine != "memory":
+        return
+    from .search.vector_index import vector_index
+
+    async with LocalSession() as db:
+        await vector_index.load(db)
+
+
+async def warm_up() -> None:
+    await asyncio.gather(warm_up_model(), prime_db_pool(), load_vector_index())
+
+
+async def shut_down() -> None:
+    """Release background workers and pooled connections."""
+    from .search.embedding import close_embedding_scheduler
+    from .search.views import RESPONSE_CACHES
+
+    # Stale-while-revalidate refreshes hold sessions of their own; let them finish first
+    await asyncio.gather(*(cache.wait_for_refreshes() for cache in RESPONSE_CACHES))
+    await close_embedding_scheduler()
+    await engine.dispose()
@@ -2,67 +2,91 @@
 Pytest fixtures and configuration for FlickFindr tests.
 """
 
+from unittest.mock import AsyncMock, patch
+
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 
+from src.db.catalog import refresh_genre_counts
 from src.db.core import Base, get_db
-from src.db.entity import Movie
+from src.db.entity import Genre, Movie, MovieGenre, MoviePerson, Person
+from src.db.normalize import build_links
+from src.search.embedding import clear_embedding_cache
+from src.search.service import catalog_version_snapshot, genre_snapshot, stats_snapshot
+from src.search.views import RESPONSE_CACHES
 from main import app
 
 
-# Test database setup - use in-memory SQLite with StaticPool for thread safety
-TEST_DATABASE_URL = "sqlite:///:memory:"
+@pytest.fixture(autouse=True)
+def reset_embedding_cache():
+    """Keep cached query embeddings from leaking between tests."""
+    clear_embedding_cache()
+    yield
+    clear_embedding_cache()
+
 
+@pytest.fixture(autouse=True)
+def reset_catalog_snapshots():
+    """Every test starts at catalog version 0, so snapshots and cached responses must not outlive it."""
+    snapshots = (catalog_version_snapshot, genre_snapshot, stats_snapshot, *RESPONSE_CACHES)
+    for snapshot in snapshots:
+        snapshot.clear()
+    yield
+    for snapshot in snapshots:
+        snapshot.clear()
 
+
+# Test database setup - use a file-backed SQLite database through aiosqlite.
+# NullPool gives every session a fresh connection, so the TestClient's event
+# loop never reuses a connection opened on the test's event loop.
 @pytest.fixture(scope="function")
-def test_engine():
+def test_database_url(tmp_path):
+    """Per-test SQLite database URL."""
+    return f"sqlite+aiosqlite:///{tmp_path / 'test.db'}"
+
+
+@pytest.fixture(scope="function")
+async def test_engine(test_database_url):
     """Create a test database engine."""
-    engine = create_engine(
-        TEST_DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-    Base.metadata.create_all(bind=engine)
+    engine = create_async_engine(test_database_url, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     yield engine
-    Base.metadata.drop_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
 
 
 @pytest.fixture(scope="function")
-def test_db(test_engine):
+async def test_db(test_engine):
     """Create a test database session."""
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
-    db = TestingSessionLocal()
-    try:
+    TestingSessionLocal = async_sessionmaker(bind=test_engine, autoflush=False, expire_on_commit=False)
+    async with TestingSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 @pytest.fixture(scope="function")
 def test_client(test_engine):
     """Create a test client with test database."""
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+    TestingSessionLocal = async_sessionmaker(bind=test_engine, autoflush=False, expire_on_commit=False)
     
-    def override_get_db():
-        db = TestingSessionLocal()
-        try:
+    async def override_get_db():
+        async with TestingSessionLocal() as db:
             yield db
-        finally:
-            db.close()
     
     app.dependency_overrides[get_db] = override_get_db
     
-    with TestClient(app) as client:
+    # Skip loading the real model and connecting to Postgres on startup
+    with patch("main.warm_up", AsyncMock()), patch("main.shut_down", AsyncMock()), TestClient(app) as client:
         yield client
     
     app.dependency_overrides.clear()
 
 
 @pytest.fixture
-def sample_movies(test_db):
+async def sample_movies(test_db):
     """Insert sample movies for testing."""
     movies = [
         Movie(
@@ -139,7 +163,18 @@ def sample_movies(test_db):
     
     for movie in movies:
         test_db.add(movie)
-    test_db.commit()
+    await test_db.flush()
+
+    # Normalized genres / people, as ingestion/ingest.py fills them
+    links = build_links((m.id, m.genre, m.directors, m.stars) for m in movies)
+    test_db.add_all(Genre(id=i, name=name, key=key) for i, name, key in links.genres)
+    test_db.add_all(Person(id=i, name=name, key=key) for i, name, key in links.people)
+    await test_db.flush()
+    test_db.add_all(MovieGenre(movie_id=m, genre_id=g) for m, g in links.movie_genres)
+    test_db.add_all(MoviePerson(movie_id=m, person_id=p, role=r) for m, p, r in links.movie_people)
+    await test_db.flush()
+    await refresh_genre_counts(test_db)
+    await test_db.commit()
     
     return movies
 
@@ -0,0 +1,62 @@
+"""
+Unit tests for embedding inference backends.
+"""
+
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.search.backends import backend_label, load_embedding_model
+
+
+@pytest.fixture
+def fake_sentence_transformers():
+    """Stand-in sentence_transformers module recording constructor calls."""
+    module = MagicMock()
+    module.SentenceTransformer.return_value.get_sentence_embedding_dimension.return_value = 384
+    with patch.dict(sys.modules, {"sentence_transformers": module}):
+        yield module
+
+
+class TestBackendLabel:
+    """Tests for backend_label."""
+
+    def test_torch(self):
+        assert backend_label("torch") == "torch"
+
+    def test_onnx_default_graph(self):
+        assert backend_label("onnx") == "onnx"
+
+    def test_onnx_quantized_graph(self):
+        assert backend_label("onnx", "onnx/model_qint8_avx2.onnx") == "onnx-model_qint8_avx2"
+
+
+class TestLoadEmbeddingModel:
+    """Tests for load_embedding_model."""
+
+    def test_torch_backend(self, fake_sentence_transformers):
+        """Test the torch backend loads the plain model."""
+        load_embedding_model("all-MiniLM-L6-v2", "torch", None, 384)
+        fake_sentence_transformers.SentenceTransformer.assert_called_once_with("all-MiniLM-L6-v2", device=None)
+
+    def test_onnx_backend_with_quantized_file(self, fake_sentence_transformers):
+        """Test the onnx backend passes the graph file through."""
+        load_embedding_model("all-MiniLM-L6-v2", "onnx", "onnx/model_qint8_avx2.onnx", 384)
+        fake_sentence_transformers.SentenceTransformer.assert_called_once_with(
+            "all-MiniLM-L6-v2",
+            device="cpu",
+            backend="onnx",
+            model_kwargs={"file_name": "onnx/model_qint8_avx2.onnx"},
+        )
+
+    def test_dimension_mismatch_rejected(self, fake_sentence_transformers):
+        """Test vectors must fit the plot_embedding column."""
+        fake_sentence_transformers.SentenceTransformer.return_value.get_sentence_embedding_dimension.return_value = 768
+        with pytest.raises(ValueError, match="768"):
+            load_embedding_model("other-model", "torch", None, 384)
+
+    def test_unknown_backend(self, fake_sentence_transformers):
+        """Test unknown backends are rejected."""
+        with pytest.raises(ValueError):
+            load_embedding_model("all-MiniLM-L6-v2", "tensorrt", None, 384)
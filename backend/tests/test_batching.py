@@ -0,0 +1,111 @@
+"""
+Unit tests for the embedding micro-batching scheduler.
+"""
+
+import asyncio
+
+import pytest
+
+from src.search.batching import EmbeddingBatcher, SchedulerClosed, batch_size_histogram
+
+
+class RecordingEncoder:
+    """Fake batched encoder that records each call's texts."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t))] * 3 for t in texts]
+
+
+class TestEmbeddingBatcher:
+    """Tests for EmbeddingBatcher."""
+
+    async def test_concurrent_queries_share_one_encode(self):
+        """Test queries arriving together are encoded in one call."""
+        encoder = RecordingEncoder()
+        batcher = EmbeddingBatcher(encoder, max_batch_size=8, max_wait_ms=20)
+
+        results = await asyncio.gather(*(batcher.embed("x" * n) for n in range(1, 6)))
+        await batcher.close()
+
+        assert len(encoder.calls) == 1
+        assert len(encoder.calls[0]) == 5
+        # Each caller gets its own vector back
+        assert [r[0] for r in results] == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+    async def test_max_batch_size_splits_batches(self):
+        """Test batches never exceed max_batch_size."""
+        encoder = RecordingEncoder()
+        batcher = EmbeddingBatcher(encoder, max_batch_size=2, max_wait_ms=20)
+
+        await asyncio.gather(*(batcher.embed(f"q{n}") for n in range(5)))
+        await batcher.close()
+
+        assert [len(c) for c in encoder.calls] == [2, 2, 1]
+
+    async def test_encode_error_propagates_to_callers(self):
+        """Test a failing encode call fails every query in the batch."""
+
+        def failing(texts):
+            raise RuntimeError("model error")
+
+        batcher = EmbeddingBatcher(failing, max_batch_size=4, max_wait_ms=5)
+        with pytest.raises(RuntimeError):
+            await batcher.embed("query")
+
+        # The worker keeps serving later batches
+        batcher.encode_batch = RecordingEncoder()
+        assert await batcher.embed("ok") == [2.0, 2.0, 2.0]
+        await batcher.close()
+
+    async def test_batch_size_histogram_recorded(self):
+        """Test batch sizes are observed."""
+        before = batch_size_histogram.count
+        batcher = EmbeddingBatcher(RecordingEncoder(), max_batch_size=4, max_wait_ms=5)
+        await batcher.embed("query")
+        await batcher.close()
+        assert batch_size_histogram.count == before + 1
+
+    async def test_batches_overlap_up_to_max_in_flight(self):
+        """Test later batches start encoding while earlier ones are still running."""
+        running, peak = 0, 0
+
+        async def slow_encoder(texts):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return [[1.0]] * len(texts)
+
+        batcher = EmbeddingBatcher(slow_encoder, max_batch_size=1, max_wait_ms=1, max_in_flight=2)
+        await asyncio.gather(*(batcher.embed(f"q{n}") for n in range(6)))
+        await batcher.close()
+
+        assert peak == 2
+
+    async def test_close_fails_queued_queries(self):
+        """Test queries still queued at shutdown fail instead of hanging; in-flight ones finish."""
+        started = asyncio.Event()
+
+        async def slow_encoder(texts):
+            started.set()
+            await asyncio.sleep(0.02)
+            return [[1.0]] * len(texts)
+
+        batcher = EmbeddingBatcher(slow_encoder, max_batch_size=1, max_wait_ms=1)
+        tasks = [asyncio.create_task(batcher.embed(f"q{n}")) for n in range(3)]
+        await started.wait()
+        await batcher.close()
+
+        results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 1)
+        assert results[0] == [1.0]
+        assert all(isinstance(r, SchedulerClosed) for r in results[1:])
+
+    def test_invalid_batch_size(self):
+        """Test max_batch_size must be positive."""
+        with pytest.raises(ValueError):
+            EmbeddingBatcher(RecordingEncoder(), max_batch_size=0)
@@ -0,0 +1,456 @@
+"""
+Unit tests for cache primitives.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import asyncio
+
+import fakeredis
+import pytest
+
+from src.cache import (
+    RedisBytesCache,
+    RedisJsonCache,
+    RedisVectorCache,
+    ResponseCache,
+    SingleFlight,
+    TTLCache,
+    VersionedSnapshot,
+    request_fingerprint,
+)
+from src.search.models import StructuralSearchRequest
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_get_miss_returns_default(self):
+        """Test missing keys return the default."""
+        cache = TTLCache(maxsize=2, ttl=10)
+        assert cache.get("missing") is None
+        assert cache.get("missing", "x") == "x"
+        assert cache.misses == 2
+
+    def test_set_then_get(self):
+        """Test stored values are returned and counted as hits."""
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.hits == 1
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted when full."""
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.evictions == 1
+
+    def test_ttl_expiry(self):
+        """Test entries expire after the TTL."""
+        clock = FakeClock()
+        cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 9.9
+        assert cache.get("a") == 1
+        clock.now = 10.0
+        assert cache.get("a") is None
+        assert cache.expirations == 1
+        assert len(cache) == 0
+
+    def test_per_entry_ttl(self):
+        """Test a per-entry TTL overrides the default."""
+        clock = FakeClock()
+        cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+        cache.set("a", 1, ttl=1)
+        clock.now = 2
+        assert cache.get("a") is None
+
+    def test_stats(self):
+        """Test stats report counters and hit rate."""
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["size"] == 1
+
+    def test_clear_resets_counters(self):
+        """Test clear drops entries and counters."""
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.hits == 0
+
+    def test_invalid_maxsize(self):
+        """Test maxsize must be positive."""
+        with pytest.raises(ValueError):
+            TTLCache(maxsize=0, ttl=10)
+
+
+class TestRedisVectorCache:
+    """Tests for RedisVectorCache against fakeredis."""
+
+    @pytest.fixture
+    def cache(self):
+        return RedisVectorCache(namespace="test:emb", ttl=60, dim=4, client=fakeredis.FakeRedis())
+
+    def test_roundtrip_packed_float32(self, cache):
+        """Test vectors are stored as packed float32 bytes."""
+        cache.set("query", [0.5, 0.25, -1.0, 2.0])
+
+        raw = cache.client.get(cache.key_for("query"))
+        assert len(raw) == 4 * 4
+        assert cache.get("query").tolist() == [0.5, 0.25, -1.0, 2.0]
+
+    def test_key_is_namespaced_and_expires(self, cache):
+        """Test keys carry the namespace and an expiry."""
+        cache.set("query", [0.0] * 4)
+        key = cache.key_for("query")
+        assert key.startswith("test:emb:")
+        assert 0 < cache.client.ttl(key) <= 60
+
+    def test_miss_and_wrong_dimension(self, cache):
+        """Test misses and vectors of the wrong size return None."""
+        assert cache.get("missing") is None
+        cache.client.set(cache.key_for("bad"), b"\x00" * 8)
+        assert cache.get("bad") is None
+        assert cache.misses == 2
+
+    def test_errors_back_off(self):
+        """Test Redis errors are swallowed and the tier backs off."""
+        client = MagicMock()
+        client.get.side_effect = ConnectionError("down")
+        cache = RedisVectorCache(namespace="test", ttl=60, dim=4, client=client)
+
+        assert cache.get("query") is None
+        assert cache.get("query") is None
+        assert client.get.call_count == 1
+        assert cache.errors == 1
+
+
+class TestRedisJsonCache:
+    """Tests for RedisJsonCache against fakeredis."""
+
+    @pytest.fixture
+    def cache(self):
+        return RedisJsonCache(namespace="test:catalog", ttl=60, client=fakeredis.FakeRedis())
+
+    def test_roundtrip(self, cache):
+        """Test JSON values round-trip under a namespaced, expiring key."""
+        cache.set("v3", {"total_movies": 5, "genres": ["Drama"]})
+        assert cache.get("v3") == {"total_movies": 5, "genres": ["Drama"]}
+        assert 0 < cache.client.ttl("test:catalog:v3") <= 60
+        assert cache.hits == 1
+
+    def test_miss_and_corrupt_value(self, cache):
+        """Test misses and undecodable values return None."""
+        assert cache.get("v1") is None
+        cache.client.set(cache.key_for("bad"), b"{not json")
+        assert cache.get("bad") is None
+        assert cache.misses == 2
+
+    def test_errors_back_off(self):
+        """Test Redis errors are swallowed and the tier backs off."""
+        client = MagicMock()
+        client.set.side_effect = ConnectionError("down")
+        cache = RedisJsonCache(namespace="test", ttl=60, client=client)
+
+        cache.set("v1", 1)
+        assert cache.get("v1") is None
+        client.get.assert_not_called()
+        assert cache.errors == 1
+        assert cache.misses == 0
+
+
+class TestVersionedSnapshot:
+    """Tests for VersionedSnapshot."""
+
+    async def test_loads_once_per_version(self):
+        """Test the loader runs again only when the catalog version changes."""
+        loader = AsyncMock(side_effect=["v1", "v2"])
+        snapshot = VersionedSnapshot(loader, refresh_interval=0)
+
+        with patch("src.cache.snapshot.get_catalog_version", AsyncMock(side_effect=[1, 1, 2])):
+            assert await snapshot.get(MagicMock()) == "v1"
+            assert await snapshot.get(MagicMock()) == "v1"
+            assert await snapshot.get(MagicMock()) == "v2"
+
+        assert snapshot.loads == 2
+
+    async def test_version_checked_once_per_interval(self):
+        """Test no database work happens between version checks."""
+        snapshot = VersionedSnapshot(AsyncMock(return_value="v1"), refresh_interval=60)
+        get_version = AsyncMock(return_value=1)
+
+        with patch("src.cache.snapshot.get_catalog_version", get_version):
+            for _ in range(5):
+                assert await snapshot.get(MagicMock()) == "v1"
+
+        assert get_version.await_count == 1
+
+    async def test_clear_forces_reload(self):
+        """Test clear() drops the snapshot."""
+        loader = AsyncMock(side_effect=["v1", "v1 again"])
+        snapshot = VersionedSnapshot(loader, refresh_interval=60)
+
+        with patch("src.cache.snapshot.get_catalog_version", AsyncMock(return_value=1)):
+            await snapshot.get(MagicMock())
+            snapshot.clear()
+            assert await snapshot.get(MagicMock()) == "v1 again"
+
+    async def test_shared_tier_serves_other_workers(self):
+        """Test a value loaded by one worker is read from Redis by the next."""
+        shared = RedisJsonCache(namespace="test:stats", ttl=60, client=fakeredis.FakeRedis())
+        first = VersionedSnapshot(AsyncMock(return_value={"n": 5}), shared=shared)
+        second_loader = AsyncMock()
+        second = VersionedSnapshot(second_loader, shared=shared, decode=lambda value: value["n"])
+
+        with patch("src.cache.snapshot.get_catalog_version", AsyncMock(return_value=7)):
+            assert await first.get(MagicMock()) == {"n": 5}
+            assert await second.get(MagicMock()) == 5
+
+        second_loader.assert_not_awaited()
+        assert (first.loads, second.loads) == (1, 0)
+        assert shared.client.get("test:stats:v7") is not None
+
+    async def test_shared_tier_is_keyed_by_version(self):
+        """Test a new catalog version never reads the previous version's value."""
+        shared = RedisJsonCache(namespace="test:stats", ttl=60, client=fakeredis.FakeRedis())
+        shared.set("v1", "old")
+        snapshot = VersionedSnapshot(AsyncMock(return_value="new"), refresh_interval=0, shared=shared)
+
+        with patch("src.cache.snapshot.get_catalog_version", AsyncMock(return_value=2)):
+            assert await snapshot.get(MagicMock()) == "new"
+        assert shared.get("v2") == "new"
+
+
+class FixedVersion:
+    """Stand-in for the catalog version snapshot."""
+
+    def __init__(self, version=1):
+        self.version = version
+
+    async def get(self, db):
+        return self.version
+
+
+def counting_render(*bodies):
+    """compute() returning the given bodies in turn, recording each call."""
+    calls = []
+
+    async def render(session):
+        calls.append(session)
+        return bodies[len(calls) - 1]
+
+    return render, calls
+
+
+class TestRequestFingerprint:
+    """Tests for request_fingerprint."""
+
+    def test_equivalent_requests_match(self):
+        """Test explicit defaults and field order don't change the fingerprint."""
+        a = StructuralSearchRequest(genre="Drama", limit=20)
+        b = StructuralSearchRequest.model_validate({"limit": 20, "skip": 0, "genre": "Drama"})
+        assert request_fingerprint(a) == request_fingerprint(b)
+
+    def test_different_requests_differ(self):
+        """Test any field change gives a new fingerprint."""
+        assert request_fingerprint(StructuralSearchRequest(genre="Drama")) != request_fingerprint(
+            StructuralSearchRequest(genre="Crime")
+        )
+
+
+class TestResponseCache:
+    """Tests for ResponseCache."""
+
+    async def test_hit_skips_compute(self):
+        """Test the second identical request is served from the cache."""
+        cache = ResponseCache("test", FixedVersion(), ttl=60)
+        render, calls = counting_render(b'{"n":1}')
+        request = StructuralSearchRequest(genre="Drama")
+
+        assert await cache.get_or_compute(MagicMock(), request, render) == (b'{"n":1}', "miss")
+        assert await cache.get_or_compute(MagicMock(), request, render) == (b'{"n":1}', "hit")
+        assert len(calls) == 1
+
+    async def test_catalog_version_changes_key(self):
+        """Test a version bump never serves the previous version's response."""
+        version = FixedVersion(1)
+        cache = ResponseCache("test", version, ttl=60)
+        render, calls = counting_render(b"old", b"new")
+        request = StructuralSearchRequest()
+
+        await cache.get_or_compute(MagicMock(), request, render)
+        version.version = 2
+        assert await cache.get_or_compute(MagicMock(), request, render) == (b"new", "miss")
+
+    async def test_stale_served_while_one_refresh_runs(self):
+        """Test stale entries are returned immediately and refreshed once in the background."""
+        clock = FakeClock()
+        cache = ResponseCache("test", FixedVersion(), ttl=10, stale_ttl=100, clock=clock)
+        render, calls = counting_render(b"v1", b"v2")
+        request = StructuralSearchRequest()
+        await cache.get_or_compute(MagicMock(), request, render)
+
+        clock.now = 20
+        with patch("src.cache.responses.AsyncSession", MagicMock()):
+            first = await cache.get_or_compute(MagicMock(), request, render)
+            second = await cache.get_or_compute(MagicMock(), request, render)
+            await cache.wait_for_refreshes()
+
+        assert first == second == (b"v1", "stale")
+        assert len(calls) == 2  # the original compute + one shared refresh
+        assert await cache.get_or_compute(MagicMock(), request, render) == (b"v2", "hit")
+
+    async def test_expired_beyond_stale_window_recomputes(self):
+        """Test entries older than ttl + stale_ttl are computed inline again."""
+        clock = FakeClock()
+        cache = ResponseCache("test", FixedVersion(), ttl=10, stale_ttl=5, clock=clock)
+        render, _ = counting_render(b"v1", b"v2")
+        request = StructuralSearchRequest()
+        await cache.get_or_compute(MagicMock(), request, render)
+
+        clock.now = 16
+        cache.local.clear()  # the local tier expires on its own monotonic clock
+        assert await cache.get_or_compute(MagicMock(), request, render) == (b"v2", "miss")
+
+    async def test_shared_tier_serves_other_workers(self):
+        """Test a response computed by one worker is served from Redis by another."""
+        shared = RedisBytesCache(namespace="test:responses", ttl=60, client=fakeredis.FakeRedis())
+        first = ResponseCache("test", FixedVersion(), ttl=60, shared=shared)
+        second = ResponseCache("test", FixedVersion(), ttl=60, shared=shared)
+        render, calls = counting_render(b'{"n":1}')
+        request = StructuralSearchRequest(genre="Drama")
+
+        await first.get_or_compute(MagicMock(), request, render)
+        assert await second.get_or_compute(MagicMock(), request, render) == (b'{"n":1}', "hit")
+        assert len(calls) == 1
+
+    async def test_disabled_bypasses(self):
+        """Test a disabled cache always computes."""
+        cache = ResponseCache("test", FixedVersion(), ttl=60, enabled=False)
+        render, calls = counting_render(b"a", b"b")
+        request = StructuralSearchRequest()
+
+        assert await cache.get_or_compute(MagicMock(), request, render) == (b"a", "bypass")
+        assert await cache.get_or_compute(MagicMock(), request, render) == (b"b", "bypass")
+
+    async def test_version_lookup_failure_serves_uncached(self):
+        """Test a failing catalog version lookup degrades to an uncached response."""
+        version = MagicMock()
+        version.get = AsyncMock(side_effect=RuntimeError("relation catalog_version does not exist"))
+        cache = ResponseCache("test", version, ttl=60)
+        render, calls = counting_render(b"a", b"b")
+        db = AsyncMock()
+        request = StructuralSearchRequest(genre="Drama")
+
+        assert await cache.get_or_compute(db, request, render) == (b"a", "bypass")
+        assert await cache.get_or_compute(db, request, render) == (b"b", "bypass")
+        assert cache.stats()["version_errors"] == 2
+        assert len(cache.local) == 0
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight."""
+
+    async def test_concurrent_calls_share_one_computation(self):
+        """Test identical in-flight calls run fn once and all get its result."""
+        flight = SingleFlight("test_share")
+        release = asyncio.Event()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await release.wait()
+            return "result"
+
+        waiters = [asyncio.create_task(flight.do("key", work)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert flight.in_flight == 1
+        release.set()
+
+        assert await asyncio.gather(*waiters) == ["result"] * 5
+        assert len(calls) == 1
+        assert (flight.leaders, flight.coalesced, flight.in_flight) == (1, 4, 0)
+
+    async def test_different_keys_and_later_calls_are_not_coalesced(self):
+        """Test only concurrent calls with the same key are merged."""
+        flight = SingleFlight("test_keys")
+        work = AsyncMock(return_value=1)
+
+        await asyncio.gather(flight.do("a", work), flight.do("b", work))
+        await flight.do("a", work)
+
+        assert work.await_count == 3
+        assert flight.coalesced == 0
+
+    async def test_exception_is_shared(self):
+        """Test followers receive the leader's exception."""
+        flight = SingleFlight("test_error")
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise RuntimeError("db down")
+
+        results = await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flight.coalesced == 1
+
+    async def test_follower_retries_when_leader_is_cancelled(self):
+        """Test a cancelled leader (client disconnect) doesn't fail its followers."""
+        flight = SingleFlight("test_cancel")
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        leader = asyncio.create_task(flight.do("key", slow))
+        await started.wait()
+        follower = asyncio.create_task(flight.do("key", AsyncMock(return_value="retried")))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "retried"
+
+    async def test_response_cache_misses_are_coalesced(self):
+        """Test concurrent misses for one request render the body once."""
+        cache = ResponseCache("test_coalesce", FixedVersion(), ttl=60)
+        calls = []
+
+        async def render(session):
+            calls.append(session)
+            await asyncio.sleep(0.01)
+            return b"body"
+
+        request = StructuralSearchRequest(genre="Drama")
+        results = await asyncio.gather(*(cache.get_or_compute(MagicMock(), request, render) for _ in range(4)))
+
+        assert results == [(b"body", "miss")] * 4
+        assert len(calls) == 1
+        assert cache.stats()["coalesced"] == 3
+        assert cache.stats()["misses"] == 1
@@ -2,13 +2,21 @@
 Unit tests for embedding service.
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import patch, MagicMock
+import fakeredis
 import numpy as np
 
+from src.search import embedding
 from src.search.embedding import (
+    clear_embedding_cache,
     generate_embedding,
     batch_generate_embeddings,
+    embed_query,
+    embed_queries,
+    embedding_cache_info,
     EMBEDDING_DIM,
 )
 
@@ -105,3 +113,168 @@ class TestBatchGenerateEmbeddings:
         assert len(result) == 2
         # None should get zero vector
         assert all(x == 0.0 for x in result[1])
+
+
+class TestEmbeddingCache:
+    """Tests for the query embedding cache in generate_embedding."""
+
+    def test_cased_model_keeps_case(self):
+        """Test cache keys only ignore case for uncased models."""
+        assert embedding.normalize_query("  Heist   Movie ") == "heist movie"
+        with patch.object(embedding.settings, "embedding_model_uncased", False):
+            assert embedding.normalize_query("  Heist   Movie ") == "Heist Movie"
+
+    @patch("src.search.embedding.get_model")
+    def test_repeated_query_skips_model(self, mock_get_model):
+        """Test a cache hit does not run model inference."""
+        mock_model = MagicMock()
+        mock_model.encode.return_value = np.array([0.1] * 384)
+        mock_get_model.return_value = mock_model
+
+        first = generate_embedding("prison escape")
+        second = generate_embedding("prison escape")
+
+        mock_model.encode.assert_called_once()
+        assert first == second
+
+    @patch("src.search.embedding.get_model")
+    def test_normalized_text_shares_entry(self, mock_get_model):
+        """Test case and whitespace differences hit the same entry."""
+        mock_model = MagicMock()
+        mock_model.encode.return_value = np.array([0.1] * 384)
+        mock_get_model.return_value = mock_model
+
+        generate_embedding("Prison  Escape")
+        generate_embedding("  prison escape ")
+
+        mock_model.encode.assert_called_once()
+        info = embedding_cache_info()
+        assert info["hits"] == 1
+        assert info["misses"] == 1
+
+    @patch("src.search.embedding.get_model")
+    def test_cached_result_is_a_copy(self, mock_get_model):
+        """Test mutating a returned embedding does not corrupt the cache."""
+        mock_model = MagicMock()
+        mock_model.encode.return_value = np.array([0.1] * 384)
+        mock_get_model.return_value = mock_model
+
+        generate_embedding("heist").clear()
+        assert len(generate_embedding("heist")) == 384
+
+    @patch.object(embedding.settings, "embedding_cache_enabled", False)
+    @patch("src.search.embedding.get_model")
+    def test_cache_disabled(self, mock_get_model):
+        """Test the config switch turns caching off."""
+        mock_model = MagicMock()
+        mock_model.encode.return_value = np.array([0.1] * 384)
+        mock_get_model.return_value = mock_model
+
+        generate_embedding("heist")
+        generate_embedding("heist")
+
+        assert mock_model.encode.call_count == 2
+
+
+class TestSharedEmbeddingCache:
+    """Tests for the Redis tier of the query embedding cache."""
+
+    @pytest.fixture
+    def shared_redis(self):
+        client = fakeredis.FakeRedis()
+        with patch.object(embedding._shared_cache, "_client", client), \
+                patch.object(embedding.settings, "embedding_redis_cache_enabled", True):
+            yield client
+
+    @patch("src.search.embedding.get_model")
+    def test_fresh_worker_hits_shared_tier(self, mock_get_model, shared_redis):
+        """Test a vector computed by one worker is reused after a restart."""
+        mock_model = MagicMock()
+        mock_model.encode.return_value = np.array([0.5] * 384)
+        mock_get_model.return_value = mock_model
+
+        generate_embedding("space opera")
+        clear_embedding_cache()  # simulate a freshly started worker
+        result = generate_embedding("Space Opera")
+
+        mock_model.encode.assert_called_once()
+        assert result == [0.5] * 384
+        assert len(shared_redis.keys("flickfindr:emb:all-MiniLM-L6-v2:384:*")) == 1
+
+    def test_namespace_follows_loaded_model(self):
+        """Test a local model path or a cased model gets its own namespace."""
+        default = embedding.shared_cache_namespace()
+        with patch.object(embedding.settings, "embedding_model_path", "/models/other-minilm"):
+            other = embedding.shared_cache_namespace()
+        with patch.object(embedding.settings, "embedding_model_uncased", False):
+            cased = embedding.shared_cache_namespace()
+
+        assert other.startswith("flickfindr:emb:other-minilm:384:torch:")
+        assert len({default, other, cased}) == 3
+
+
+class TestEmbedQuery:
+    """Tests for the async embed_query path."""
+
+    @patch("src.search.embedding.get_model")
+    async def test_concurrent_queries_are_batched(self, mock_get_model):
+        """Test concurrent distinct queries run through one encode call."""
+        mock_model = MagicMock()
+        mock_model.encode.side_effect = lambda texts, **kw: np.array([[0.1] * 384] * len(texts))
+        mock_get_model.return_value = mock_model
+
+        results = await asyncio.gather(*(embed_query(f"query {n}") for n in range(4)))
+
+        mock_model.encode.assert_called_once()
+        assert len(results) == 4
+        assert all(len(r) == 384 for r in results)
+
+    @patch("src.search.embedding.get_model")
+    async def test_cache_hit_skips_model(self, mock_get_model):
+        """Test a cached query never reaches the scheduler."""
+        mock_model = MagicMock()
+        mock_model.encode.side_effect = lambda texts, **kw: np.array([[0.1] * 384] * len(texts))
+        mock_get_model.return_value = mock_model
+
+        await embed_query("heist movie")
+        await embed_query("Heist Movie")
+
+        mock_model.encode.assert_called_once()
+
+    async def test_empty_query_returns_zero_vector(self):
+        """Test empty queries skip the model."""
+        assert (await embed_query("  ")).tolist() == [0.0] * 384
+
+
+class TestEmbedQueries:
+    """Tests for embed_queries (batch endpoints)."""
+
+    @patch("src.search.embedding.get_model")
+    async def test_distinct_misses_share_one_encode_call(self, mock_get_model):
+        """Test duplicates are embedded once and cached queries skip the model."""
+        mock_model = MagicMock()
+        mock_model.encode.side_effect = lambda texts, **kw: np.array([[float(len(t))] * 384 for t in texts])
+        mock_get_model.return_value = mock_model
+        await embed_query("cached query")
+        mock_model.encode.reset_mock()
+
+        result = await embed_queries(["space opera", "Cached Query", "Space  Opera", "noir"])
+
+        mock_model.encode.assert_called_once()
+        assert mock_model.encode.call_args.args[0] == ["space opera", "noir"]
+        assert result.shape == (4, EMBEDDING_DIM)
+        assert result[0].tolist() == result[2].tolist()
+        assert result[1][0] == len("cached query")
+
+    @patch("src.search.embedding.get_model")
+    async def test_all_cached_skips_model(self, mock_get_model):
+        """Test a fully cached batch never reaches the model."""
+        mock_model = MagicMock()
+        mock_model.encode.side_effect = lambda texts, **kw: np.array([[0.1] * 384] * len(texts))
+        mock_get_model.return_value = mock_model
+        await embed_queries(["heist movie"])
+        mock_model.encode.reset_mock()
+
+        await embed_queries(["heist movie", "HEIST movie"])
+
+        mock_model.encode.assert_not_called()
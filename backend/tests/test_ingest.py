@@ -0,0 +1,57 @@
+"""
+Unit tests for the streaming CSV loader's COPY encoding.
+"""
+
+import io
+
+import pandas as pd
+
+from ingestion.ingest import EXPECTED_COLUMNS, prepare_copy_chunk, rows_to_csv
+
+CSV = (
+    "Movie Name,Rating,Runtime,Genre,Metascore,Plot,Directors,Stars,Votes,Gross,Poster URL\n"
+    '"The ""Godfather""",9.2,175,"Crime, Drama",100,"Line one\nline two",Francis Ford Coppola,"Marlon Brando, Al Pacino",2M,$134.97M,http://p/1.jpg\n'
+    "Blank,,,,,,,,,,\n"
+    "Odd,8,97.6,Drama,n/a,Plot,,,,,\n"
+    "Junk,7.5,two hours,Drama,,Plot,,,,,\n"
+)
+
+
+def read_chunk(text=CSV):
+    return pd.read_csv(io.StringIO(text), dtype=str)
+
+
+class TestPrepareCopyChunk:
+    """Tests for prepare_copy_chunk."""
+
+    def test_copy_text(self):
+        """Test quotes and newlines are quoted, numbers parsed and ids assigned from first_id."""
+        _, text = prepare_copy_chunk(read_chunk(), first_id=11)
+        assert text.splitlines(keepends=True) == [
+            '11,"The ""Godfather""",9.2,175,"Crime, Drama",100.0,"Line one\n',
+            'line two",Francis Ford Coppola,"Marlon Brando, Al Pacino",2M,$134.97M,http://p/1.jpg\n',
+            "12,Blank,,,,,,,,,,\n",
+            "13,Odd,8.0,98,Drama,,Plot,,,,,\n",
+            "14,Junk,7.5,,Drama,,Plot,,,,,\n",
+        ]
+
+    def test_null_handling(self):
+        """Test blank and unparseable numbers become NULL (an unquoted empty field)."""
+        df, _ = prepare_copy_chunk(read_chunk(), first_id=1)
+        assert list(df.columns) == ["id", *EXPECTED_COLUMNS]
+        assert str(df["runtime"].dtype) == "Int64"
+        assert df["runtime"].isna().tolist() == [False, True, False, True]
+        assert df["metascore"].isna().tolist() == [False, True, True, True]
+
+    def test_missing_columns_are_null(self):
+        """Test columns absent from the CSV are emitted as NULL fields."""
+        _, text = prepare_copy_chunk(read_chunk("Movie Name,Runtime\nHeat,170\n"), first_id=1, warn=False)
+        assert text == "1,Heat,,170,,,,,,,,\n"
+
+
+class TestRowsToCsv:
+    """Tests for rows_to_csv."""
+
+    def test_none_and_quoting(self):
+        """Test None becomes an empty field and commas are quoted."""
+        assert rows_to_csv([(1, "Drama, Crime", None)]).read() == '1,"Drama, Crime",\r\n'
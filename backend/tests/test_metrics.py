@@ -0,0 +1,43 @@
+"""
+Unit tests for in-process metrics.
+"""
+
+from src import metrics
+from src.metrics import Counter, Histogram
+
+
+class TestHistogram:
+    """Tests for Histogram."""
+
+    def test_cumulative_buckets(self):
+        """Test bucket counts are cumulative."""
+        hist = Histogram("test", buckets=(1, 5, 10))
+        for value in (0.5, 3, 7, 50):
+            hist.observe(value)
+
+        snap = hist.snapshot()
+        assert snap["count"] == 4
+        assert snap["buckets"] == {"1": 1, "5": 2, "10": 3, "+Inf": 4}
+        assert snap["sum"] == 60.5
+
+
+class TestRegistry:
+    """Tests for the metrics registry."""
+
+    def test_get_or_create(self):
+        """Test the same name returns the same metric."""
+        assert metrics.counter("test_counter") is metrics.counter("test_counter")
+        assert isinstance(metrics.counter("test_counter"), Counter)
+
+    def test_snapshot_includes_collectors(self):
+        """Test registered collectors appear in the snapshot."""
+        metrics.register_collector("test_collector", lambda: {"value": 1})
+        assert metrics.snapshot()["test_collector"] == {"value": 1}
+
+    def test_metrics_endpoint(self, test_client):
+        """Test GET /metrics returns the snapshot."""
+        response = test_client.get("/metrics")
+        assert response.status_code == 200
+        data = response.json()
+        assert "embedding_batch_size" in data
+        assert "embedding_cache" in data
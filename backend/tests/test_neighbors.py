@@ -0,0 +1,94 @@
+"""
+Tests for precomputed neighbor lists and GET /flicks/movie/{id}/similar.
+"""
+
+import numpy as np
+import pytest
+
+from src.db.entity import MovieNeighbor
+from src.search.neighbors import top_k_neighbors
+
+
+class TestTopKNeighbors:
+    """Tests for top_k_neighbors."""
+
+    def test_matches_brute_force(self):
+        """Test blocked top-k equals a full sort of cosine similarities, self excluded."""
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((300, 384)).astype(np.float32)
+        ids = np.arange(1, 301)
+
+        rows = top_k_neighbors(ids, vectors, k=5, batch_size=64)
+
+        normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        sims = normed @ normed.T
+        np.fill_diagonal(sims, -np.inf)
+        expected = ids[np.argsort(-sims, axis=1)[:, :5]]
+        assert rows.neighbor_ids.reshape(300, 5).tolist() == expected.tolist()
+        assert rows.scores[:5] == pytest.approx(np.sort(sims[0])[::-1][:5], abs=1e-5)
+
+    def test_row_layout(self):
+        """Test rows are grouped per movie with ranks 1..k."""
+        vectors = np.array([[1, 0], [0.9, 0.1], [0, 1]], dtype=np.float32)
+        rows = top_k_neighbors(np.array([10, 20, 30]), vectors, k=2)
+
+        assert rows.movie_ids.tolist() == [10, 10, 20, 20, 30, 30]
+        assert rows.ranks.tolist() == [1, 2, 1, 2, 1, 2]
+        assert rows.neighbor_ids.tolist() == [20, 30, 10, 30, 20, 10]
+        assert rows.movie_ids.dtype == np.int32 and rows.ranks.dtype == np.int16
+
+    def test_k_capped_by_catalog_size(self):
+        """Test a small catalog yields every other movie, and one movie yields nothing."""
+        vectors = np.eye(3, dtype=np.float32)
+        assert len(top_k_neighbors(np.arange(3), vectors, k=20).movie_ids) == 3 * 2
+        assert len(top_k_neighbors(np.arange(1), vectors[:1], k=20).movie_ids) == 0
+
+    def test_zero_vectors_are_skipped(self):
+        """Test movies without a plot get no neighbors and are nobody's neighbor."""
+        vectors = np.array([[1, 0], [0, 0], [0.9, 0.1], [0, 1]], dtype=np.float32)
+        rows = top_k_neighbors(np.array([10, 20, 30, 40]), vectors, k=3)
+
+        assert rows.movie_ids.tolist() == [10, 10, 30, 30, 40, 40]
+        assert 20 not in rows.neighbor_ids.tolist()
+        assert len(top_k_neighbors(np.arange(2), np.zeros((2, 4)), k=5).movie_ids) == 0
+
+
+@pytest.fixture
+async def movie_neighbors(test_db, sample_movies):
+    """Neighbor lists for movie 2 (The Dark Knight) only."""
+    test_db.add_all([
+        MovieNeighbor(movie_id=2, rank=1, neighbor_id=3, score=0.91),
+        MovieNeighbor(movie_id=2, rank=2, neighbor_id=5, score=0.62),
+        MovieNeighbor(movie_id=2, rank=3, neighbor_id=4, score=0.55),
+    ])
+    await test_db.commit()
+
+
+class TestSimilarMoviesEndpoint:
+    """Tests for GET /flicks/movie/{id}/similar."""
+
+    def test_returns_neighbors_in_rank_order(self, test_client, movie_neighbors):
+        """Test neighbors come back best first with their scores."""
+        response = test_client.get("/flicks/movie/2/similar")
+        assert response.status_code == 200
+        data = response.json()
+        assert [m["id"] for m in data] == [3, 5, 4]
+        assert data[0]["movie_name"] == "Inception"
+        assert data[0]["similarity_score"] == pytest.approx(0.91)
+        assert "plot" not in data[0]
+
+    def test_limit(self, test_client, movie_neighbors):
+        """Test limit truncates the list."""
+        response = test_client.get("/flicks/movie/2/similar?limit=2")
+        assert [m["id"] for m in response.json()] == [3, 5]
+
+    def test_movie_without_neighbors(self, test_client, movie_neighbors):
+        """Test an existing movie with no precomputed list gives an empty list."""
+        response = test_client.get("/flicks/movie/1/similar")
+        assert response.status_code == 200
+        assert response.json() == []
+
+    def test_unknown_movie(self, test_client, movie_neighbors):
+        """Test an unknown movie id gives 404."""
+        response = test_client.get("/flicks/movie/999/similar")
+        assert response.status_code == 404
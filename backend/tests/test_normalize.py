@@ -0,0 +1,79 @@
+"""
+Unit tests for genre / people normalization.
+"""
+
+from src.db.entity import MoviePerson
+from src.db.normalize import LinkBuilder, build_links, name_key, split_names
+
+
+class TestSplitNames:
+    """Tests for split_names."""
+
+    def test_splits_and_strips(self):
+        """Test comma-separated values are split and trimmed."""
+        assert split_names("Crime,  Drama ,Thriller") == ["Crime", "Drama", "Thriller"]
+
+    def test_drops_blanks_and_duplicates(self):
+        """Test empty parts and repeats are removed."""
+        assert split_names("Drama, , Drama,") == ["Drama"]
+
+    def test_none_and_empty(self):
+        """Test missing values give no names."""
+        assert split_names(None) == []
+        assert split_names("") == []
+
+    def test_name_key(self):
+        """Test keys ignore case and extra whitespace."""
+        assert name_key("  Sci-Fi ") == name_key("sci-fi")
+        assert name_key("Francis  Ford Coppola") == "francis ford coppola"
+
+
+class TestBuildLinks:
+    """Tests for build_links."""
+
+    def test_shared_names_get_one_id(self):
+        """Test a genre or person appearing in several movies is stored once."""
+        links = build_links([
+            (1, "Action, Crime", "Christopher Nolan", "Christian Bale"),
+            (2, "action", "Christopher Nolan", "Leonardo DiCaprio"),
+        ])
+        assert links.genres == [(1, "Action", "action"), (2, "Crime", "crime")]
+        assert links.movie_genres == [(1, 1), (1, 2), (2, 1)]
+        assert [p[1] for p in links.people] == ["Christopher Nolan", "Christian Bale", "Leonardo DiCaprio"]
+
+    def test_roles_are_kept_apart(self):
+        """Test the same person can be linked as director and star of one movie."""
+        links = build_links([(7, None, "Clint Eastwood", "Clint Eastwood, Gene Hackman")])
+        assert links.movie_people == [
+            (7, 1, MoviePerson.DIRECTOR),
+            (7, 1, MoviePerson.STAR),
+            (7, 2, MoviePerson.STAR),
+        ]
+        assert links.movie_genres == []
+
+
+class TestLinkBuilder:
+    """Tests for LinkBuilder (chunked build_links)."""
+
+    MOVIES = [
+        (1, "Action, Crime", "Christopher Nolan", "Christian Bale"),
+        (2, "Drama", "Francis Ford Coppola", "Al Pacino"),
+        (3, "crime, Drama", "Christopher Nolan", "Al Pacino, Robert De Niro"),
+    ]
+
+    def test_chunks_match_whole_catalog(self):
+        """Test concatenated chunk output equals build_links over all movies."""
+        builder = LinkBuilder()
+        chunks = [builder.add(self.MOVIES[:2]), builder.add(self.MOVIES[2:])]
+        whole = build_links(self.MOVIES)
+        for field in whole._fields:
+            assert [row for chunk in chunks for row in getattr(chunk, field)] == getattr(whole, field)
+
+    def test_names_are_returned_once(self):
+        """Test a chunk only returns genres and people not seen in earlier chunks."""
+        builder = LinkBuilder()
+        builder.add(self.MOVIES[:2])
+        links = builder.add(self.MOVIES[2:])
+        assert links.genres == []
+        assert [p[1] for p in links.people] == ["Robert De Niro"]
+        assert links.movie_genres == [(3, 2), (3, 3)]
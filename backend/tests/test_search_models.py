@@ -6,6 +6,7 @@ import pytest
 from pydantic import ValidationError
 
 from src.search.models import (
+    NameMatch,
     SortOrder,
     SortBy,
     StructuralSearchRequest,
@@ -115,6 +116,13 @@ class TestStructuralSearchRequest:
         request = StructuralSearchRequest(limit=100)
         assert request.limit == 100
 
+    def test_fuzzy_query_defaults_to_relevance(self):
+        """Test fuzzy name matches are ordered by similarity unless a sort is chosen."""
+        assert StructuralSearchRequest(query="godfathr", name_match=NameMatch.FUZZY).sort_by == SortBy.SIMILARITY
+        explicit = StructuralSearchRequest(query="godfathr", name_match=NameMatch.FUZZY, sort_by=SortBy.RATING)
+        assert explicit.sort_by == SortBy.RATING
+        assert StructuralSearchRequest(name_match=NameMatch.FUZZY).sort_by == SortBy.RATING
+
 
 class TestMovieResult:
     """Tests for MovieResult model."""
@@ -4,114 +4,144 @@ Unit tests for StructuralSearchService.
 
 import pytest
 from unittest.mock import MagicMock, patch
+from sqlalchemy.dialects import postgresql
 
-from src.search.service import StructuralSearchService
+from sqlalchemy import select
+
+from src.config import settings
+from src.db.catalog import bump_catalog_version
+from src.search.pagination import InvalidCursor
+from src.search.service import StructuralSearchService, genre_snapshot, stats_snapshot
 from src.search.models import (
     StructuralSearchRequest,
+    NameMatch,
     SortBy,
     SortOrder,
+    TotalMode,
     GenreItem,
     MovieStats,
 )
-from src.db.entity import Movie
+from src.db.entity import Genre, Movie, MovieGenre
 
 
 class TestStructuralSearchServiceBuildQuery:
     """Tests for StructuralSearchService.build_query method."""
 
-    def test_build_query_no_filters(self, test_db, sample_movies):
+    async def test_build_query_no_filters(self, test_db, sample_movies):
         """Test building query with no filters returns all movies."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest()
         query = service.build_query(request)
-        results = query.all()
+        results = (await test_db.scalars(query)).all()
         assert len(results) == 5
 
-    def test_build_query_with_text_search(self, test_db, sample_movies):
+    async def test_build_query_with_text_search(self, test_db, sample_movies):
         """Test query filter on movie name."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(query="Godfather")
         query = service.build_query(request)
-        results = query.all()
+        results = (await test_db.scalars(query)).all()
         assert len(results) == 1
         assert results[0].movie_name == "The Godfather"
 
-    def test_build_query_with_genre_filter(self, test_db, sample_movies):
+    def test_build_query_skips_embedding(self, test_db):
+        """Test the deferred plot_embedding is never selected for list queries."""
+        service = StructuralSearchService(test_db)
+        sql = str(service.build_query(StructuralSearchRequest()).compile(dialect=postgresql.dialect()))
+        assert "plot_embedding" not in sql
+        assert "movies.plot" in sql
+
+    async def test_build_query_with_genre_filter(self, test_db, sample_movies):
         """Test query filter on genre."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(genre="Action")
         query = service.build_query(request)
-        results = query.all()
+        results = (await test_db.scalars(query)).all()
         assert len(results) == 2  # Dark Knight and Inception
         for movie in results:
             assert "Action" in movie.genre
 
-    def test_build_query_with_directors_filter(self, test_db, sample_movies):
+    async def test_genre_filter_is_exact_and_case_insensitive(self, test_db, sample_movies):
+        """Test genres match whole names only, ignoring case."""
+        service = StructuralSearchService(test_db)
+        drama = (await test_db.scalars(service.build_query(StructuralSearchRequest(genre="drama")))).all()
+        partial = (await test_db.scalars(service.build_query(StructuralSearchRequest(genre="Dram")))).all()
+        assert len(drama) == 4
+        assert partial == []
+
+    async def test_directors_filter_does_not_match_stars(self, test_db, sample_movies):
+        """Test people filters are scoped to their role."""
+        service = StructuralSearchService(test_db)
+        request = StructuralSearchRequest(directors="Morgan Freeman")
+        results = (await test_db.scalars(service.build_query(request))).all()
+        assert results == []
+
+    async def test_build_query_with_directors_filter(self, test_db, sample_movies):
         """Test query filter on directors."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(directors="Nolan")
         query = service.build_query(request)
-        results = query.all()
+        results = (await test_db.scalars(query)).all()
         assert len(results) == 2  # Dark Knight and Inception
 
-    def test_build_query_with_stars_filter(self, test_db, sample_movies):
+    async def test_build_query_with_stars_filter(self, test_db, sample_movies):
         """Test query filter on stars."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(stars="Morgan Freeman")
         query = service.build_query(request)
-        results = query.all()
+        results = (await test_db.scalars(query)).all()
         assert len(results) == 1
         assert results[0].movie_name == "The Shawshank Redemption"
 
-    def test_build_query_with_min_rating(self, test_db, sample_movies):
+    async def test_build_query_with_min_rating(self, test_db, sample_movies):
         """Test query filter with minimum rating."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(min_rating=9.0)
         query = service.build_query(request)
-        results = query.all()
+        results = (await test_db.scalars(query)).all()
         assert len(results) == 3  # Shawshank 9.3, Godfather 9.2, Dark Knight 9.0
         for movie in results:
             assert movie.rating >= 9.0
 
-    def test_build_query_with_max_rating(self, test_db, sample_movies):
+    async def test_build_query_with_max_rating(self, test_db, sample_movies):
         """Test query filter with maximum rating."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(max_rating=8.9)
         query = service.build_query(request)
-        results = query.all()
+        results = (await test_db.scalars(query)).all()
         assert len(results) == 2  # Inception 8.8, Pulp Fiction 8.9
         for movie in results:
             assert movie.rating <= 8.9
 
-    def test_build_query_with_rating_range(self, test_db, sample_movies):
+    async def test_build_query_with_rating_range(self, test_db, sample_movies):
         """Test query filter with rating range."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(min_rating=8.8, max_rating=9.0)
         query = service.build_query(request)
-        results = query.all()
+        results = (await test_db.scalars(query)).all()
         assert len(results) == 3  # Inception 8.8, Pulp Fiction 8.9, Dark Knight 9.0
 
-    def test_build_query_with_min_runtime(self, test_db, sample_movies):
+    async def test_build_query_with_min_runtime(self, test_db, sample_movies):
         """Test query filter with minimum runtime."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(min_runtime=150)
         query = service.build_query(request)
-        results = query.all()
+        results = (await test_db.scalars(query)).all()
         assert len(results) == 3  # Dark Knight 152, Pulp Fiction 154, Godfather 175
         for movie in results:
             assert movie.runtime >= 150
 
-    def test_build_query_with_max_runtime(self, test_db, sample_movies):
+    async def test_build_query_with_max_runtime(self, test_db, sample_movies):
         """Test query filter with maximum runtime."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(max_runtime=145)
         query = service.build_query(request)
-        results = query.all()
+        results = (await test_db.scalars(query)).all()
         assert len(results) == 1  # Shawshank 142
         for movie in results:
             assert movie.runtime <= 145
 
-    def test_build_query_combined_filters(self, test_db, sample_movies):
+    async def test_build_query_combined_filters(self, test_db, sample_movies):
         """Test query with multiple filters combined."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(
@@ -119,92 +149,233 @@ class TestStructuralSearchServiceBuildQuery:
             min_rating=9.0,
         )
         query = service.build_query(request)
-        results = query.all()
+        results = (await test_db.scalars(query)).all()
         assert len(results) == 2  # Dark Knight 9.0, Godfather 9.2
 
 
 class TestStructuralSearchServiceSorting:
     """Tests for StructuralSearchService.apply_sorting method."""
 
-    def test_sort_by_rating_desc(self, test_db, sample_movies):
+    async def test_sort_by_rating_desc(self, test_db, sample_movies):
         """Test sorting by rating descending."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(sort_by=SortBy.RATING, sort_order=SortOrder.DESC)
         query = service.build_query(request)
         query = service.apply_sorting(query, request)
-        results = query.all()
+        results = (await test_db.scalars(query)).all()
         assert results[0].rating == 9.3  # Shawshank
         assert results[1].rating == 9.2  # Godfather
 
-    def test_sort_by_rating_asc(self, test_db, sample_movies):
+    async def test_sort_by_rating_asc(self, test_db, sample_movies):
         """Test sorting by rating ascending."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(sort_by=SortBy.RATING, sort_order=SortOrder.ASC)
         query = service.build_query(request)
         query = service.apply_sorting(query, request)
-        results = query.all()
+        results = (await test_db.scalars(query)).all()
         assert results[0].rating == 8.8  # Inception
 
-    def test_sort_by_runtime_desc(self, test_db, sample_movies):
+    async def test_sort_by_runtime_desc(self, test_db, sample_movies):
         """Test sorting by runtime descending."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(sort_by=SortBy.RUNTIME, sort_order=SortOrder.DESC)
         query = service.build_query(request)
         query = service.apply_sorting(query, request)
-        results = query.all()
+        results = (await test_db.scalars(query)).all()
         assert results[0].runtime == 175  # Godfather
 
-    def test_sort_by_name_asc(self, test_db, sample_movies):
+    async def test_sort_by_name_asc(self, test_db, sample_movies):
         """Test sorting by name ascending."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(sort_by=SortBy.NAME, sort_order=SortOrder.ASC)
         query = service.build_query(request)
         query = service.apply_sorting(query, request)
-        results = query.all()
+        results = (await test_db.scalars(query)).all()
         assert results[0].movie_name == "Inception"
 
-    def test_sort_by_metascore_desc(self, test_db, sample_movies):
+    async def test_sort_by_metascore_desc(self, test_db, sample_movies):
         """Test sorting by metascore descending."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(sort_by=SortBy.METASCORE, sort_order=SortOrder.DESC)
         query = service.build_query(request)
         query = service.apply_sorting(query, request)
-        results = query.all()
+        results = (await test_db.scalars(query)).all()
         assert results[0].metascore == 100.0  # Godfather
 
+    async def test_sort_by_similarity_without_query_falls_back_to_rating(self, test_db, sample_movies):
+        """Test similarity sorting without a query orders by rating."""
+        service = StructuralSearchService(test_db)
+        request = StructuralSearchRequest(sort_by=SortBy.SIMILARITY)
+        query = service.apply_sorting(service.build_query(request), request)
+        results = (await test_db.scalars(query)).all()
+        assert results[0].rating == 9.3  # Shawshank
+
+
+class TestStructuralSearchServiceFuzzyName:
+    """Tests for the typo-tolerant trigram name matching mode."""
+
+    @staticmethod
+    def compile_pg(query) -> str:
+        return str(query.compile(dialect=postgresql.dialect()))
+
+    def test_substring_mode_uses_ilike(self, test_db):
+        """Test the default mode keeps the ILIKE contains match."""
+        service = StructuralSearchService(test_db)
+        sql = self.compile_pg(service.build_query(StructuralSearchRequest(query="godfather")))
+        assert "ILIKE" in sql
+        assert "<%" not in sql
+
+    def test_fuzzy_mode_uses_word_similarity_operator(self, test_db):
+        """Test fuzzy mode filters with the indexable pg_trgm operator."""
+        service = StructuralSearchService(test_db)
+        request = StructuralSearchRequest(query="godfater", name_match=NameMatch.FUZZY)
+        sql = self.compile_pg(service.build_query(request))
+        where = sql.split("WHERE")[1]
+        assert "<%" in where and "movies.movie_name" in where
+        assert "ILIKE" not in sql
+
+    def test_fuzzy_mode_sorts_by_similarity(self, test_db):
+        """Test similarity sorting ranks by word_similarity to the query."""
+        service = StructuralSearchService(test_db)
+        request = StructuralSearchRequest(
+            query="godfater", name_match=NameMatch.FUZZY, sort_by=SortBy.SIMILARITY
+        )
+        sql = self.compile_pg(service.apply_sorting(service.build_query(request), request))
+        assert "ORDER BY word_similarity(" in sql
+        assert "DESC NULLS LAST" in sql
+
+
+class TestStructuralSearchServiceKeyword:
+    """Tests for the full-text keyword mode."""
+
+    @staticmethod
+    def compile_pg(query) -> str:
+        return str(query.compile(dialect=postgresql.dialect()))
+
+    def test_keyword_mode_matches_search_document(self, test_db):
+        """Test keyword mode filters the tsvector with a websearch query."""
+        service = StructuralSearchService(test_db)
+        request = StructuralSearchRequest(query="nolan dream heist", name_match=NameMatch.KEYWORD)
+        sql = self.compile_pg(service.build_query(request))
+        assert "movies.search_document @@ websearch_to_tsquery(" in sql
+        assert "ILIKE" not in sql
+
+    def test_keyword_mode_ranks_by_ts_rank_cd(self, test_db):
+        """Test relevance sorting uses cover density ranking in keyword mode."""
+        service = StructuralSearchService(test_db)
+        request = StructuralSearchRequest(
+            query="nolan dream heist", name_match=NameMatch.KEYWORD, sort_by=SortBy.SIMILARITY
+        )
+        sql = self.compile_pg(service.apply_sorting(service.build_query(request), request))
+        assert "ORDER BY ts_rank_cd(movies.search_document, websearch_to_tsquery(" in sql
+
+    def test_keyword_pages_use_offset(self, test_db):
+        """Test relevance-ranked keyword results are not cursor-paged."""
+        request = StructuralSearchRequest(query="heist", name_match=NameMatch.KEYWORD, sort_by=SortBy.SIMILARITY)
+        assert not StructuralSearchService.supports_cursor(request)
+
+    def test_keyword_query_defaults_to_relevance(self, test_db):
+        """Test a keyword query without sort_by is ordered by ts_rank_cd."""
+        service = StructuralSearchService(test_db)
+        request = StructuralSearchRequest(query="nolan dream heist", name_match=NameMatch.KEYWORD)
+        assert request.sort_by == SortBy.SIMILARITY
+        sql = self.compile_pg(service.apply_sorting(service.build_query(request), request))
+        assert "ORDER BY ts_rank_cd(movies.search_document, websearch_to_tsquery(" in sql
+
+    def test_explicit_sort_is_kept(self):
+        """Test an explicitly chosen sort, or a keyword search without a query, keeps its order."""
+        explicit = StructuralSearchRequest(query="heist", name_match=NameMatch.KEYWORD, sort_by=SortBy.RATING)
+        assert explicit.sort_by == SortBy.RATING
+        assert StructuralSearchRequest(name_match=NameMatch.KEYWORD).sort_by == SortBy.RATING
+        assert StructuralSearchRequest(query="heist").sort_by == SortBy.RATING
+
 
 class TestStructuralSearchServiceExecuteSearch:
     """Tests for StructuralSearchService.execute_search method."""
 
-    def test_execute_search_returns_results_and_total(self, test_db, sample_movies):
+    async def test_execute_search_returns_results_and_total(self, test_db, sample_movies):
         """Test execute_search returns results and total count."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(limit=10)
-        results, total = service.execute_search(request)
+        results, total = await service.execute_search(request)
         assert len(results) == 5
         assert total == 5
 
-    def test_execute_search_with_pagination(self, test_db, sample_movies):
+    async def test_execute_search_with_pagination(self, test_db, sample_movies):
         """Test execute_search with pagination."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(skip=2, limit=2)
-        results, total = service.execute_search(request)
+        results, total = await service.execute_search(request)
         assert len(results) == 2
         assert total == 5  # Total count should still be 5
 
-    def test_execute_search_with_filter_and_pagination(self, test_db, sample_movies):
+    async def test_execute_search_with_filter_and_pagination(self, test_db, sample_movies):
         """Test execute_search with filter and pagination."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(genre="Drama", skip=1, limit=2)
-        results, total = service.execute_search(request)
+        results, total = await service.execute_search(request)
         assert len(results) == 2
         assert total == 4  # 4 movies have Drama in genre
 
-    def test_execute_search_empty_results(self, test_db, sample_movies):
+    async def test_cursor_pages_continue_into_nulls(self, test_db, sample_movies):
+        """Test keyset pages keep nulls-last order and reach movies without a sort key."""
+        test_db.add_all([Movie(id=6, movie_name="No Score A"), Movie(id=7, movie_name="No Score B")])
+        await test_db.commit()
+        service = StructuralSearchService(test_db)
+
+        seen, cursor = [], None
+        while True:
+            request = StructuralSearchRequest(sort_by=SortBy.METASCORE, limit=2, cursor=cursor)
+            page = await service.execute_page(request)
+            seen += [m.id for m in page.results]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert page.total == 7
+        assert seen == [4, 5, 2, 1, 3, 7, 6]  # metascore desc, then NULLs by id desc
+
+    async def test_cursor_rejected_for_other_sort(self, test_db, sample_movies):
+        """Test a cursor can't be replayed against a different sort."""
+        service = StructuralSearchService(test_db)
+        cursor = (await service.execute_page(StructuralSearchRequest(limit=2))).next_cursor
+        with pytest.raises(InvalidCursor):
+            await service.execute_page(StructuralSearchRequest(limit=2, cursor=cursor, sort_by=SortBy.RUNTIME))
+
+    async def test_window_total_matches_exact_count(self, test_db, sample_movies):
+        """Test COUNT(*) OVER () gives the same page and total in one statement."""
+        service = StructuralSearchService(test_db)
+        exact = await service.execute_page(StructuralSearchRequest(genre="Drama", limit=2))
+        window = await service.execute_page(
+            StructuralSearchRequest(genre="Drama", limit=2, total_mode=TotalMode.WINDOW)
+        )
+        assert [m.id for m in window.results] == [m.id for m in exact.results]
+        assert window.total == exact.total == 4
+        assert window.total_is_exact
+
+    async def test_window_total_on_page_past_the_end(self, test_db, sample_movies):
+        """Test an empty windowed page still reports the real total."""
+        service = StructuralSearchService(test_db)
+        page = await service.execute_page(StructuralSearchRequest(skip=10, total_mode=TotalMode.WINDOW))
+        assert page.results == []
+        assert page.total == 5
+
+    async def test_estimated_total_is_capped(self, test_db, sample_movies):
+        """Test estimate mode stops counting at the cap and flags the total as inexact."""
+        service = StructuralSearchService(test_db)
+        with patch.object(settings, "search_count_cap", 3):
+            broad = await service.execute_page(StructuralSearchRequest(total_mode=TotalMode.ESTIMATE))
+            narrow = await service.execute_page(
+                StructuralSearchRequest(directors="Nolan", total_mode=TotalMode.ESTIMATE)
+            )
+        assert (broad.total, broad.total_is_exact) == (3, False)
+        assert (narrow.total, narrow.total_is_exact) == (2, True)
+
+    async def test_execute_search_empty_results(self, test_db, sample_movies):
         """Test execute_search with no matches."""
         service = StructuralSearchService(test_db)
         request = StructuralSearchRequest(query="NonExistentMovie")
-        results, total = service.execute_search(request)
+        results, total = await service.execute_search(request)
         assert len(results) == 0
         assert total == 0
 
@@ -212,10 +383,10 @@ class TestStructuralSearchServiceExecuteSearch:
 class TestStructuralSearchServiceGenres:
     """Tests for StructuralSearchService.get_genres method."""
 
-    def test_get_genres(self, test_db, sample_movies):
+    async def test_get_genres(self, test_db, sample_movies):
         """Test getting unique genres with counts."""
         service = StructuralSearchService(test_db)
-        genres = service.get_genres()
+        genres = await service.get_genres()
         
         assert len(genres) > 0
         assert all(isinstance(g, GenreItem) for g in genres)
@@ -225,22 +396,37 @@ class TestStructuralSearchServiceGenres:
         assert "Drama" in genre_dict
         assert genre_dict["Drama"] == 4
 
-    def test_get_genres_sorted_by_count(self, test_db, sample_movies):
+    async def test_get_genres_sorted_by_count(self, test_db, sample_movies):
         """Test genres are sorted by count descending."""
         service = StructuralSearchService(test_db)
-        genres = service.get_genres()
+        genres = await service.get_genres()
         
         counts = [g.count for g in genres]
         assert counts == sorted(counts, reverse=True)
 
+    async def test_get_genres_snapshot_follows_catalog_version(self, test_db, sample_movies):
+        """Test genre counts are served from the snapshot until the catalog version changes."""
+        service = StructuralSearchService(test_db)
+        assert {g.name: g.count for g in await service.get_genres()}["Sci-Fi"] == 1
+
+        sci_fi = await test_db.scalar(select(Genre.id).where(Genre.key == "sci-fi"))
+        test_db.add(Movie(id=6, movie_name="Arrival", genre="Sci-Fi"))
+        test_db.add(MovieGenre(movie_id=6, genre_id=sci_fi))
+        await test_db.commit()
+
+        with patch.object(genre_snapshot, "refresh_interval", 0):
+            assert {g.name: g.count for g in await service.get_genres()}["Sci-Fi"] == 1
+            await bump_catalog_version(test_db)
+            assert {g.name: g.count for g in await service.get_genres()}["Sci-Fi"] == 2
+
 
 class TestStructuralSearchServiceStats:
     """Tests for StructuralSearchService.get_stats method."""
 
-    def test_get_stats(self, test_db, sample_movies):
+    async def test_get_stats(self, test_db, sample_movies):
         """Test getting movie statistics."""
         service = StructuralSearchService(test_db)
-        stats = service.get_stats()
+        stats = await service.get_stats()
         
         assert isinstance(stats, MovieStats)
         assert stats.min_rating == 8.8  # Inception
@@ -249,10 +435,10 @@ class TestStructuralSearchServiceStats:
         assert stats.max_runtime == 175  # Godfather
         assert stats.total_movies == 5
 
-    def test_get_stats_empty_database(self, test_db):
+    async def test_get_stats_empty_database(self, test_db):
         """Test getting stats with empty database."""
         service = StructuralSearchService(test_db)
-        stats = service.get_stats()
+        stats = await service.get_stats()
         
         # Should return default values
         assert stats.min_rating == 0.0
@@ -260,3 +446,46 @@ class TestStructuralSearchServiceStats:
         assert stats.min_runtime == 0
         assert stats.max_runtime == 300
         assert stats.total_movies == 0
+
+    async def test_get_stats_snapshot_follows_catalog_version(self, test_db, sample_movies):
+        """Test stats are aggregated once per catalog version, not per request."""
+        service = StructuralSearchService(test_db)
+        loads = stats_snapshot.loads
+        assert (await service.get_stats()).total_movies == 5
+
+        test_db.add(Movie(id=6, movie_name="Arrival", rating=7.9, runtime=116))
+        await test_db.commit()
+
+        with patch.object(stats_snapshot, "refresh_interval", 0):
+            assert (await service.get_stats()).total_movies == 5
+            await bump_catalog_version(test_db)
+            stats = await service.get_stats()
+        assert stats.total_movies == 6
+        assert stats.min_rating == 7.9
+        assert stats_snapshot.loads == loads + 2
+
+
+class TestStructuralSearchServiceGenreRows:
+    """Tests for StructuralSearchService.genre_rows."""
+
+    async def test_top_rated_per_genre(self, test_db, sample_movies):
+        """Test each genre gets its best-rated movies, case-insensitively, unknown genres empty."""
+        rows = await StructuralSearchService(test_db).genre_rows(["Drama", "sci-fi", "Western"], limit=2)
+
+        assert [r.id for r in rows["drama"]] == [1, 4]  # Shawshank 9.3, Godfather 9.2
+        assert [r.movie_name for r in rows["sci-fi"]] == ["Inception"]
+        assert rows["western"] == []
+
+    async def test_single_window_statement(self, test_db, sample_movies):
+        """Test all rows come from one ROW_NUMBER() query."""
+        execute = MagicMock(wraps=test_db.execute)
+
+        async def counted(*args, **kwargs):
+            return await execute(*args, **kwargs)
+
+        with patch.object(test_db, "execute", counted):
+            await StructuralSearchService(test_db).genre_rows(["Drama", "Crime", "Action"], limit=3)
+
+        assert execute.call_count == 1
+        sql = str(execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "row_number() OVER (PARTITION BY movie_genres.genre_id" in sql
@@ -2,8 +2,16 @@
 Integration tests for search API endpoints.
 """
 
+import asyncio
+from unittest.mock import patch
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.catalog import bump_catalog_version
+from src.search.service import catalog_version_snapshot
 
 
 class TestSearchStatsEndpoint:
@@ -28,6 +36,17 @@ class TestSearchStatsEndpoint:
         data = response.json()
         assert data["total_movies"] == 0
 
+    async def test_database_without_catalog_version_table(self, test_client, test_engine, sample_movies):
+        """Test a catalog ingested before the version marker existed reads as version 0."""
+        async with test_engine.begin() as conn:
+            await conn.execute(text("DROP TABLE catalog_version"))
+
+        assert test_client.get("/search/stats").json()["total_movies"] == 5
+        assert test_client.get("/search/genres").status_code == 200
+        response = test_client.post("/search/structural", json={"genre": "Drama"})
+        assert response.status_code == 200
+        assert catalog_version_snapshot.value == 0
+
 
 class TestSearchGenresEndpoint:
     """Tests for GET /search/genres endpoint."""
@@ -218,6 +237,26 @@ class TestStructuralSearchEndpoint:
         assert len(data["results"]) == 1
         assert data["has_more"] is False
 
+    def test_search_cursor_pages_match_offset_order(self, test_client, test_engine, sample_movies):
+        """Test following next_cursor visits every movie once, in sort order."""
+        expected = [m["id"] for m in test_client.post("/search/structural", json={"limit": 10}).json()["results"]]
+
+        seen, cursor = [], None
+        while True:
+            data = test_client.post("/search/structural", json={"limit": 2, "cursor": cursor}).json()
+            seen += [m["id"] for m in data["results"]]
+            cursor = data["next_cursor"]
+            assert data["has_more"] is (cursor is not None)
+            if cursor is None:
+                break
+
+        assert seen == expected
+
+    def test_search_invalid_cursor(self, test_client, test_engine, sample_movies):
+        """Test a garbage cursor is rejected with 400."""
+        response = test_client.post("/search/structural", json={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
     def test_search_no_results(self, test_client, test_engine, sample_movies):
         """Test search with no matching results."""
         response = test_client.post(
@@ -261,7 +300,9 @@ class TestStructuralSearchEndpoint:
         data = response.json()
         
         # Check top-level structure
-        assert set(data.keys()) == {"results", "total", "skip", "limit", "has_more"}
+        assert set(data.keys()) == {
+            "results", "total", "total_is_exact", "skip", "limit", "has_more", "next_cursor"
+        }
         
         # Check movie result structure
         if data["results"]:
@@ -272,3 +313,89 @@ class TestStructuralSearchEndpoint:
                 "gross", "poster_url", "similarity_score"
             }
             assert set(movie.keys()) == expected_fields
+
+
+class TestStructuralSummaryEndpoint:
+    """Tests for POST /search/structural/summary endpoint."""
+
+    def test_summary_returns_card_fields_only(self, test_client, test_engine, sample_movies):
+        """Test summary results carry only the card columns."""
+        response = test_client.post("/search/structural/summary", json={"genre": "Crime", "limit": 2})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 3
+        assert set(data["results"][0].keys()) == {
+            "id", "movie_name", "rating", "runtime", "genre", "metascore", "poster_url"
+        }
+
+    def test_summary_cursor_pages(self, test_client, test_engine, sample_movies):
+        """Test summary pages follow next_cursor like the full endpoint."""
+        first = test_client.post("/search/structural/summary", json={"limit": 3}).json()
+        second = test_client.post(
+            "/search/structural/summary", json={"limit": 3, "cursor": first["next_cursor"]}
+        ).json()
+        ids = [m["id"] for m in first["results"] + second["results"]]
+        assert ids == [1, 4, 2, 5, 3]  # rating desc
+        assert second["has_more"] is False
+
+
+class TestStructuralSearchResponseCache:
+    """Tests for the response cache on POST /search/structural."""
+
+    def test_repeated_request_is_served_from_cache(self, test_client, test_engine, sample_movies):
+        """Test an identical payload skips the search service and returns the same bytes."""
+        payload = {"genre": "Drama", "sort_by": "rating", "limit": 3}
+        first = test_client.post("/search/structural", json=payload)
+        assert first.headers["X-Cache"] == "miss"
+
+        with patch("src.search.views.StructuralSearchService.execute_page") as execute_page:
+            second = test_client.post("/search/structural", json={"limit": 3, "sort_by": "rating", "genre": "Drama"})
+
+        execute_page.assert_not_called()
+        assert second.headers["X-Cache"] == "hit"
+        assert second.content == first.content
+
+    def test_catalog_version_bump_invalidates(self, test_client, test_engine, sample_movies):
+        """Test responses are recomputed after the catalog version changes."""
+        test_client.post("/search/structural", json={"genre": "Drama"})
+
+        async def bump():
+            async with AsyncSession(test_engine, expire_on_commit=False) as db:
+                await bump_catalog_version(db)
+
+        asyncio.run(bump())
+        with patch.object(catalog_version_snapshot, "refresh_interval", 0):
+            response = test_client.post("/search/structural", json={"genre": "Drama"})
+        assert response.headers["X-Cache"] == "miss"
+
+    def test_errors_are_not_cached(self, test_client, test_engine):
+        """Test a rejected cursor is not stored as a response."""
+        for _ in range(2):
+            response = test_client.post("/search/structural", json={"cursor": "not-a-cursor"})
+            assert response.status_code == 400
+
+
+class TestGenreRowsEndpoint:
+    """Tests for POST /search/rows endpoint."""
+
+    def test_rows_in_request_order(self, test_client, test_engine, sample_movies):
+        """Test one request returns every row as summary cards."""
+        response = test_client.post("/search/rows", json={"genres": ["Crime", "Sci-Fi", "Western"], "limit": 2})
+        assert response.status_code == 200
+        rows = response.json()["rows"]
+
+        assert [row["genre"] for row in rows] == ["Crime", "Sci-Fi", "Western"]
+        assert [m["movie_name"] for m in rows[0]["results"]] == ["The Godfather", "The Dark Knight"]
+        assert rows[2]["results"] == []
+        assert "plot" not in rows[0]["results"][0]
+
+    def test_cached(self, test_client, test_engine, sample_movies):
+        """Test repeated homepage loads are served from the response cache."""
+        payload = {"genres": ["Drama"], "limit": 5}
+        assert test_client.post("/search/rows", json=payload).headers["X-Cache"] == "miss"
+        assert test_client.post("/search/rows", json=payload).headers["X-Cache"] == "hit"
+
+    def test_validation(self, test_client, test_engine):
+        """Test empty genre lists and oversized rows are rejected."""
+        assert test_client.post("/search/rows", json={"genres": []}).status_code == 422
+        assert test_client.post("/search/rows", json={"genres": ["Drama"], "limit": 500}).status_code == 422
@@ -2,11 +2,17 @@
 Unit tests for SemanticSearchService.
 """
 
+import asyncio
+
+import numpy as np
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql
 
-from src.search.service import SemanticSearchService
-from src.search.models import SemanticSearchRequest, HybridSearchRequest
+from src.config import settings
+from src.search.service import SemanticSearchService, quality_search_param, reciprocal_rank_fusion
+from src.search.models import SemanticSearchRequest, SemanticBatchRequest, HybridSearchRequest, SearchQuality
 
 
 class TestSemanticSearchServiceThreshold:
@@ -20,8 +26,8 @@ class TestSemanticSearchServiceThreshold:
 class TestSemanticSearchServiceSemanticSearch:
     """Tests for SemanticSearchService.semantic_search method."""
 
-    @patch("src.search.embedding.generate_embedding")
-    def test_semantic_search_exact_matches_true(self, mock_embed, test_db, test_engine):
+    @patch("src.search.embedding.embed_query")
+    async def test_semantic_search_exact_matches_true(self, mock_embed, test_db, test_engine):
         """Test exact_matches is True when similarity >= threshold."""
         mock_embed.return_value = [0.1] * 384
         
@@ -36,17 +42,17 @@ class TestSemanticSearchServiceSemanticSearch:
             )
         ]
         
-        with patch.object(test_db, 'execute', return_value=mock_result):
+        with patch.object(test_db, 'execute', AsyncMock(return_value=mock_result)):
             service = SemanticSearchService(test_db)
             request = SemanticSearchRequest(query="test query", limit=5)
-            result = service.semantic_search(request)
+            result = await service.semantic_search(request)
         
             assert result["exact_matches"] is True
             assert result["message"] == "Movies found matching your query"
             assert len(result["movies"]) == 1
 
-    @patch("src.search.embedding.generate_embedding")
-    def test_semantic_search_exact_matches_false(self, mock_embed, test_db, test_engine):
+    @patch("src.search.embedding.embed_query")
+    async def test_semantic_search_exact_matches_false(self, mock_embed, test_db, test_engine):
         """Test exact_matches is False when similarity < threshold."""
         mock_embed.return_value = [0.1] * 384
         
@@ -60,30 +66,30 @@ class TestSemanticSearchServiceSemanticSearch:
             )
         ]
         
-        with patch.object(test_db, 'execute', return_value=mock_result):
+        with patch.object(test_db, 'execute', AsyncMock(return_value=mock_result)):
             service = SemanticSearchService(test_db)
             request = SemanticSearchRequest(query="test query", limit=5)
-            result = service.semantic_search(request)
+            result = await service.semantic_search(request)
         
             assert result["exact_matches"] is False
             assert result["message"] == "No exact matches found, but here are some similar movies"
 
-    @patch("src.search.embedding.generate_embedding")
-    def test_semantic_search_no_results(self, mock_embed, test_db, test_engine):
+    @patch("src.search.embedding.embed_query")
+    async def test_semantic_search_no_results(self, mock_embed, test_db, test_engine):
         """Test message when no results found."""
         mock_embed.return_value = [0.1] * 384
         
         with patch.object(test_db, 'execute', return_value=[]):
             service = SemanticSearchService(test_db)
             request = SemanticSearchRequest(query="test query", limit=5)
-            result = service.semantic_search(request)
+            result = await service.semantic_search(request)
         
             assert result["exact_matches"] is False
             assert result["message"] == "No movies found"
             assert len(result["movies"]) == 0
 
-    @patch("src.search.embedding.generate_embedding")
-    def test_semantic_search_threshold_boundary(self, mock_embed, test_db, test_engine):
+    @patch("src.search.embedding.embed_query")
+    async def test_semantic_search_threshold_boundary(self, mock_embed, test_db, test_engine):
         """Test exact_matches at threshold boundary (0.6 exactly)."""
         mock_embed.return_value = [0.1] * 384
         
@@ -97,19 +103,79 @@ class TestSemanticSearchServiceSemanticSearch:
             )
         ]
         
-        with patch.object(test_db, 'execute', return_value=mock_result):
+        with patch.object(test_db, 'execute', AsyncMock(return_value=mock_result)):
             service = SemanticSearchService(test_db)
             request = SemanticSearchRequest(query="test query", limit=5)
-            result = service.semantic_search(request)
+            result = await service.semantic_search(request)
         
             assert result["exact_matches"] is True  # >= threshold
 
 
+class TestSemanticSearchServiceBinding:
+    """Tests for how the query vector is bound to SQL."""
+
+    @patch("src.search.embedding.embed_query")
+    async def test_embedding_bound_as_float32_array(self, mock_embed, test_db, test_engine):
+        """Test the query vector is passed as an array, not a "[x,y,...]" string."""
+        mock_embed.return_value = np.full(384, 0.1, dtype=np.float32)
+        execute = AsyncMock(return_value=[])
+
+        with patch.object(test_db, 'execute', execute):
+            service = SemanticSearchService(test_db)
+            await service.semantic_search(SemanticSearchRequest(query="test query", limit=5))
+
+        sql, params = execute.call_args.args
+        assert isinstance(params["embedding"], np.ndarray)
+        assert "CAST" not in str(sql)
+
+
+class TestSemanticSearchServiceQuality:
+    """Tests for the per-request vector index quality tier."""
+
+    @patch("src.search.embedding.embed_query")
+    async def test_no_quality_leaves_index_defaults(self, mock_embed, test_db, test_engine):
+        """Test no search parameter is set when quality is omitted."""
+        mock_embed.return_value = np.full(384, 0.1, dtype=np.float32)
+        execute = AsyncMock(return_value=[])
+
+        with patch.object(test_db, 'execute', execute):
+            service = SemanticSearchService(test_db)
+            await service.semantic_search(SemanticSearchRequest(query="test query", limit=5))
+
+        assert execute.call_count == 1
+
+    @patch("src.search.embedding.embed_query")
+    async def test_quality_sets_local_ivfflat_probes(self, mock_embed, test_db, test_engine):
+        """Test the tier is applied with a transaction-local set_config before ranking."""
+        mock_embed.return_value = np.full(384, 0.1, dtype=np.float32)
+        execute = AsyncMock(return_value=[])
+
+        with patch.object(settings, "vector_index_type", "ivfflat"), \
+                patch.object(test_db, 'execute', execute):
+            service = SemanticSearchService(test_db)
+            await service.hybrid_search(HybridSearchRequest(query="test query", quality="accurate"))
+
+        set_stmt = execute.call_args_list[0].args[0].compile()
+        assert "set_config" in str(set_stmt)
+        assert list(set_stmt.params.values()) == ["ivfflat.probes", "40", True]
+
+    def test_hnsw_ef_search_covers_limit(self):
+        """Test ef_search is never below the requested limit."""
+        with patch.object(settings, "vector_index_type", "hnsw"):
+            assert quality_search_param(SearchQuality.FAST, 10) == ("hnsw.ef_search", 20)
+            assert quality_search_param(SearchQuality.FAST, 100) == ("hnsw.ef_search", 100)
+
+    def test_invalid_quality_rejected(self):
+        """Test unknown quality tiers fail validation."""
+        with pytest.raises(ValidationError):
+            SemanticSearchRequest(query="test query", quality="perfect")
+
+
 class TestSemanticSearchServiceHybridSearch:
     """Tests for SemanticSearchService.hybrid_search method."""
 
-    @patch("src.search.embedding.generate_embedding")
-    def test_hybrid_search_with_genre_filter(self, mock_embed, test_db, test_engine):
+    @patch("src.search.embedding.embed_query")
+    async def test_hybrid_search_with_genre_filter(self, mock_embed, test_db, test_engine):
         """Test hybrid search with genre filter."""
         mock_embed.return_value = [0.1] * 384
         
@@ -123,22 +189,22 @@ class TestSemanticSearchServiceHybridSearch:
             )
         ]
         
-        with patch.object(test_db, 'execute', return_value=mock_result):
+        with patch.object(test_db, 'execute', AsyncMock(return_value=mock_result)):
             service = SemanticSearchService(test_db)
             request = HybridSearchRequest(query="action movie", genre="Action", limit=5)
-            result = service.hybrid_search(request)
+            result = await service.hybrid_search(request)
         
             assert result["exact_matches"] is True
             assert len(result["movies"]) == 1
 
-    @patch("src.search.embedding.generate_embedding")
-    def test_hybrid_search_with_rating_filter(self, mock_embed, test_db, test_engine):
+    @patch("src.search.embedding.embed_query")
+    async def test_hybrid_search_with_rating_filter(self, mock_embed, test_db, test_engine):
         """Test hybrid search with rating range filter."""
         mock_embed.return_value = [0.1] * 384
         
         mock_result = []
         
-        with patch.object(test_db, 'execute', return_value=mock_result):
+        with patch.object(test_db, 'execute', AsyncMock(return_value=mock_result)):
             service = SemanticSearchService(test_db)
             request = HybridSearchRequest(
                 query="test movie",
@@ -146,12 +212,12 @@ class TestSemanticSearchServiceHybridSearch:
                 max_rating=9.5,
                 limit=5
             )
-            result = service.hybrid_search(request)
+            result = await service.hybrid_search(request)
         
             assert result["message"] == "No movies found matching your criteria"
 
-    @patch("src.search.embedding.generate_embedding")
-    def test_hybrid_search_with_all_filters(self, mock_embed, test_db, test_engine):
+    @patch("src.search.embedding.embed_query")
+    async def test_hybrid_search_with_all_filters(self, mock_embed, test_db, test_engine):
         """Test hybrid search with all filters applied."""
         mock_embed.return_value = [0.1] * 384
         
@@ -165,7 +231,7 @@ class TestSemanticSearchServiceHybridSearch:
             )
         ]
         
-        with patch.object(test_db, 'execute', return_value=mock_result):
+        with patch.object(test_db, 'execute', AsyncMock(return_value=mock_result)):
             service = SemanticSearchService(test_db)
             request = HybridSearchRequest(
                 query="test",
@@ -178,13 +244,13 @@ class TestSemanticSearchServiceHybridSearch:
                 max_runtime=180,
                 limit=10
             )
-            result = service.hybrid_search(request)
+            result = await service.hybrid_search(request)
         
             assert result["exact_matches"] is False
             assert "similar movies" in result["message"]
 
-    @patch("src.search.embedding.generate_embedding")
-    def test_hybrid_search_error_handling(self, mock_embed, test_db, test_engine):
+    @patch("src.search.embedding.embed_query")
+    async def test_hybrid_search_error_handling(self, mock_embed, test_db, test_engine):
         """Test hybrid search handles exceptions."""
         mock_embed.side_effect = Exception("Embedding error")
         
@@ -192,4 +258,128 @@ class TestSemanticSearchServiceHybridSearch:
         request = HybridSearchRequest(query="test query", limit=5)
         
         with pytest.raises(Exception):
-            service.hybrid_search(request)
+            await service.hybrid_search(request)
+
+
+class TestReciprocalRankFusion:
+    """Tests for reciprocal_rank_fusion."""
+
+    def test_items_in_both_rankings_win(self):
+        """Test an id ranked by both lists beats ids found by only one."""
+        fused = reciprocal_rank_fusion([([1, 2, 3], 1.0), ([3, 4], 1.0)], k=60)
+        ids = [movie_id for movie_id, _ in fused]
+        assert ids[:2] == [3, 1]
+        assert set(ids[2:]) == {2, 4}
+
+    def test_weights_shift_the_balance(self):
+        """Test a heavier ranking decides between single-list hits."""
+        fused = reciprocal_rank_fusion([([1], 1.0), ([2], 2.0)], k=60)
+        assert [movie_id for movie_id, _ in fused] == [2, 1]
+        assert fused[1][1] == pytest.approx(1 / 61)
+
+
+class TestSemanticSearchServiceFusion:
+    """Tests for hybrid search with mode=rrf."""
+
+    @patch("src.search.embedding.embed_query", AsyncMock(return_value=np.zeros(384, dtype=np.float32)))
+    async def test_fused_winners_are_hydrated_in_rrf_order(self, test_db, sample_movies):
+        """Test fusion merges both rankings and hydrates only the winners."""
+        async def vector_top_ids(query_embedding, limit, filters, quality, timings):
+            timings.update(vector_ms=0.2)
+            return {2: 0.8, 3: 0.7}
+
+        service = SemanticSearchService(test_db)
+        with patch.object(service, "_keyword_top_ids", AsyncMock(return_value=[4, 2])), \
+                patch.object(service, "_vector_top_ids", vector_top_ids):
+            result = await service.hybrid_search(HybridSearchRequest(query="the godfather", mode="rrf", limit=3))
+
+        assert [m["id"] for m in result["movies"]] == [2, 4, 3]
+        assert result["movies"][0]["similarity_score"] == 0.8
+        assert result["movies"][1]["similarity_score"] is None  # keyword-only hit
+        assert set(result["timings"]) == {"keyword_ms", "embed_ms", "vector_ms", "hydrate_ms"}
+
+    async def test_keyword_ranking_overlaps_embedding(self, test_db, sample_movies):
+        """Test the keyword query doesn't wait for the query embedding (or vice versa)."""
+        embed_started = asyncio.Event()
+
+        async def keyword_top_ids(text, limit, filters):
+            await asyncio.wait_for(embed_started.wait(), timeout=1)
+            return [1]
+
+        async def embed(text):
+            embed_started.set()
+            return np.zeros(384, dtype=np.float32)
+
+        service = SemanticSearchService(test_db)
+        with patch("src.search.embedding.embed_query", embed), \
+                patch.object(service, "_keyword_top_ids", keyword_top_ids), \
+                patch.object(service, "_vector_top_ids", AsyncMock(return_value={1: 0.9})):
+            result = await service.hybrid_search(HybridSearchRequest(query="shawshank", mode="rrf"))
+
+        assert [m["id"] for m in result["movies"]] == [1]
+
+    async def test_keyword_ranking_uses_request_session(self):
+        """Test the keyword leg doesn't check out a second pooled connection."""
+        db = AsyncMock()
+        db.scalars.return_value = MagicMock(all=MagicMock(return_value=[3, 1]))
+        service = SemanticSearchService(db)
+
+        with patch("src.search.service.AsyncSession") as session_factory:
+            assert await service._keyword_top_ids("heist", 10, []) == [3, 1]
+
+        db.scalars.assert_awaited_once()
+        session_factory.assert_not_called()
+
+    @patch("src.search.embedding.embed_query", AsyncMock(return_value=np.zeros(384, dtype=np.float32)))
+    async def test_depth_and_filters_reach_both_rankings(self, test_db, sample_movies):
+        """Test each ranking gets the configured depth and the structural filters."""
+        keyword = AsyncMock(return_value=[])
+        vector = AsyncMock(return_value={})
+
+        service = SemanticSearchService(test_db)
+        with patch.object(settings, "hybrid_rrf_depth", 25), \
+                patch.object(service, "_keyword_top_ids", keyword), \
+                patch.object(service, "_vector_top_ids", vector):
+            result = await service.hybrid_search(HybridSearchRequest(query="heist", genre="Crime", mode="rrf"))
+
+        assert result["movies"] == []
+        assert keyword.await_args.args[1] == vector.await_args.args[1] == 25
+        assert len(keyword.await_args.args[2]) == 1
+
+
+class TestSemanticSearchServiceBatch:
+    """Tests for semantic_batch on the Postgres engine."""
+
+    async def test_one_lateral_statement_per_chunk(self, test_db):
+        """Test a chunk's queries are ranked by a single LATERAL join over a VALUES list."""
+        rows = [
+            MagicMock(ord=1, id=3, movie_name="B", similarity_score=0.7),
+            MagicMock(ord=0, id=1, movie_name="A", similarity_score=0.9),
+        ]
+        execute = AsyncMock(return_value=rows)
+        request = SemanticBatchRequest(queries=["first query", "second query"], limit=3)
+
+        with patch("src.search.embedding.embed_queries", AsyncMock(return_value=np.ones((2, 384), np.float32))), \
+                patch.object(test_db, "execute", execute):
+            results = [r async for r in SemanticSearchService(test_db).semantic_batch(request)]
+
+        execute.assert_awaited_once()
+        sql = str(execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "JOIN LATERAL" in sql
+        assert "VALUES" in sql and "CAST(" in sql
+        assert [m["id"] for m in results[0]["movies"]] == [1]
+        assert [m["id"] for m in results[1]["movies"]] == [3]
+
+    async def test_failed_chunk_yields_errors_and_continues(self, test_db):
+        """Test a failing chunk reports an error per query without ending the stream."""
+        request = SemanticBatchRequest(queries=["first query", "second query"], limit=3)
+        rankings = AsyncMock(side_effect=[RuntimeError("db down"), [[]]])
+
+        with patch.object(settings, "semantic_batch_chunk_size", 1), \
+                patch("src.search.embedding.embed_queries", AsyncMock(return_value=np.ones((1, 384), np.float32))), \
+                patch.object(SemanticSearchService, "_rank_many_in_postgres", rankings):
+            results = [r async for r in SemanticSearchService(test_db).semantic_batch(request)]
+
+        assert results[0]["error"] == "Search failed"
+        assert "error" not in results[1]
+        assert results[1]["message"] == "No movies found"
@@ -2,9 +2,15 @@
 Integration tests for semantic search API endpoints.
 """
 
+import asyncio
+import json
+
 import pytest
 from unittest.mock import patch, MagicMock
 
+from src.search.models import SemanticSearchRequest
+from src.search.views import semantic_flight, semantic_search
+
 
 class TestSemanticSearchEndpoint:
     """Tests for POST /search/semantic endpoint."""
@@ -240,4 +246,51 @@ class TestHybridSearchEndpoint:
         
         assert response.status_code == 200
         data = response.json()
-        assert set(data.keys()) == {"results", "query", "limit", "exact_matches", "message"}
+        assert set(data.keys()) == {"results", "query", "limit", "exact_matches", "message", "timings"}
+
+
+class TestSemanticBatchEndpoint:
+    """Tests for POST /search/semantic/batch endpoint."""
+
+    @patch("src.search.service.SemanticSearchService.semantic_batch")
+    def test_streams_one_line_per_query(self, mock_batch, test_client, test_engine):
+        """Test results stream back as NDJSON, one line per query."""
+        async def results(request):
+            for index, query in enumerate(request.queries):
+                movies = [{"id": index + 1, "movie_name": f"Movie {index}", "similarity_score": 0.8}]
+                yield {"index": index, "query": query, "movies": movies, "exact_matches": True, "message": "ok"}
+        mock_batch.side_effect = results
+
+        response = test_client.post("/search/semantic/batch", json={"queries": ["heist movie", "space opera"]})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["query"] for line in lines] == ["heist movie", "space opera"]
+        assert lines[1]["results"][0]["id"] == 2
+        assert lines[0]["error"] is None
+
+    def test_validation(self, test_client, test_engine):
+        """Test empty batches and too-short queries are rejected."""
+        assert test_client.post("/search/semantic/batch", json={"queries": []}).status_code == 422
+        assert test_client.post("/search/semantic/batch", json={"queries": ["ok query", "ab"]}).status_code == 422
+
+
+class TestSemanticSearchCoalescing:
+    """Tests for request coalescing on POST /search/semantic."""
+
+    async def test_identical_concurrent_requests_share_one_search(self, test_db):
+        """Test concurrent identical queries run one semantic search."""
+        async def slow_search(self, request):
+            await asyncio.sleep(0.01)
+            return {"movies": [], "exact_matches": False, "message": "No movies found"}
+
+        with patch("src.search.service.SemanticSearchService.semantic_search", autospec=True, side_effect=slow_search) as search:
+            coalesced = semantic_flight.coalesced
+            responses = await asyncio.gather(*(
+                semantic_search(test_db, SemanticSearchRequest(query="heist movie", limit=5)) for _ in range(3)
+            ))
+
+        assert search.call_count == 1
+        assert semantic_flight.coalesced == coalesced + 2
+        assert all(r.message == "No movies found" for r in responses)
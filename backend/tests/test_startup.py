@@ -0,0 +1,92 @@
+"""
+Tests for startup warm-up and the readiness probe.
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from main import app
+from src.search.views import RESPONSE_CACHES
+from src.startup import Readiness, shut_down
+
+
+class TestReadiness:
+    """Tests for Readiness.run."""
+
+    async def test_marks_ready_after_warm_up(self):
+        """Test the worker becomes ready once warm-up succeeds."""
+        readiness = Readiness()
+        warm_up = AsyncMock()
+
+        await readiness.run(warm_up)
+
+        warm_up.assert_awaited_once()
+        assert readiness.status()["ready"] is True
+
+    async def test_retries_failed_warm_up(self):
+        """Test a failing warm-up is retried and stays unready meanwhile."""
+        readiness = Readiness()
+        warm_up = AsyncMock(side_effect=[ConnectionError("db down"), None])
+
+        await readiness.run(warm_up, retry_delay=0)
+
+        assert warm_up.await_count == 2
+        assert readiness.ready is True
+        assert readiness.error is None
+
+
+class TestShutDown:
+    """Tests for shut_down."""
+
+    async def test_waits_for_response_cache_refreshes(self):
+        """Test background response refreshes finish before the engine is disposed."""
+        calls = []
+        engine = MagicMock()
+        engine.dispose = AsyncMock(side_effect=lambda: calls.append("dispose"))
+
+        async def slow_refresh():
+            await asyncio.sleep(0.01)
+            calls.append("refresh")
+
+        cache = RESPONSE_CACHES[0]
+        cache._refreshing["key"] = asyncio.create_task(slow_refresh())
+        try:
+            with patch("src.startup.engine", engine), patch(
+                "src.search.embedding.close_embedding_scheduler", AsyncMock()
+            ):
+                await shut_down()
+        finally:
+            cache._refreshing.clear()
+
+        assert calls == ["refresh", "dispose"]
+
+
+class TestReadyEndpoint:
+    """Tests for GET /ready."""
+
+    def test_ready_after_warm_up(self, test_client):
+        """Test /ready turns healthy once warm-up finishes."""
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline:
+            response = test_client.get("/ready")
+            if response.status_code == 200:
+                break
+            time.sleep(0.01)
+        assert response.status_code == 200
+        assert response.json()["ready"] is True
+
+    def test_unready_while_warming_up(self):
+        """Test /ready is 503 while warm-up is still running."""
+
+        async def slow_warm_up():
+            await asyncio.sleep(60)
+
+        with patch("main.warm_up", slow_warm_up), patch("main.shut_down", AsyncMock()), TestClient(app) as client:
+            response = client.get("/ready")
+            assert response.status_code == 503
+            assert response.json()["ready"] is False
+            # Liveness is unaffected
+            assert client.get("/").status_code == 200
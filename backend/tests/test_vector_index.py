@@ -0,0 +1,211 @@
+"""
+Tests for the in-process exact vector index and the memory semantic engine.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from starlette.concurrency import run_in_threadpool
+
+from src.db.catalog import bump_catalog_version, get_catalog_version
+from src.db.entity import Movie
+from src.search import service as service_module
+from src.search.models import HybridSearchRequest, SemanticBatchRequest, SemanticSearchRequest
+from src.search.service import SemanticSearchService
+from src.search.vector_index import VectorIndex
+
+
+def unit(*values):
+    v = np.zeros(384, dtype=np.float32)
+    v[: len(values)] = values
+    return v
+
+
+@pytest.fixture
+async def embedded_movies(test_db, sample_movies):
+    """Give the sample movies simple, distinguishable embeddings."""
+    vectors = {
+        1: unit(1, 0, 0),
+        2: unit(0, 1, 0),
+        3: unit(0, 0.9, 0.1),
+        4: unit(0.7, 0.7, 0),
+        5: unit(0, 0, 1),
+    }
+    for movie in sample_movies:
+        movie.plot_embedding = vectors[movie.id]
+    await test_db.commit()
+    await bump_catalog_version(test_db)
+    return vectors
+
+
+class TestVectorIndexSearch:
+    """Tests for VectorIndex.search."""
+
+    def test_exact_top_k_matches_brute_force(self):
+        """Test top-k equals a full sort of cosine similarities."""
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((500, 384)).astype(np.float32)
+        index = VectorIndex()
+        index.build(np.arange(500), vectors, version=1)
+
+        query = rng.standard_normal(384).astype(np.float32)
+        ids, scores = index.search(query, 10)
+
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        expected = normalized @ (query / np.linalg.norm(query))
+        assert ids.tolist() == np.argsort(-expected)[:10].tolist()
+        np.testing.assert_allclose(scores, np.sort(expected)[::-1][:10], rtol=1e-5)
+
+    def test_k_larger_than_catalog(self):
+        """Test k beyond the catalog returns everything, sorted."""
+        index = VectorIndex()
+        index.build(np.array([10, 20]), np.array([unit(1), unit(0, 1)]), version=1)
+        ids, scores = index.search(unit(0.2, 1), 5)
+        assert ids.tolist() == [20, 10]
+
+    def test_candidate_ids_restrict_results(self):
+        """Test structural filter candidates restrict the ranking."""
+        index = VectorIndex()
+        index.build(np.array([1, 2, 3]), np.array([unit(1), unit(0.9, 0.1), unit(0, 1)]), version=1)
+        ids, _ = index.search(unit(1), 2, candidate_ids=np.array([2, 3]))
+        assert ids.tolist() == [2, 3]
+
+    def test_empty_index(self):
+        """Test searching an empty index returns nothing."""
+        index = VectorIndex()
+        index.build(np.empty(0), np.empty((0, 384)), version=0)
+        ids, scores = index.search(unit(1), 5)
+        assert len(ids) == 0
+
+
+class TestVectorIndexLoading:
+    """Tests for loading and refreshing from the database."""
+
+    async def test_load_from_database(self, test_db, embedded_movies):
+        """Test every stored embedding is loaded and normalized."""
+        index = VectorIndex()
+        await index.load(test_db)
+
+        assert len(index) == 5
+        assert index.version == await get_catalog_version(test_db)
+        np.testing.assert_allclose(np.linalg.norm(index.matrix, axis=1), 1.0, rtol=1e-5)
+
+    async def test_refreshes_when_catalog_version_changes(self, test_db, embedded_movies):
+        """Test a version bump triggers a reload on the next check."""
+        index = VectorIndex(refresh_interval=0)
+        await index.ensure_fresh(test_db)
+        assert len(index) == 5
+
+        test_db.add(Movie(id=6, movie_name="New Movie", plot_embedding=unit(1, 1, 1)))
+        await test_db.commit()
+        await index.ensure_fresh(test_db)
+        assert len(index) == 5  # catalog version unchanged
+
+        await bump_catalog_version(test_db)
+        await index.ensure_fresh(test_db)
+        assert len(index) == 6
+
+    async def test_matrix_is_built_off_the_event_loop(self, test_db, embedded_movies):
+        """Test stacking and normalizing run in the threadpool."""
+        index = VectorIndex()
+        with patch("src.search.vector_index.run_in_threadpool", wraps=run_in_threadpool) as threadpool:
+            await index.load(test_db)
+
+        assert threadpool.call_args.args[0] == index._stack_rows
+        assert len(index) == 5
+
+    async def test_searches_continue_during_reload(self, test_db, embedded_movies):
+        """Test requests don't wait for a reload once an index is loaded."""
+        index = VectorIndex(refresh_interval=0)
+        await index.ensure_fresh(test_db)
+
+        async with index._lock:  # a reload in progress
+            await asyncio.wait_for(index.ensure_fresh(test_db), 0.5)
+        assert len(index) == 5
+
+
+class TestVectorIndexSearchMany:
+    """Tests for VectorIndex.search_many."""
+
+    def test_matches_single_query_search(self):
+        """Test each batch row equals a separate search call."""
+        rng = np.random.default_rng(1)
+        index = VectorIndex()
+        index.build(np.arange(200), rng.standard_normal((200, 384)).astype(np.float32), version=1)
+        queries = rng.standard_normal((3, 384)).astype(np.float32)
+
+        results = index.search_many(queries, k=7)
+
+        assert len(results) == 3
+        for query, (ids, scores) in zip(queries, results):
+            expected_ids, expected_scores = index.search(query, 7)
+            assert ids.tolist() == expected_ids.tolist()
+            assert scores == pytest.approx(expected_scores, abs=1e-5)
+
+    def test_k_larger_than_catalog(self):
+        """Test every movie is returned, best first, when k exceeds the catalog."""
+        index = VectorIndex()
+        index.build(np.array([10, 20]), np.array([unit(1, 0), unit(0, 1)]), version=1)
+        [(ids, _)] = index.search_many(np.array([unit(0, 1)]), k=5)
+        assert ids.tolist() == [20, 10]
+
+    def test_empty_index(self):
+        """Test an empty index gives one empty result per query."""
+        results = VectorIndex().search_many(np.array([unit(1), unit(0, 1)]), k=3)
+        assert [len(ids) for ids, _ in results] == [0, 0]
+
+
+class TestMemorySemanticEngine:
+    """Tests for SemanticSearchService with the memory engine."""
+
+    @pytest.fixture(autouse=True)
+    def memory_engine(self):
+        with patch.object(service_module.settings, "semantic_search_engine", "memory"), \
+                patch("src.search.vector_index.vector_index", VectorIndex()):
+            yield
+
+    @patch("src.search.embedding.embed_query")
+    async def test_semantic_search(self, mock_embed, test_db, embedded_movies):
+        """Test results come back ranked with hydrated metadata."""
+        mock_embed.return_value = unit(1, 0, 0)
+
+        result = await SemanticSearchService(test_db).semantic_search(
+            SemanticSearchRequest(query="prison drama", limit=2)
+        )
+
+        movies = result["movies"]
+        assert [m["id"] for m in movies] == [1, 4]
+        assert movies[0]["movie_name"] == "The Shawshank Redemption"
+        assert movies[0]["similarity_score"] == 1.0
+        assert result["exact_matches"] is True
+
+    @patch("src.search.embedding.embed_query")
+    async def test_hybrid_search_applies_filters(self, mock_embed, test_db, embedded_movies):
+        """Test structural filters restrict the in-memory ranking."""
+        mock_embed.return_value = unit(0, 1, 0)
+
+        result = await SemanticSearchService(test_db).hybrid_search(
+            HybridSearchRequest(query="dream heist", directors="Nolan", min_rating=8.9, limit=5)
+        )
+
+        assert [m["id"] for m in result["movies"]] == [2]
+
+    @patch("src.search.embedding.embed_queries")
+    async def test_semantic_batch(self, mock_embed, test_db, embedded_movies):
+        """Test batch results come back per query, in request order, across chunks."""
+        mock_embed.side_effect = lambda texts: np.array(
+            [unit(1, 0, 0) if "prison" in t else unit(0, 0, 1) for t in texts]
+        )
+        request = SemanticBatchRequest(queries=["prison drama", "mob hitmen", "prison break"], limit=2)
+
+        with patch.object(service_module.settings, "semantic_batch_chunk_size", 2):
+            results = [r async for r in SemanticSearchService(test_db).semantic_batch(request)]
+
+        assert mock_embed.call_count == 2  # one call per chunk
+        assert [r["index"] for r in results] == [0, 1, 2]
+        assert [r["query"] for r in results] == request.queries
+        assert [m["id"] for m in results[0]["movies"]] == [1, 4]
+        assert results[1]["movies"][0]["id"] == 5
+        assert results[2]["movies"][0]["movie_name"] == "The Shawshank Redemption"
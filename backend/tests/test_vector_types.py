@@ -0,0 +1,84 @@
+"""
+Unit tests for binary vector binding and binary COPY encoding.
+"""
+
+import struct
+
+import numpy as np
+import pytest
+from pgvector import Vector
+from sqlalchemy.dialects.postgresql import asyncpg, psycopg2
+
+from src.db.pgcopy import COPY_HEADER, COPY_TRAILER, pack_binary_copy
+from src.db.types import Float32Vector
+
+
+class TestFloat32Vector:
+    """Tests for Float32Vector bind and result processing."""
+
+    def test_asyncpg_binds_float32_array(self):
+        """Test asyncpg receives a float32 array for the binary codec, not text."""
+        process = Float32Vector(3).bind_processor(asyncpg.dialect())
+        value = process([0.5, 1.0, 2.0])
+        assert isinstance(value, np.ndarray)
+        assert value.dtype == np.float32
+
+    def test_other_drivers_fall_back_to_text(self):
+        """Test drivers without the binary codec get pgvector's text form."""
+        process = Float32Vector(3).bind_processor(psycopg2.dialect())
+        assert process(np.array([0.5, 1.0, 2.0], dtype=np.float32)) == "[0.5,1.0,2.0]"
+
+    def test_result_from_binary_codec(self):
+        """Test binary-decoded vectors come back as float32 arrays."""
+        process = Float32Vector(3).result_processor(asyncpg.dialect(), None)
+        result = process(Vector([0.5, 1.0, 2.0]))
+        assert result.dtype == np.float32
+        assert result.tolist() == [0.5, 1.0, 2.0]
+
+    def test_result_from_text(self):
+        """Test text vectors are parsed into float32 arrays."""
+        process = Float32Vector(3).result_processor(psycopg2.dialect(), None)
+        assert process("[0.5,1,2]").tolist() == [0.5, 1.0, 2.0]
+        assert process(None) is None
+
+
+class TestPackBinaryCopy:
+    """Tests for pack_binary_copy."""
+
+    def test_id_and_vector_rows(self):
+        """Test rows match Postgres' binary COPY tuple layout."""
+        vectors = np.array([[0.5, 1.0, 2.0], [3.0, 4.0, 5.0]], dtype=np.float32)
+        payload = pack_binary_copy([("int4", np.array([7, 8])), ("vector", vectors)])
+
+        assert payload.startswith(COPY_HEADER)
+        assert payload.endswith(COPY_TRAILER)
+
+        body = payload[len(COPY_HEADER) : -len(COPY_TRAILER)]
+        row_size = 2 + (4 + 4) + (4 + 4 + 4 * 3)
+        assert len(body) == 2 * row_size
+
+        n_fields, id_len, movie_id, vec_len = struct.unpack(">hiii", body[:14])
+        assert (n_fields, id_len, movie_id, vec_len) == (2, 4, 7, 16)
+        assert body[14:row_size] == Vector(vectors[0]).to_binary()
+
+    def test_scalar_columns(self):
+        """Test float columns are encoded big-endian."""
+        payload = pack_binary_copy([("int4", np.array([1])), ("float4", np.array([0.25]))])
+        body = payload[len(COPY_HEADER) : -len(COPY_TRAILER)]
+        assert struct.unpack(">hiiif", body) == (2, 4, 1, 4, 0.25)
+
+    def test_smallint_column(self):
+        """Test int2 columns use a 2-byte field."""
+        payload = pack_binary_copy([("int2", np.array([3]))])
+        body = payload[len(COPY_HEADER) : -len(COPY_TRAILER)]
+        assert struct.unpack(">hih", body) == (1, 2, 3)
+
+    def test_mismatched_lengths_rejected(self):
+        """Test all columns must have the same number of rows."""
+        with pytest.raises(ValueError):
+            pack_binary_copy([("int4", np.array([1, 2])), ("int4", np.array([1]))])
+
+    def test_unsupported_kind_rejected(self):
+        """Test unknown column kinds are rejected."""
+        with pytest.raises(ValueError):
+            pack_binary_copy([("text", np.array(["a"]))])
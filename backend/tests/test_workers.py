@@ -0,0 +1,108 @@
+"""
+Unit tests for process-pool embedding execution.
+
+A thread pool stands in for the process pool so the worker functions run
+in-process against a fake model.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from src.search import embedding, workers
+from src.search.workers import EmbeddingProcessPool
+
+
+@pytest.fixture
+def pool():
+    fake_model = MagicMock()
+    fake_model.encode.side_effect = lambda texts, **kw: np.array([[float(len(t))] * 4 for t in texts])
+    pool = EmbeddingProcessPool("model", "torch", None, 4, processes=2)
+    pool._executor = ThreadPoolExecutor(max_workers=2)
+    with patch.object(workers, "_worker_model", fake_model):
+        yield pool
+    pool.shutdown()
+
+
+class TestEmbeddingProcessPool:
+    """Tests for EmbeddingProcessPool."""
+
+    def test_default_process_count_uses_all_cores(self):
+        """Test processes default to cpu_count / threads per process."""
+        with patch("os.cpu_count", return_value=8):
+            assert EmbeddingProcessPool("m", "torch", None, 4, threads_per_process=2).processes == 4
+
+    def test_chunks_spread_large_inputs(self):
+        """Test large inputs are split across processes, small ones are not."""
+        pool = EmbeddingProcessPool("m", "torch", None, 4, processes=4)
+        assert [len(c) for c in pool._chunks(["t"] * 256, 32)] == [64, 64, 64, 64]
+        assert [len(c) for c in pool._chunks(["t"] * 10, 32)] == [10]
+
+    def test_encode_preserves_order(self, pool):
+        """Test chunked results are concatenated in input order."""
+        texts = ["a" * n for n in range(1, 80)]
+        result = pool.encode(texts, batch_size=8)
+        assert result.dtype == np.float32
+        assert result[:, 0].tolist() == [float(n) for n in range(1, 80)]
+
+    async def test_aencode(self, pool):
+        """Test async encode awaits the pool."""
+        result = await pool.aencode(["ab", "abc"], batch_size=2)
+        assert result[:, 0].tolist() == [2.0, 3.0]
+
+
+class TestProcessExecutionMode:
+    """Tests for embedding functions in process mode."""
+
+    @patch.object(embedding.settings, "embedding_execution", "process")
+    @patch("src.search.embedding.get_model")
+    @patch("src.search.embedding.get_process_pool")
+    def test_generate_embedding_uses_pool(self, mock_get_pool, mock_get_model):
+        """Test generate_embedding never loads the model in the API process."""
+        mock_get_pool.return_value.encode.return_value = np.ones((1, 384), dtype=np.float32)
+
+        result = embedding.generate_embedding("space western")
+
+        mock_get_model.assert_not_called()
+        assert result == [1.0] * 384
+
+    @patch.object(embedding.settings, "embedding_execution", "process")
+    @patch("src.search.embedding.get_process_pool")
+    def test_batch_generate_embeddings_uses_pool(self, mock_get_pool):
+        """Test batch generation is dispatched to the pool."""
+        mock_get_pool.return_value.encode.return_value = np.ones((2, 384), dtype=np.float32)
+
+        result = embedding.batch_generate_embeddings(["a", ""], batch_size=16)
+
+        mock_get_pool.return_value.encode.assert_called_once_with(["a", ""], batch_size=16)
+        assert result[1] == [0.0] * 384
+
+    @patch.object(embedding.settings, "embedding_execution", "process")
+    @patch("src.search.embedding.get_process_pool")
+    async def test_concurrent_queries_use_several_processes(self, mock_get_pool):
+        """Test micro-batches are dispatched to the pool concurrently, not one at a time."""
+        running, peak = 0, 0
+
+        async def aencode(texts, batch_size):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            return np.ones((len(texts), 384), dtype=np.float32)
+
+        mock_get_pool.return_value.processes = 4
+        mock_get_pool.return_value.aencode = aencode
+
+        async def query(n):
+            # Staggered past the batching window, so each query is its own batch
+            await asyncio.sleep(0.015 * n)
+            return await embedding.embed_query(f"process query {n}")
+
+        results = await asyncio.gather(*(query(n) for n in range(4)))
+
+        assert peak > 1
+        assert all(r.shape == (384,) for r in results)
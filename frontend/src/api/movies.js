@@ -53,15 +53,21 @@ export async function searchMovies(params = {}) {
 }
 
 /**
- * Get movies by genre - convenience wrapper
+ * Top-rated movies for several genres in one request (homepage rows)
  */
-export async function getMoviesByGenre(genre, limit = 15) {
-    return searchMovies({
-        genre,
-        sortBy: 'rating',
-        sortOrder: 'desc',
-        limit,
+export async function getGenreRows(genres, limit = 15) {
+    const response = await fetch(`${API_BASE_URL}/search/rows`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ genres, limit }),
     });
+
+    if (!response.ok) {
+        throw new Error('Failed to fetch genre rows');
+    }
+    return response.json();
 }
 
 /**
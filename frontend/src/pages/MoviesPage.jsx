@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import CategoryRow from '../components/CategoryRow';
-import { getGenres, getMoviesByGenre } from '../api/movies';
+import { getGenres, getGenreRows } from '../api/movies';
 import './MoviesPage.css';
 
 // Categories to display - curated list for best experience
@@ -30,25 +30,15 @@ export default function MoviesPage() {
             FEATURED_GENRES.forEach(g => loadingState[g.name] = true);
             setLoading(loadingState);
 
-            // Fetch each genre in parallel
-            const fetchPromises = FEATURED_GENRES.map(async (genre) => {
-                try {
-                    const response = await getMoviesByGenre(genre.name, 15);
-                    return { genre: genre.name, data: response.results };
-                } catch (err) {
-                    console.error(`Failed to fetch ${genre.name}:`, err);
-                    return { genre: genre.name, data: [] };
-                }
-            });
-
+            // One request (and one query) for every row
             try {
-                const results = await Promise.all(fetchPromises);
+                const response = await getGenreRows(FEATURED_GENRES.map(g => g.name), 15);
 
                 const newCategoryData = {};
                 const newLoading = {};
 
-                results.forEach(({ genre, data }) => {
-                    newCategoryData[genre] = data;
+                response.rows.forEach(({ genre, results }) => {
+                    newCategoryData[genre] = results;
                     newLoading[genre] = false;
                 });
 
@@ -56,6 +46,9 @@ export default function MoviesPage() {
                 setLoading(newLoading);
             } catch (err) {
                 console.error('Failed to fetch categories:', err);
+                const newLoading = {};
+                FEATURED_GENRES.forEach(g => newLoading[g.name] = false);
+                setLoading(newLoading);
                 setError('Failed to load movies. Please try again later.');
             }
         };